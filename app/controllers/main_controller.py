@@ -43,6 +43,9 @@ class MainController(QObject):
             container_interval_ms=1000,
         )
         
+        # Serve map tiles from the local cache before any map page loads
+        self._main_model.tile_cache_model.install_scheme_handler()
+        
         self._app.aboutToQuit.connect(self.on_app_exit)
         
         # Button click signals
@@ -92,6 +95,9 @@ class MainController(QObject):
         self._main_model.foxglove_ws_model.signal_gps_fix.connect(
             self._main_view.on_signal_gps_fix_received,
         )
+        self._main_model.foxglove_ws_model.signal_gps_fix.connect(
+            self._main_model.update_mission_progress,
+        )
         self._main_model.foxglove_ws_model.signal_heading_quat.connect(
             self._main_view.on_signal_heading_quat_received,
         )
@@ -106,6 +112,24 @@ class MainController(QObject):
         self._main_model.signal_on_settings_param_loaded.connect(
             self._main_view.on_signal_settings_param_loaded,
         )
+        self._main_model.signal_on_waypoints_saved.connect(
+            self._main_view.on_signal_waypoints_saved,
+        )
+        self._main_model.signal_on_settings_saved.connect(
+            self._main_view.on_signal_settings_saved,
+        )
+        self._main_model.signal_on_file_io_error.connect(
+            self._main_view.on_signal_file_io_error,
+        )
+        self._main_model.tile_cache_model.signal_prefetch_progress.connect(
+            self._main_view.on_signal_tile_prefetch_progress,
+        )
+        self._main_model.signal_on_mission_progress.connect(
+            self._main_view.on_signal_mission_progress,
+        )
+        self._main_model.library_model.signal_library_updated.connect(
+            self._main_view.on_signal_library_updated,
+        )
         
     @pyqtSlot()
     def on_app_exit(self):
@@ -114,6 +138,11 @@ class MainController(QObject):
         """
         logger.info("Exiting application...")
         self._main_model.ros2_launch_container_model.remove_all_launch_containers()
+        self._main_model.tile_cache_model.close()
+        # Let pending saves finish before quitting
+        self._main_model.file_io_model.wait_for_done()
+        self._main_model.library_model.close()
+        self._main_view.on_app_exit()
         self._app.quit()
         
     @pyqtSlot()
@@ -210,11 +239,6 @@ class MainController(QObject):
         """
         Slot method to handle the save waypoint button click event.
         """
-        # replace heading with yaw
-        for waypoint in waypoints["waypoints"]:
-            if "heading" in waypoint:
-                waypoint["yaw"] = waypoint.pop("heading")
-                
         # logger.info(f"Save waypoint button clicked with path: {save_path}")
         # logger.info(f"Waypoints: {waypoints}")
         
@@ -249,18 +273,11 @@ class MainController(QObject):
         Slot method to handle the load settings button click event.
         """
         logger.info(f"Load settings button clicked with path: {file_path}")
-        yaml_data = self._main_model.load_yaml_param_settings_file(
+        # Emits signal_on_settings_param_loaded once read
+        self._main_model.load_yaml_param_settings_file(
             file_path=file_path,
         )
         
-        if yaml_data is None:
-            logger.error(f"Error loading YAML file {file_path}")
-            return None
-        
-        self._main_model.signal_on_settings_param_loaded.emit(
-            file_path, yaml_data,
-        )
-        
     @pyqtSlot(str, dict)
     def on_signal_settings_save_btn_clicked(self, file_path: str, yaml_data: dict):
         """
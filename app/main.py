@@ -2,6 +2,7 @@ import os
 os.environ['QTWEBENGINE_CHROMIUM_FLAGS'] = '--no-sandbox --disable-gpu'
 
 import sys
+import time
 import logging
 import argparse
 
@@ -17,9 +18,11 @@ from app.utils.logger import logger, ColoredFormatter, ColoredLogger
 from app.views import MainView
 from app.controllers import MainController
 from app.models import MainModel
+from app.models.tile_cache_model import TileCacheModel
 
 def main():
     """App entry point."""
+    start_time = time.perf_counter()
 
     parser = argparse.ArgumentParser()
     
@@ -74,6 +77,9 @@ def main():
     )  # use highdpi icons
     QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
 
+    # Custom URL schemes must be registered before the Qt app exists
+    TileCacheModel.register_url_scheme()
+    
     # Create the Qt app
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName(__appname__)
@@ -99,6 +105,10 @@ def main():
     # window.showMaximized()
     window.raise_() # Bring the window to the front
     
+    # Report startup time once the first event loop pass has painted the window
+    QtCore.QTimer.singleShot(0, lambda: logger.info(
+        f"Main window shown in {(time.perf_counter() - start_time) * 1000:.0f} ms"))
+    
     # Set the window to be non-resizable
     # window.setFixedSize(window.size())
     
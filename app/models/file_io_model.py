@@ -0,0 +1,96 @@
+# file_io_model.py
+import itertools
+import traceback
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from app.utils.logger import logger
+
+
+class FileIoModel(QObject):
+    """
+    Singleton model running file operations off the GUI thread.
+
+    Jobs run on a private QThreadPool with a single thread, so operations on
+    the same files keep their submission order. Completion callbacks are
+    invoked on the GUI thread through queued signals.
+    """
+
+    _instance = None
+
+    # Emitted from the worker thread, delivered on the GUI thread
+    _signal_job_done = pyqtSignal(int, object)  # job id, result
+    _signal_job_failed = pyqtSignal(int, str)  # job id, error message
+
+    @staticmethod
+    def get_instance(config: Dict[str, Any]) -> 'FileIoModel':
+        if FileIoModel._instance is None:
+            FileIoModel._instance = FileIoModel(config)
+        return FileIoModel._instance
+
+    def __init__(self, config: Dict[str, Any]):
+        if FileIoModel._instance is not None:
+            raise Exception("This class is a singleton! Use get_instance() instead.")
+        super().__init__()
+        self._config = config
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+        self._job_ids = itertools.count(1)
+        self._callbacks: Dict[int, Tuple[Optional[Callable], Optional[Callable]]] = {}
+        self._signal_job_done.connect(self._on_job_done)
+        self._signal_job_failed.connect(self._on_job_failed)
+
+    def submit(self, func: Callable, *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Runs func(*args) in the background.
+
+        Args:
+            on_done: Called on the GUI thread with the return value.
+            on_error: Called on the GUI thread with the error message;
+                errors are logged either way.
+
+        Returns:
+            int: The job id.
+        """
+        job_id = next(self._job_ids)
+        self._callbacks[job_id] = (on_done, on_error)
+        self._pool.start(_FileIoJob(self, job_id, func, args))
+        return job_id
+
+    def wait_for_done(self, timeout_ms: int = -1) -> bool:
+        """Blocks until all submitted jobs have run, e.g. before exiting."""
+        return self._pool.waitForDone(timeout_ms)
+
+    @pyqtSlot(int, object)
+    def _on_job_done(self, job_id: int, result: Any):
+        on_done, _ = self._callbacks.pop(job_id, (None, None))
+        if on_done is not None:
+            on_done(result)
+
+    @pyqtSlot(int, str)
+    def _on_job_failed(self, job_id: int, message: str):
+        _, on_error = self._callbacks.pop(job_id, (None, None))
+        if on_error is not None:
+            on_error(message)
+
+
+class _FileIoJob(QRunnable):
+    def __init__(self, model: FileIoModel, job_id: int, func: Callable, args: tuple):
+        super().__init__()
+        self._model = model
+        self._job_id = job_id
+        self._func = func
+        self._args = args
+
+    def run(self):
+        try:
+            result = self._func(*self._args)
+        except Exception as e:
+            logger.error(f"File I/O job {getattr(self._func, '__name__', self._func)} failed: {e}")
+            logger.debug(traceback.format_exc())
+            self._model._signal_job_failed.emit(self._job_id, str(e))
+            return
+        self._model._signal_job_done.emit(self._job_id, result)
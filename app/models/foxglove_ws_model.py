@@ -245,6 +245,8 @@ class FoxgloveWsModel(QObject):
                     'latitude': navsatfix_data.get('latitude', 0),
                     'longitude': navsatfix_data.get('longitude', 0),
                     'altitude': navsatfix_data.get('altitude', 0),
+                    'status': navsatfix_data.get('status', {}).get('status', -1),
+                    'position_covariance': navsatfix_data.get('position_covariance', []),
                 }
                 self.signal_gps_fix.emit(gps_fix)
                 # logger.info(f"Navsatfix Data: {navsatfix_data}")
@@ -0,0 +1,151 @@
+# library_model.py
+import os
+from typing import Any, Dict, List, Tuple
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal, pyqtSlot
+
+from .file_io_model import FileIoModel
+from app.utils.library_index import LibraryIndex, KIND_WAYPOINTS, KIND_PARAMS
+
+
+class LibraryModel(QObject):
+    """
+    Singleton model keeping the waypoint and params library index
+    (`mowbot_legacy_data_path/__library__.sqlite`) up to date.
+
+    The `waypoints` and `params` directories and their files are watched
+    with a QFileSystemWatcher. Changes are debounced and re-indexed on the
+    file I/O thread, and only files that actually changed are parsed again.
+    Files are indexed INDEX_CHUNK_FILES per job, each chunk queueing the
+    next one, so loads and saves never wait behind a whole first index.
+    Every refresh publishes the full entry list of its kind.
+    """
+
+    _instance = None
+
+    signal_library_updated = pyqtSignal(str, list)  # kind, entries
+
+    # Editors and copies touch a file several times in a row
+    REFRESH_DELAY_MS = 300
+
+    # Files parsed per file I/O job while indexing
+    INDEX_CHUNK_FILES = 8
+
+    @staticmethod
+    def get_instance(config: Dict[str, Any]) -> 'LibraryModel':
+        if LibraryModel._instance is None:
+            LibraryModel._instance = LibraryModel(config)
+        return LibraryModel._instance
+
+    def __init__(self, config: Dict[str, Any]):
+        if LibraryModel._instance is not None:
+            raise Exception("This class is a singleton! Use get_instance() instead.")
+        super().__init__()
+        self._config = config
+        data_path = config['mowbot_legacy_data_path']
+        self._directories = {
+            KIND_WAYPOINTS: os.path.join(data_path, 'waypoints'),
+            KIND_PARAMS: os.path.join(data_path, 'params'),
+        }
+        self._index = LibraryIndex(os.path.join(data_path, '__library__.sqlite'))
+        self._file_io_model = FileIoModel.get_instance(config=config)
+        self._entries: Dict[str, List[dict]] = {kind: None for kind in self._directories}
+        self._closed = False
+
+        # The data directory is watched too, to pick up the library
+        # directories when they are created
+        self._data_path = data_path
+        self._watcher = QFileSystemWatcher(self)
+        for directory in [data_path, *self._directories.values()]:
+            if os.path.isdir(directory):
+                self._watcher.addPath(directory)
+        self._watcher.directoryChanged.connect(self._on_path_changed)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+
+        self._pending = set()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self._refresh_pending)
+
+        self.refresh()
+
+    def entries(self, kind: str) -> List[dict]:
+        """Returns the last published entries of `kind`."""
+        return self._entries.get(kind) or []
+
+    def refresh(self, kind: str = None) -> None:
+        """Re-indexes one kind, or all of them, in the background."""
+        self._pending.update([kind] if kind else self._directories)
+        self._refresh_pending()
+
+    def _kind_of(self, path: str) -> str:
+        directory = path if path in self._directories.values() else os.path.dirname(path)
+        for kind, kind_directory in self._directories.items():
+            if kind_directory == directory:
+                return kind
+        return None
+
+    @pyqtSlot(str)
+    def _on_path_changed(self, path: str):
+        if path == self._data_path:
+            self._pending.update(self._directories)
+        else:
+            kind = self._kind_of(path)
+            if kind is None:
+                return
+            self._pending.add(kind)
+        self._refresh_timer.start()
+
+    def _refresh_pending(self):
+        if self._closed:
+            return
+        for kind in self._pending:
+            self._submit_refresh(kind)
+        self._pending.clear()
+
+    def _submit_refresh(self, kind: str):
+        self._file_io_model.submit(
+            self._refresh, kind, self._entries[kind] is None,
+            on_done=lambda result, kind=kind: self._on_refreshed(kind, *result),
+        )
+
+    def _refresh(self, kind: str, publish: bool) -> Tuple[List[dict], int]:
+        """
+        Runs on the file I/O thread; indexes up to INDEX_CHUNK_FILES files.
+        Returns the entries, or None when nothing changed and they were
+        already published, and the number of files left to index.
+        """
+        changes, left = self._index.refresh(
+            kind, self._directories[kind], max_files=self.INDEX_CHUNK_FILES)
+        if changes == 0 and not publish:
+            return None, left
+        return self._index.entries(kind), left
+
+    def _on_refreshed(self, kind: str, entries: List[dict], left: int):
+        if self._closed:
+            return
+        if left:
+            # Queue the next chunk behind the file operations submitted meanwhile
+            self._submit_refresh(kind)
+        if entries is None:
+            return
+        self._entries[kind] = entries
+        # Also watch the files, so in-place edits are noticed
+        directory = self._directories[kind]
+        if os.path.isdir(directory) and directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+        watched = set(self._watcher.files())
+        new_files = [entry['path'] for entry in entries if entry['path'] not in watched]
+        if new_files:
+            self._watcher.addPaths(new_files)
+        self.signal_library_updated.emit(kind, entries)
+
+    def close(self):
+        """Stops watching; call after the file I/O jobs have finished."""
+        self._closed = True
+        self._refresh_timer.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._index.close()
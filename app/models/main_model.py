@@ -1,14 +1,26 @@
 # main_model.py
-import yaml
 import os
+import functools
 from PyQt5.QtCore import (
     QObject,
     pyqtSignal,
 )
 from .foxglove_ws_model import FoxgloveWsModel
 from .ros2_launch_container_model import ROS2LaunchContainerModel
+from .tile_cache_model import TileCacheModel
+from .file_io_model import FileIoModel
+from .library_model import LibraryModel
 
 from app.utils.logger import logger
+from app.utils.yaml_io import load_yaml_file, save_yaml_file
+from app.utils.staging_cache import StagingCache
+from app.utils.mission_progress import MissionProgress
+from app.utils.waypoint_formats import (
+    FORMAT_YAML,
+    convert_to_nav_yaml,
+    save_waypoints,
+    waypoint_format,
+)
 
 class MainModel(QObject):
     
@@ -17,6 +29,12 @@ class MainModel(QObject):
     
     signal_on_settings_param_loaded = pyqtSignal(str, dict) # (file_path, params)
     
+    signal_on_waypoints_saved = pyqtSignal(str) # (file_path)
+    signal_on_settings_saved = pyqtSignal(str, dict) # (file_path, params)
+    signal_on_file_io_error = pyqtSignal(str, str) # (file_path, error message)
+    
+    signal_on_mission_progress = pyqtSignal(dict) # see MissionProgress.update()
+    
     """
     MainModel aggregates all application models.
     """
@@ -32,6 +50,21 @@ class MainModel(QObject):
         self._ros2_launch_container_model = ROS2LaunchContainerModel.get_instance(
             config=self._config,
         )
+        self._tile_cache_model = TileCacheModel.get_instance(
+            config=self._config,
+        )
+        self._file_io_model = FileIoModel.get_instance(
+            config=self._config,
+        )
+        self._library_model = LibraryModel.get_instance(
+            config=self._config,
+        )
+        # Copies loaded files to __waypoints__/__params__.yaml (used on the I/O thread)
+        self._staging_cache = StagingCache(
+            os.path.join(self._config['mowbot_legacy_data_path'], '__staging_cache__.json'))
+        # Progress along the loaded waypoints, and the speed from the loaded params
+        self._mission_progress = None
+        self._desired_linear_vel = None
         # self._ros2_launch_container_model.create_all_launch_containers()
         
     @property
@@ -48,79 +81,148 @@ class MainModel(QObject):
         """
         return self._ros2_launch_container_model
     
-    def save_yaml_waypoints(self, waypoints: dict, file_path: str):
+    @property
+    def tile_cache_model(self):
         """
-        Saves the given waypoints to a YAML file.
+        Returns the map tile cache model.
         """
-        with open(file_path, 'w') as file:
-            yaml.dump(waypoints, file)
-            
-    def _load_yaml_file(self, source_path: str, target_path: str) -> dict:
+        return self._tile_cache_model
+    
+    @property
+    def file_io_model(self):
         """
-        Common function to load YAML data from source_path and save to target_path.
+        Returns the background file I/O model.
         """
-        try:
-            # Read selected file
-            with open(source_path, 'r') as file:
-                yaml_data = yaml.safe_load(file)
-
-            # Check if target file exists
-            if not os.path.exists(target_path):
-                with open(target_path, 'w') as file:
-                    yaml.dump(yaml_data, file)
-            else:
-                with open(target_path, 'r+') as file:
-                    existing_data = yaml.safe_load(file)
-                    if existing_data != yaml_data:
-                        # Update the file with new data
-                        file.seek(0)
-                        yaml.dump(yaml_data, file)
-                        file.truncate()
-
-            return yaml_data
-
-        except Exception as e:
-            logger.error(f"Error loading YAML file {source_path}: {e}")
-            return None
-
+        return self._file_io_model
+    
+    @property
+    def library_model(self):
+        """
+        Returns the waypoint/params library index model.
+        """
+        return self._library_model
+    
+    def save_yaml_waypoints(self, waypoints: dict, file_path: str):
+        """
+        Saves the given waypoints in the background, as YAML or in the
+        format given by the file extension (see app.utils.waypoint_formats).
+        Emits signal_on_waypoints_saved once the file is written.
+        """
+        self._file_io_model.submit(
+            save_waypoints, waypoints['waypoints'], file_path,
+            on_done=lambda _: self.signal_on_waypoints_saved.emit(file_path),
+            on_error=lambda message: self.signal_on_file_io_error.emit(file_path, message),
+        )
+            
     def load_yaml_waypoints_file(self, file_path: str):
         """
-        Loads waypoints from a YAML file.
+        Loads a waypoints file in the background. Files in other formats
+        than YAML are converted to the YAML read by the navigation stack.
         """
         target_wp_file_path = self._config['mowbot_legacy_data_path'] + '/__waypoints__.yaml'
-        waypoints = self._load_yaml_file(file_path, target_wp_file_path)
+        fmt = waypoint_format(file_path)
+        convert = None if fmt == FORMAT_YAML else functools.partial(convert_to_nav_yaml, fmt=fmt)
+        self._file_io_model.submit(
+            self._staging_cache.stage, file_path, target_wp_file_path, convert,
+            on_done=lambda waypoints: self._on_waypoints_file_loaded(file_path, waypoints),
+            on_error=lambda message: self.signal_on_file_io_error.emit(file_path, message),
+        )
+
+    def _on_waypoints_file_loaded(self, file_path: str, waypoints: dict):
         file_name = os.path.basename(file_path)
         # Check if the file name is valid
         if waypoints:
             self.signal_on_waypoints_loaded.emit(
                 file_name, waypoints
             )
+            # Warm the map tile cache around the mission
+            self._tile_cache_model.prefetch_waypoints(
+                waypoints.get('waypoints', []))
+            # Index the mission for progress tracking
+            self._mission_progress = None
+            self.signal_on_mission_progress.emit({})
+            self._file_io_model.submit(
+                self._build_mission_progress, waypoints.get('waypoints', []),
+                on_done=self._on_mission_progress_built,
+            )
+
+    @staticmethod
+    def _build_mission_progress(waypoints: list) -> MissionProgress:
+        """Runs on the file I/O thread."""
+        return MissionProgress(
+            [waypoint['latitude'] for waypoint in waypoints],
+            [waypoint['longitude'] for waypoint in waypoints],
+        )
+
+    def _on_mission_progress_built(self, mission_progress: MissionProgress):
+        self._mission_progress = mission_progress
+        logger.info(
+            f"Tracking progress over {len(mission_progress)} waypoints "
+            f"({mission_progress.total_length_m:.0f} m)")
+
+    def update_mission_progress(self, gps_fix: dict):
+        """
+        Matches a GPS fix to the loaded mission and emits
+        signal_on_mission_progress.
+        """
+        if self._mission_progress is None:
+            return
+        progress = self._mission_progress.update(
+            gps_fix['latitude'], gps_fix['longitude'], self._desired_linear_vel)
+        if progress is not None:
+            self.signal_on_mission_progress.emit(progress)
 
     def load_yaml_params_file(self, file_path: str):
         """
-        Loads parameters from a YAML file.
+        Loads parameters from a YAML file in the background.
         """
         target_params_file_path = self._config['mowbot_legacy_data_path'] + '/__params__.yaml'
-        params = self._load_yaml_file(file_path, target_params_file_path)
+        self._file_io_model.submit(
+            self._staging_cache.stage, file_path, target_params_file_path,
+            on_done=lambda params: self._on_params_file_loaded(file_path, params),
+            on_error=lambda message: self.signal_on_file_io_error.emit(file_path, message),
+        )
+
+    def _on_params_file_loaded(self, file_path: str, params: dict):
         file_name = os.path.basename(file_path)
+        try:
+            self._desired_linear_vel = float(
+                params['controller_server']['ros__parameters']['FollowPath']['desired_linear_vel'])
+        except (KeyError, TypeError, ValueError):
+            self._desired_linear_vel = None
+            logger.warning(f"No desired_linear_vel in {file_name}, mission ETA unavailable")
         if params:
             self.signal_on_params_loaded.emit(
                 file_name, params
             )        
             
     def load_yaml_param_settings_file(self, file_path: str):
-        
-        with open(file_path, 'r') as file:
-            yaml_data = yaml.safe_load(file)
-        
-        return yaml_data
+        """
+        Loads a settings parameter file in the background.
+        Emits signal_on_settings_param_loaded with its content.
+        """
+        def on_done(yaml_data):
+            if yaml_data is None:
+                logger.error(f"Error loading YAML file {file_path}")
+                return
+            self.signal_on_settings_param_loaded.emit(file_path, yaml_data)
+
+        self._file_io_model.submit(
+            load_yaml_file, file_path,
+            on_done=on_done,
+            on_error=lambda message: self.signal_on_file_io_error.emit(file_path, message),
+        )
     
     def save_yaml_param_settings_file(self, file_path: str, yaml_data: dict):
+        """
+        Saves settings parameters to a YAML file in the background.
+        Emits signal_on_settings_saved once the file is written.
+        """
         # check if file path has .yaml extension
         if not file_path.endswith('.yaml'):
             file_path += '.yaml'
-        with open(file_path, 'w') as file:
-            yaml.dump(yaml_data, file)
-        logger.info(f"YAML file saved to {file_path}")
-        
-
+        self._file_io_model.submit(
+            save_yaml_file, yaml_data, file_path,
+            on_done=lambda _: self.signal_on_settings_saved.emit(file_path, yaml_data),
+            on_error=lambda message: self.signal_on_file_io_error.emit(file_path, message),
+        )
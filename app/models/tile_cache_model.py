@@ -0,0 +1,355 @@
+# tile_cache_model.py
+import os
+import json
+import itertools
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from PyQt5.QtCore import QObject, QBuffer, QIODevice, QUrl, pyqtSignal, pyqtSlot
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt5.QtWebEngineCore import (
+    QWebEngineUrlScheme,
+    QWebEngineUrlSchemeHandler,
+    QWebEngineUrlRequestJob,
+)
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+from app.app_info import __appname__, __version__
+from app.utils.mbtiles import MBTilesCache
+from app.utils.tiles import tile_count_in_bbox, tile_to_quadkey, tiles_in_bbox
+from app.utils.geo import local_meters_per_degree
+from app.utils.logger import logger
+
+TILE_SCHEME = b"tiles"
+
+USER_AGENT = f"{__appname__.replace(' ', '_')}/{__version__}"
+
+OSM_URL_TEMPLATE = "https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
+OSM_SUBDOMAINS = ["a", "b", "c"]
+
+BING_METADATA_URL = (
+    "https://dev.virtualearth.net/REST/v1/Imagery/Metadata/Aerial"
+    "?key={key}&include=ImageryProviders&uriScheme=https"
+)
+
+
+class TileCacheModel(QObject):
+    """
+    Singleton model serving map tiles through a `tiles://<layer>/<z>/<x>/<y>`
+    URL scheme, backed by one MBTiles file per layer under
+    `mowbot_legacy_data_path/tiles`.
+
+    Cache misses are fetched from the upstream provider and stored, and the
+    stored tiles keep the map working fully offline. The Bing imagery URL
+    template is resolved from the REST metadata API in the background and
+    persisted, so it also survives sessions without network. Until a
+    template is known, Bing requests are held while the metadata is being
+    fetched and fall back to OpenStreetMap tiles otherwise.
+    """
+
+    LAYERS = ("bing", "osm")
+
+    _instance = None
+
+    signal_prefetch_progress = pyqtSignal(int, int, int)  # done, total, cache hits
+    # Emitted from the metadata thread once the Bing metadata request ends
+    signal_bing_upstream_resolved = pyqtSignal()
+
+    @staticmethod
+    def get_instance(config: Dict[str, Any]) -> 'TileCacheModel':
+        if TileCacheModel._instance is None:
+            TileCacheModel._instance = TileCacheModel(config)
+        return TileCacheModel._instance
+
+    @staticmethod
+    def register_url_scheme() -> None:
+        """
+        Registers the tiles:// scheme with QtWebEngine.
+        Must be called before the QApplication is created.
+        """
+        scheme = QWebEngineUrlScheme(TILE_SCHEME)
+        scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+        scheme.setFlags(
+            QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+        QWebEngineUrlScheme.registerScheme(scheme)
+
+    def __init__(self, config: Dict[str, Any]):
+        if TileCacheModel._instance is not None:
+            raise Exception("This class is a singleton! Use get_instance() instead.")
+        super().__init__()
+        self._config = config
+        cache_dir = os.path.join(config['mowbot_legacy_data_path'], 'tiles')
+        max_bytes = int(config.get('tile_cache_max_mb', 1024)) * 1024 * 1024
+        self._caches = {
+            layer: MBTilesCache(
+                os.path.join(cache_dir, f"{layer}.mbtiles"),
+                max_bytes=max_bytes // len(self.LAYERS),
+                name=layer,
+            )
+            for layer in self.LAYERS
+        }
+        self._bing_upstream = self._load_bing_upstream()
+        self._scheme_handler = None
+
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=int(config.get('tile_prefetch_workers', 4)),
+            thread_name_prefix="tile_prefetch",
+        )
+        self._prefetch_generation = 0
+        self._prefetch_lock = threading.Lock()
+
+        self._bing_pending = bool(config.get('bing_api_key'))
+        if self._bing_pending:
+            threading.Thread(target=self._refresh_bing_upstream, daemon=True).start()
+
+    # --- Cache API ---
+
+    def get_tile(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        return self._caches[layer].get(z, x, y)
+
+    def has_tile(self, layer: str, z: int, x: int, y: int) -> bool:
+        return self._caches[layer].contains(z, x, y)
+
+    def put_tile(self, layer: str, z: int, x: int, y: int, data: bytes) -> None:
+        self._caches[layer].put(z, x, y, data)
+
+    def upstream_url(self, layer: str, z: int, x: int, y: int) -> Optional[str]:
+        """
+        Returns the provider URL of a tile, or None if it is not known yet.
+        """
+        if layer == "osm":
+            return OSM_URL_TEMPLATE.format(
+                s=OSM_SUBDOMAINS[(x + y) % len(OSM_SUBDOMAINS)], z=z, x=x, y=y)
+        if layer == "bing" and self._bing_upstream is not None:
+            subdomains = self._bing_upstream["subdomains"] or [""]
+            return (self._bing_upstream["url"]
+                    .replace("{subdomain}", subdomains[x % len(subdomains)])
+                    .replace("{quadkey}", tile_to_quadkey(x, y, z))
+                    .replace("{culture}", "en-US"))
+        return None
+
+    @property
+    def bing_upstream_pending(self) -> bool:
+        """True while the Bing metadata request is in flight."""
+        return self._bing_pending
+
+    def install_scheme_handler(self) -> None:
+        """
+        Installs the tiles:// handler on the default web engine profile.
+        """
+        if self._scheme_handler is None:
+            self._scheme_handler = _TileSchemeHandler(self)
+            QWebEngineProfile.defaultProfile().installUrlSchemeHandler(
+                TILE_SCHEME, self._scheme_handler)
+            logger.info("Tile scheme handler installed.")
+
+    def close(self) -> None:
+        # Downloads in flight see the new generation and skip their tiles;
+        # exiting does not wait for them
+        with self._prefetch_lock:
+            self._prefetch_generation += 1
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        for cache in self._caches.values():
+            cache.close()
+
+    # --- Prefetch ---
+
+    def prefetch_waypoints(self, waypoints: List[dict]) -> None:
+        """
+        Warms the cache for the area around the given waypoints in the
+        background. Any prefetch still running for a previous mission is
+        abandoned. Progress is reported through signal_prefetch_progress.
+        """
+        if not waypoints:
+            return
+        with self._prefetch_lock:
+            self._prefetch_generation += 1
+            generation = self._prefetch_generation
+        # The tile list is planned on the prefetch pool too
+        self._prefetch_executor.submit(self._plan_prefetch, generation, waypoints)
+
+    def _plan_prefetch(self, generation: int, waypoints: List[dict]) -> None:
+        if generation != self._prefetch_generation:
+            return
+        latitudes = [waypoint['latitude'] for waypoint in waypoints]
+        longitudes = [waypoint['longitude'] for waypoint in waypoints]
+        margin_m = float(self._config.get('tile_prefetch_margin_m', 50))
+        east_scale, north_scale = local_meters_per_degree(sum(latitudes) / len(latitudes))
+        dlat = margin_m / north_scale
+        dlon = margin_m / max(east_scale, 1e-6)
+        bbox = (min(latitudes) - dlat, min(longitudes) - dlon,
+                max(latitudes) + dlat, max(longitudes) + dlon)
+
+        layers = self._config.get('tile_prefetch_layers', ["bing"])
+        zooms = self._config.get('tile_prefetch_zooms', [16, 17, 18, 19])
+        max_tiles = int(self._config.get('tile_prefetch_max_tiles', 5000))
+        # Stop listing tiles once the cap is reached
+        tiles = list(itertools.islice((
+            (layer, z, x, y)
+            for layer in layers
+            for z in zooms
+            for x, y in tiles_in_bbox(*bbox, z)
+        ), max_tiles))
+        total = len(layers) * sum(tile_count_in_bbox(*bbox, z) for z in zooms)
+        if total > max_tiles:
+            logger.warning(f"Tile prefetch limited to {max_tiles} of {total} tiles.")
+
+        with self._prefetch_lock:
+            if generation != self._prefetch_generation:
+                return
+            self._prefetch_state = {"done": 0, "hits": 0, "total": len(tiles)}
+        logger.info(f"Prefetching {len(tiles)} tiles for bbox {bbox}")
+        self.signal_prefetch_progress.emit(0, len(tiles), 0)
+        try:
+            for tile in tiles:
+                self._prefetch_executor.submit(self._prefetch_tile, generation, *tile)
+        except RuntimeError:
+            # Shut down while queueing the tiles
+            pass
+
+    def _prefetch_tile(self, generation: int, layer: str, z: int, x: int, y: int) -> None:
+        if generation != self._prefetch_generation:
+            return
+        hit = self.has_tile(layer, z, x, y)
+        if not hit:
+            upstream = self.upstream_url(layer, z, x, y)
+            if upstream is not None:
+                try:
+                    request = urllib.request.Request(
+                        upstream, headers={"User-Agent": USER_AGENT})
+                    with urllib.request.urlopen(request, timeout=10) as response:
+                        data = response.read()
+                    # Abandoned or closed meanwhile
+                    if generation != self._prefetch_generation:
+                        return
+                    self.put_tile(layer, z, x, y, data)
+                except Exception as e:
+                    logger.debug(f"Prefetch of {layer}/{z}/{x}/{y} failed: {e}")
+        with self._prefetch_lock:
+            if generation != self._prefetch_generation:
+                return
+            state = self._prefetch_state
+            state["done"] += 1
+            state["hits"] += int(hit)
+            done, total, hits = state["done"], state["total"], state["hits"]
+        # Report every few tiles to keep signal traffic low
+        if done == total or done % 16 == 0:
+            self.signal_prefetch_progress.emit(done, total, hits)
+
+    # --- Bing metadata ---
+
+    def _load_bing_upstream(self) -> Optional[dict]:
+        stored = self._caches["bing"].get_metadata("upstream")
+        return json.loads(stored) if stored else None
+
+    def _refresh_bing_upstream(self) -> None:
+        try:
+            self._fetch_bing_upstream()
+        finally:
+            self._bing_pending = False
+            self.signal_bing_upstream_resolved.emit()
+
+    def _fetch_bing_upstream(self) -> None:
+        url = BING_METADATA_URL.format(key=self._config['bing_api_key'])
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            with urllib.request.urlopen(request, timeout=10) as response:
+                metadata = json.load(response)
+            resource = metadata["resourceSets"][0]["resources"][0]
+            upstream = {
+                "url": resource["imageUrl"],
+                "subdomains": resource.get("imageUrlSubdomains") or [],
+            }
+        except Exception as e:
+            logger.warning(
+                f"Bing metadata unavailable, using cached tiles and OpenStreetMap: {e}")
+            return
+        self._caches["bing"].set_metadata("upstream", json.dumps(upstream))
+        self._bing_upstream = upstream
+        logger.info("Bing imagery metadata refreshed.")
+
+
+class _TileSchemeHandler(QWebEngineUrlSchemeHandler):
+    """
+    Answers tiles:// requests from the cache, fetching and storing misses.
+    """
+    def __init__(self, model: TileCacheModel):
+        super().__init__()
+        self._model = model
+        self._network = QNetworkAccessManager(self)
+        self._pending = {}
+        self._held = []  # Bing requests waiting for the metadata
+        model.signal_bing_upstream_resolved.connect(self._on_bing_upstream_resolved)
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob):
+        url = job.requestUrl()
+        layer = url.host()
+        try:
+            z, x, y = (int(part) for part in url.path().strip("/").split("/"))
+        except ValueError:
+            job.fail(QWebEngineUrlRequestJob.UrlInvalid)
+            return
+        if layer not in TileCacheModel.LAYERS:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+
+        if (layer == "bing" and self._model.upstream_url(layer, z, x, y) is None
+                and not self._model.has_tile(layer, z, x, y)):
+            if self._model.bing_upstream_pending:
+                self._held.append((job, z, x, y))
+                return
+            # No Bing imagery template: show OpenStreetMap instead
+            layer = "osm"
+        self._serve(job, layer, z, x, y)
+
+    @pyqtSlot()
+    def _on_bing_upstream_resolved(self):
+        held, self._held = self._held, []
+        for job, z, x, y in held:
+            layer = "bing" if self._model.upstream_url("bing", z, x, y) is not None else "osm"
+            try:
+                self._serve(job, layer, z, x, y)
+            except RuntimeError:
+                # The page dropped the request meanwhile
+                pass
+
+    def _serve(self, job: QWebEngineUrlRequestJob, layer: str, z: int, x: int, y: int):
+        """Replies from the cache of `layer`, or fetches the tile from upstream."""
+        data = self._model.get_tile(layer, z, x, y)
+        if data is not None:
+            self._reply(job, data)
+            return
+        upstream = self._model.upstream_url(layer, z, x, y)
+        if upstream is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        request = QNetworkRequest(QUrl(upstream))
+        request.setHeader(QNetworkRequest.UserAgentHeader, USER_AGENT)
+        reply = self._network.get(request)
+        self._pending[reply] = (job, layer, z, x, y)
+        reply.finished.connect(lambda reply=reply: self._on_fetched(reply))
+
+    @pyqtSlot()
+    def _on_fetched(self, reply: QNetworkReply):
+        job, layer, z, x, y = self._pending.pop(reply)
+        reply.deleteLater()
+        try:
+            if reply.error() != QNetworkReply.NoError:
+                job.fail(QWebEngineUrlRequestJob.RequestFailed)
+                return
+            data = bytes(reply.readAll())
+            self._model.put_tile(layer, z, x, y, data)
+            self._reply(job, data)
+        except RuntimeError:
+            # The page dropped the request (e.g. tile scrolled out of view).
+            pass
+
+    @staticmethod
+    def _reply(job: QWebEngineUrlRequestJob, data: bytes):
+        content_type = b"image/jpeg" if data[:2] == b"\xff\xd8" else b"image/png"
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(content_type, buffer)
@@ -0,0 +1,219 @@
+# waypoint_log_table_model.py
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# One record per logged waypoint. fix_status is the NavSatStatus status of the
+# GPS fix the waypoint was taken from (-1: no fix / unknown). Averaged captures
+# also store the east/north standard deviation of the fixes used and their
+# count; single-fix waypoints have NaN deviations and 1 sample.
+WAYPOINT_LOG_DTYPE = np.dtype([
+    ('latitude', np.float64),
+    ('longitude', np.float64),
+    ('yaw', np.float64),
+    ('timestamp', np.float64),
+    ('fix_status', np.int8),
+    ('std_east_m', np.float64),
+    ('std_north_m', np.float64),
+    ('samples', np.int32),
+    ('mark_id', np.int64),
+])
+
+
+class WaypointLogTableModel(QAbstractTableModel):
+    """
+    Table model of the logged waypoints, backed by a growable NumPy
+    structured array (see WAYPOINT_LOG_DTYPE).
+
+    Values keep their full float precision in the array and are formatted
+    only when a cell is displayed. Appends are amortized O(1): the storage
+    doubles when full.
+    """
+
+    # Fields of a row tuple, as used by rows()/extend_rows() and the session journal
+    ROW_FIELDS = [name for name in WAYPOINT_LOG_DTYPE.names if name != 'mark_id']
+
+    HEADERS = ['Lat', 'Lon', 'Hdg']
+    COLUMNS = ['latitude', 'longitude', 'yaw']
+    FORMATS = ['{:.7f}', '{:.7f}', '{:.3f}']
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._data = np.zeros(self.INITIAL_CAPACITY, dtype=WAYPOINT_LOG_DTYPE)
+        self._size = 0
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._size
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= self._size:
+            return None
+        record = self._data[index.row()]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            return self.FORMATS[column].format(record[self.COLUMNS[column]])
+        if role == Qt.ToolTipRole:
+            return (f"lat: {float(record['latitude'])!r}\n"
+                    f"lon: {float(record['longitude'])!r}\n"
+                    f"yaw: {float(record['yaw'])!r} rad\n"
+                    f"time: {time.strftime('%H:%M:%S', time.localtime(record['timestamp']))}\n"
+                    f"fix status: {record['fix_status']}\n"
+                    f"spread: {record['std_east_m']:.3f} / {record['std_north_m']:.3f} m (E/N)"
+                    f" over {record['samples']} fixes")
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    # --- Editing API ---
+
+    def append(self, latitude: float, longitude: float, yaw: float,
+               timestamp: Optional[float] = None, fix_status: int = -1,
+               mark_id: Optional[int] = None, std_east_m: float = np.nan,
+               std_north_m: float = np.nan, samples: int = 1) -> int:
+        """
+        Appends a waypoint and returns its row.
+        """
+        row = self._size
+        self._reserve(row + 1)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._data[row] = (
+            latitude, longitude, yaw,
+            time.time() if timestamp is None else timestamp,
+            fix_status,
+            std_east_m,
+            std_north_m,
+            samples,
+            -1 if mark_id is None else mark_id,
+        )
+        self._size += 1
+        self.endInsertRows()
+        return row
+
+    def extend(self, latitudes, longitudes, yaws, mark_ids=None,
+               timestamp: Optional[float] = None, fix_status: int = -1) -> None:
+        """
+        Appends many waypoints at once from equally long sequences,
+        with a single row insertion notification.
+        """
+        count = len(latitudes)
+        if count == 0:
+            return
+        start = self._size
+        self._reserve(start + count)
+        self.beginInsertRows(QModelIndex(), start, start + count - 1)
+        rows = self._data[start:start + count]
+        rows['latitude'] = latitudes
+        rows['longitude'] = longitudes
+        rows['yaw'] = yaws
+        rows['timestamp'] = time.time() if timestamp is None else timestamp
+        rows['fix_status'] = fix_status
+        rows['std_east_m'] = np.nan
+        rows['std_north_m'] = np.nan
+        rows['samples'] = 1
+        rows['mark_id'] = -1 if mark_ids is None else mark_ids
+        self._size += count
+        self.endInsertRows()
+
+    def extend_rows(self, rows, mark_ids=None) -> None:
+        """
+        Appends row tuples in ROW_FIELDS order, e.g. from rows().
+        """
+        if not rows:
+            return
+        start = self._size
+        self._reserve(start + len(rows))
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        block = self._data[start:start + len(rows)]
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(self.ROW_FIELDS))
+        for column, name in enumerate(self.ROW_FIELDS):
+            block[name] = values[:, column]
+        block['mark_id'] = -1 if mark_ids is None else mark_ids
+        self._size += len(rows)
+        self.endInsertRows()
+
+    def remove(self, row: int) -> None:
+        if not 0 <= row < self._size:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._data[row:self._size - 1] = self._data[row + 1:self._size]
+        self._size -= 1
+        self.endRemoveRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._size = 0
+        self.endResetModel()
+
+    # --- Access ---
+
+    def records(self) -> np.ndarray:
+        """
+        Returns a copy of the logged records as a structured array.
+        """
+        return self._data[:self._size].copy()
+
+    def row_values(self, row: int) -> tuple:
+        """
+        Returns a row as a tuple of plain values in ROW_FIELDS order.
+        """
+        return self._data[row:row + 1][self.ROW_FIELDS].tolist()[0]
+
+    def rows(self) -> List[tuple]:
+        """
+        Returns all rows as tuples of plain values in ROW_FIELDS order.
+        """
+        return self._data[:self._size][self.ROW_FIELDS].tolist()
+
+    def mark_id(self, row: int) -> Optional[int]:
+        """
+        Returns the map marker id of a row, or None.
+        """
+        if not 0 <= row < self._size:
+            return None
+        mark_id = int(self._data['mark_id'][row])
+        return None if mark_id < 0 else mark_id
+
+    def mark_ids(self) -> List[int]:
+        mark_ids = self._data['mark_id'][:self._size]
+        return mark_ids[mark_ids >= 0].tolist()
+
+    def to_waypoints(self) -> List[dict]:
+        """
+        Returns the waypoints as dictionaries with keys 'latitude',
+        'longitude' and 'heading', read straight from the array.
+        """
+        records = self._data[:self._size]
+        return [
+            {'latitude': latitude, 'longitude': longitude, 'heading': yaw}
+            for latitude, longitude, yaw in zip(
+                records['latitude'].tolist(),
+                records['longitude'].tolist(),
+                records['yaw'].tolist(),
+            )
+        ]
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._data):
+            return
+        capacity = len(self._data)
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros(capacity, dtype=WAYPOINT_LOG_DTYPE)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
@@ -0,0 +1,43 @@
+import math
+from typing import Optional
+
+from app.utils.geo import local_meters_per_degree
+
+
+class AutoLogTrigger:
+    """
+    Decides when to log a waypoint automatically from a stream of fixes.
+
+    A fix triggers once it lies at least `min_distance_m` from the last
+    logged waypoint, or its heading differs from the last logged heading by
+    at least `min_heading_change_rad`. Distances are measured in a local ENU
+    plane anchored at the last logged waypoint, so each check is O(1).
+    """
+    def __init__(self, min_distance_m: float = 1.0, min_heading_change_rad: float = 0.35):
+        self._min_distance_sq = float(min_distance_m) ** 2
+        self._min_heading_change = float(min_heading_change_rad)
+        self._reference: Optional[tuple] = None  # (lat, lon, yaw, m/deg east, m/deg north)
+
+    def reset(self) -> None:
+        """Forgets the last logged waypoint; the next fix triggers."""
+        self._reference = None
+
+    def mark_logged(self, latitude: float, longitude: float, yaw: float) -> None:
+        """Anchors the checks at a waypoint that was just logged."""
+        east, north = local_meters_per_degree(latitude)
+        self._reference = (latitude, longitude, yaw, east, north)
+
+    def should_log(self, latitude: float, longitude: float, yaw: float) -> bool:
+        """
+        Returns True if a waypoint should be logged at this fix.
+        """
+        if self._reference is None:
+            return True
+        ref_lat, ref_lon, ref_yaw, east, north = self._reference
+        dx = (longitude - ref_lon) * east
+        dy = (latitude - ref_lat) * north
+        if dx * dx + dy * dy >= self._min_distance_sq:
+            return True
+        # Smallest signed angle between the two headings
+        dyaw = (yaw - ref_yaw + math.pi) % (2.0 * math.pi) - math.pi
+        return abs(dyaw) >= self._min_heading_change
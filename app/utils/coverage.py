@@ -0,0 +1,315 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Upper bound on lanes x edges evaluated at once while clipping, to keep
+# the intermediate arrays small for long boundaries.
+CLIP_CHUNK_CELLS = 2_000_000
+
+# Distance under which a point counts as lying on the boundary
+BOUNDARY_TOLERANCE_M = 1e-6
+
+# Longest corner offset of inset_polygon(), in multiples of the distance
+MAX_MITER = 4.0
+
+
+def longest_edge_angle(polygon: np.ndarray) -> float:
+    """
+    Returns the direction in radians (ENU, counter-clockwise from east) of
+    the longest edge of a closed polygon given as an (n, 2) array.
+    """
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    dx, dy = edges[np.argmax(np.hypot(edges[:, 0], edges[:, 1]))]
+    return math.atan2(dy, dx)
+
+
+def clip_lanes(polygon: np.ndarray, lane_ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clips horizontal lanes y = lane_ys against a polygon with the even-odd rule.
+
+    Returns:
+        tuple: (lane index, (k, 2) array of [x_start, x_end]) for every
+        interval inside the polygon, sorted by lane then by x.
+    """
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    slope = np.divide(x2 - x1, y2 - y1, out=np.zeros_like(x1), where=y2 != y1)
+
+    lane_parts, interval_parts = [], []
+    chunk = max(1, CLIP_CHUNK_CELLS // len(polygon))
+    for start in range(0, len(lane_ys), chunk):
+        ys = lane_ys[start:start + chunk, None]
+        # Half-open test so a vertex on a lane is counted once
+        crosses = (y1 <= ys) != (y2 <= ys)
+        xs = np.where(crosses, x1 + (ys - y1) * slope, np.inf)
+        xs.sort(axis=1)
+        counts = crosses.sum(axis=1)
+        max_count = counts.max() if len(counts) else 0
+        for k in range(0, max_count - 1, 2):
+            has_pair = counts >= k + 2
+            lane_parts.append(np.nonzero(has_pair)[0] + start)
+            interval_parts.append(xs[has_pair, k:k + 2])
+    if not lane_parts:
+        return np.empty(0, dtype=np.int64), np.empty((0, 2))
+    lanes = np.concatenate(lane_parts)
+    intervals = np.concatenate(interval_parts)
+    order = np.lexsort((intervals[:, 0], lanes))
+    return lanes[order], intervals[order]
+
+
+def _orientation(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Cross product (b - a) x (c - a), broadcast over the leading axes."""
+    return ((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+            - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+
+def contains_points(polygon: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Even-odd test of (k, 2) points against a polygon; returns a (k,) bool array."""
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    slope = np.divide(x2 - x1, y2 - y1, out=np.zeros_like(x1), where=y2 != y1)
+    inside = np.zeros(len(points), dtype=bool)
+    chunk = max(1, CLIP_CHUNK_CELLS // len(polygon))
+    for start in range(0, len(points), chunk):
+        xs, ys = points[start:start + chunk, 0, None], points[start:start + chunk, 1, None]
+        crosses = (y1 <= ys) != (y2 <= ys)
+        left = crosses & (xs < x1 + (ys - y1) * slope)
+        inside[start:start + chunk] = left.sum(axis=1) % 2 == 1
+    return inside
+
+
+def segments_inside(polygon: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Tells for each segment starts[i] -> ends[i] whether it stays inside the
+    polygon: it crosses no boundary edge and its midpoint is inside.
+    Segments running along the boundary count as inside.
+    """
+    edge_a = polygon[None, :, :]
+    edge_b = np.roll(polygon, -1, axis=0)[None, :, :]
+    inside = np.zeros(len(starts), dtype=bool)
+    chunk = max(1, CLIP_CHUNK_CELLS // len(polygon))
+    for start in range(0, len(starts), chunk):
+        p = starts[start:start + chunk, None, :]
+        q = ends[start:start + chunk, None, :]
+        crossing = ((_orientation(p, q, edge_a) * _orientation(p, q, edge_b) < 0)
+                    & (_orientation(edge_a, edge_b, p) * _orientation(edge_a, edge_b, q) < 0))
+        inside[start:start + chunk] = ~crossing.any(axis=1)
+    midpoints = (starts + ends) / 2.0
+    outside = inside & ~contains_points(polygon, midpoints)
+    inside[outside] = [_nearest_on_boundary(polygon, point)[2] <= BOUNDARY_TOLERANCE_M
+                       for point in midpoints[outside]]
+    return inside
+
+
+def _nearest_on_boundary(polygon: np.ndarray, point: np.ndarray) -> Tuple[int, np.ndarray, float]:
+    """Returns the boundary edge nearest to `point`, the nearest point on it and its distance."""
+    a = polygon
+    d = np.roll(polygon, -1, axis=0) - a
+    length_sq = (d ** 2).sum(axis=1)
+    t = np.divide(((point - a) * d).sum(axis=1), length_sq,
+                  out=np.zeros(len(a)), where=length_sq > 0)
+    closest = a + np.clip(t, 0.0, 1.0)[:, None] * d
+    distances = np.hypot(*(point - closest).T)
+    edge = int(np.argmin(distances))
+    return edge, closest[edge], float(distances[edge])
+
+
+def boundary_route(polygon: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    Routes from `start` to `end`, both inside the polygon, along its
+    boundary the shorter way round.
+
+    Returns:
+        (k, 2) array of the intermediate points: the boundary point nearest
+        to `start`, the boundary vertices on the way, and the boundary point
+        nearest to `end`.
+    """
+    n = len(polygon)
+    start_edge, start_point, _ = _nearest_on_boundary(polygon, start)
+    end_edge, end_point, _ = _nearest_on_boundary(polygon, end)
+    # Edge i runs from vertex i to vertex i + 1
+    forward = polygon[[(start_edge + 1 + k) % n for k in range((end_edge - start_edge) % n)]]
+    backward = polygon[[(start_edge - k) % n for k in range((start_edge - end_edge) % n)]]
+    routes = [np.vstack((start_point, vertices, end_point)) for vertices in (forward, backward)]
+    lengths = [np.hypot(*np.diff(route, axis=0).T).sum() for route in routes]
+    return routes[int(np.argmin(lengths))]
+
+
+def inset_polygon(polygon: np.ndarray, distance: float) -> np.ndarray:
+    """
+    Moves every vertex of a polygon `distance` inward along its corner
+    bisector (a mitered offset; miters are capped at MAX_MITER times the
+    distance). Features narrower than twice the distance fold over, so
+    callers check paths on the result against the original polygon.
+    """
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    edges = edges / np.maximum(lengths, 1e-12)[:, None]
+    # Left normals point inward on a counter-clockwise polygon
+    area = np.sum(polygon[:, 0] * np.roll(polygon[:, 1], -1)
+                  - np.roll(polygon[:, 0], -1) * polygon[:, 1])
+    normals = np.column_stack((-edges[:, 1], edges[:, 0])) * (1.0 if area > 0 else -1.0)
+    incoming, outgoing = np.roll(normals, 1, axis=0), normals
+    # (n1 + n2) / (1 + n1.n2) has length 1 / cos(half the turn)
+    offsets = (incoming + outgoing) / np.maximum(
+        1.0 + (incoming * outgoing).sum(axis=1), 1e-12)[:, None]
+    lengths_sq = (offsets ** 2).sum(axis=1)
+    too_long = lengths_sq > MAX_MITER ** 2
+    offsets[too_long] *= (MAX_MITER / np.sqrt(lengths_sq[too_long]))[:, None]
+    return polygon + distance * offsets
+
+
+def decompose_cells(lanes: np.ndarray, intervals: np.ndarray) -> List[np.ndarray]:
+    """
+    Boustrophedon cell decomposition of clipped lane intervals (see
+    clip_lanes).
+
+    A cell is a run of intervals on consecutive lanes where each interval
+    overlaps exactly one interval of the next lane and vice versa; a lane
+    splitting or merging around an obstacle or a notch of the boundary
+    starts new cells.
+
+    Returns:
+        list: Cells as arrays of interval indices, from the first lane up.
+    """
+    count = len(lanes)
+    if count == 0:
+        return []
+    # Intervals come sorted by lane, then by x, and do not overlap within a
+    # lane, so both their starts and ends increase along the lane. Keying
+    # them by lane + normalized x lets one searchsorted find, for every
+    # interval, the overlapping range of intervals in the next lane.
+    x_min = intervals.min()
+    span = max(intervals.max() - x_min, 1e-9) * (1.0 + 1e-9)
+    normalized = (intervals - x_min) / span
+    start_keys = lanes + normalized[:, 0]
+    end_keys = lanes + normalized[:, 1]
+    # Next lane: ends past this start, and starts before this end
+    up_first = np.searchsorted(end_keys, lanes + 1 + normalized[:, 0], side='right')
+    up_count = np.searchsorted(start_keys, lanes + 1 + normalized[:, 1], side='left') - up_first
+    # Previous lane, likewise
+    down_first = np.searchsorted(end_keys, lanes - 1 + normalized[:, 0], side='right')
+    down_count = np.searchsorted(start_keys, lanes - 1 + normalized[:, 1], side='left') - down_first
+
+    # Link pairs that only overlap each other; each interval then has at
+    # most one link below, and cells are the chains of links
+    below = np.full(count, -1, dtype=np.int64)
+    linked = np.nonzero(up_count == 1)[0]
+    above = up_first[linked]
+    linked_ok = down_count[above] == 1
+    below[above[linked_ok]] = linked[linked_ok]
+
+    cell_of = np.empty(count, dtype=np.int64)
+    cell_count = 0
+    for j, i in enumerate(below.tolist()):
+        if i < 0:
+            cell_of[j] = cell_count
+            cell_count += 1
+        else:
+            cell_of[j] = cell_of[i]
+    order = np.argsort(cell_of, kind='stable')
+    return np.split(order, np.cumsum(np.bincount(cell_of, minlength=cell_count))[:-1])
+
+
+def boustrophedon_path(polygon: np.ndarray, swath_width_m: float, headland_m: float = 0.0,
+                       angle: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Plans back-and-forth coverage lanes inside a polygon in a local ENU frame.
+
+    Lanes are `swath_width_m` apart and run along `angle` (radians, ENU),
+    by default the direction of the longest boundary edge. Each lane is
+    shortened by `headland_m` at both ends, leaving room for the turn into
+    the next lane. Concave fields are split into cells (see
+    decompose_cells), covered one after the other starting with the cell
+    nearest to the end of the previous one. Connections that would leave
+    the field are routed along its boundary, inset by `headland_m` where
+    the inset boundary stays inside the field.
+
+    Args:
+        polygon: (n, 2) array of boundary vertices in meters (east, north).
+
+    Returns:
+        tuple: (m, 2) array of path points (the entry and exit of every lane
+        interval, plus boundary points where a connection is routed), and
+        (m,) array of ENU yaw in radians along the path.
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    if len(polygon) < 3 or swath_width_m <= 0.0:
+        return np.empty((0, 2)), np.empty(0)
+    if angle is None:
+        angle = longest_edge_angle(polygon)
+
+    # Rotate the field so lanes are horizontal
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    rotation = np.array([[cos_a, -sin_a], [sin_a, cos_a]])
+    local = polygon @ rotation
+
+    y_min, y_max = local[:, 1].min(), local[:, 1].max()
+    lane_ys = np.arange(y_min + swath_width_m / 2.0, y_max, swath_width_m)
+    lanes, intervals = clip_lanes(local, lane_ys)
+    cells = decompose_cells(lanes, intervals)
+
+    # Leave the headland free at both ends of every interval
+    intervals = intervals + np.array([headland_m, -headland_m])
+    keep = intervals[:, 1] > intervals[:, 0]
+    cells = [cell for cell in (cell[keep[cell]] for cell in cells) if len(cell)]
+    if not cells:
+        return np.empty((0, 2)), np.empty(0)
+
+    # Entry candidates of every cell: its first or last lane, from the
+    # left or the right end
+    firsts = np.array([cell[0] for cell in cells])
+    lasts = np.array([cell[-1] for cell in cells])
+    candidates = np.stack([
+        np.column_stack((intervals[ends, side], lane_ys[lanes[ends]]))
+        for ends in (firsts, lasts) for side in (0, 1)
+    ], axis=1)  # (cells, 4, 2)
+
+    # Visit the cells greedily, each entered at the candidate nearest to
+    # the previous exit
+    entries, exits, backward = [], [], []
+    visited = np.zeros(len(cells), dtype=bool)
+    position = None
+    for _ in range(len(cells)):
+        if position is None:
+            cell_index, candidate = 0, 0
+        else:
+            costs = np.hypot(*(candidates - position).transpose(2, 0, 1))
+            costs[visited] = np.inf
+            cell_index, candidate = np.unravel_index(np.argmin(costs), costs.shape)
+        visited[cell_index] = True
+        cell = cells[cell_index] if candidate < 2 else cells[cell_index][::-1]
+        reverse = (candidate % 2 == 1) != (np.arange(len(cell)) % 2 == 1)
+        ys = lane_ys[lanes[cell]]
+        entries.append(np.column_stack((np.where(reverse, intervals[cell, 1], intervals[cell, 0]), ys)))
+        exits.append(np.column_stack((np.where(reverse, intervals[cell, 0], intervals[cell, 1]), ys)))
+        backward.append(reverse)
+        position = exits[-1][-1]
+    entries, exits = np.concatenate(entries), np.concatenate(exits)
+    backward = np.concatenate(backward)
+
+    # Route the connections leaving the field along its boundary, inset by
+    # the headland where that stays inside the field
+    inset = inset_polygon(local, headland_m) if headland_m > 0.0 else local
+    lane_points = np.stack((entries, exits), axis=1)
+    lane_yaws = np.repeat(np.where(backward, angle + math.pi, angle), 2)
+    points, yaws = [], []
+    start = 0
+    for k in (np.nonzero(~segments_inside(local, exits[:-1], entries[1:]))[0] + 1).tolist():
+        points.append(lane_points[start:k].reshape(-1, 2))
+        yaws.append(lane_yaws[2 * start:2 * k])
+        route = boundary_route(inset, exits[k - 1], entries[k])
+        legs = np.vstack((exits[k - 1], route, entries[k]))
+        if inset is not local and not segments_inside(local, legs[:-1], legs[1:]).all():
+            route = boundary_route(local, exits[k - 1], entries[k])
+        # Routed points head to the next point
+        ahead = np.vstack((route[1:], entries[k])) - route
+        points.append(route)
+        yaws.append(np.arctan2(ahead[:, 1], ahead[:, 0]) + angle)
+        start = k
+    points.append(lane_points[start:].reshape(-1, 2))
+    yaws.append(lane_yaws[2 * start:])
+    points = np.concatenate(points)
+    yaws = (np.concatenate(yaws) + math.pi) % (2.0 * math.pi) - math.pi
+    return points @ rotation.T, yaws
@@ -0,0 +1,116 @@
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.utils.geo import local_meters_per_degree
+
+# Squared Mahalanobis distance beyond which a fix is an outlier:
+# the 99% quantile of the chi-square distribution with 2 degrees of freedom.
+OUTLIER_MAHALANOBIS_SQ = 9.21
+
+# Variance assumed for fixes without a usable covariance, in m^2
+DEFAULT_VARIANCE_M2 = 1.0
+
+
+class FixAverager:
+    """
+    Ring buffer of recent GPS fixes used to capture averaged waypoints.
+
+    Each fix is stored with its east/north variances from the NavSatFix
+    position covariance. An average is the inverse-variance weighted mean of
+    the selected fixes in a local ENU plane, after dropping fixes whose
+    squared Mahalanobis distance to the window's median exceeds
+    OUTLIER_MAHALANOBIS_SQ.
+    """
+    # Columns of the ring buffer
+    LAT, LON, VAR_E, VAR_N, STAMP = range(5)
+
+    def __init__(self, capacity: int = 100):
+        self._capacity = capacity
+        self._buffer = np.empty((capacity, 5), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def append(self, latitude: float, longitude: float,
+               position_covariance: Optional[Sequence[float]] = None,
+               timestamp: Optional[float] = None) -> None:
+        """
+        Adds a fix. `position_covariance` is the row-major 3x3 ENU covariance
+        of a NavSatFix; non-positive variances fall back to DEFAULT_VARIANCE_M2.
+        """
+        var_e = var_n = DEFAULT_VARIANCE_M2
+        if position_covariance is not None and len(position_covariance) >= 5:
+            if position_covariance[0] > 0.0:
+                var_e = position_covariance[0]
+            if position_covariance[4] > 0.0:
+                var_n = position_covariance[4]
+        self._buffer[self._next] = (
+            latitude, longitude, var_e, var_n,
+            time.monotonic() if timestamp is None else timestamp,
+        )
+        self._next = (self._next + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def average(self, count: Optional[int] = None,
+                since: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """
+        Averages the last `count` fixes, or the fixes stamped at or after
+        `since` (time.monotonic() seconds), or the whole buffer.
+
+        Returns:
+            dict: 'latitude', 'longitude', 'std_east_m', 'std_north_m',
+            'samples' (fixes used) and 'rejected' (outliers dropped), or
+            None if no fix was selected (including for `count` <= 0).
+        """
+        # Fixes in chronological order
+        order = (np.arange(self._size) + self._next - self._size) % self._capacity
+        fixes = self._buffer[order]
+        if since is not None:
+            fixes = fixes[fixes[:, self.STAMP] >= since]
+        if count is not None:
+            if count <= 0:
+                return None
+            fixes = fixes[-count:]
+        if len(fixes) == 0:
+            return None
+
+        # Local ENU offsets in meters around the newest fix
+        ref_lat, ref_lon = fixes[-1, self.LAT], fixes[-1, self.LON]
+        east_scale, north_scale = local_meters_per_degree(ref_lat)
+        offsets = np.column_stack((
+            (fixes[:, self.LON] - ref_lon) * east_scale,
+            (fixes[:, self.LAT] - ref_lat) * north_scale,
+        ))
+        weights = 1.0 / fixes[:, [self.VAR_E, self.VAR_N]]
+
+        # Mahalanobis-style test against a robust center and per-axis scale
+        # (median / MAD), floored by the receiver's own reported variance so
+        # a tight cluster of identical fixes does not reject everything.
+        center = np.median(offsets, axis=0)
+        mad_var = (1.4826 * np.median(np.abs(offsets - center), axis=0)) ** 2
+        var = np.maximum(mad_var, np.median(fixes[:, [self.VAR_E, self.VAR_N]], axis=0))
+        d_sq = (((offsets - center) ** 2) / var).sum(axis=1)
+        keep = d_sq <= OUTLIER_MAHALANOBIS_SQ
+
+        kept_offsets, kept_weights = offsets[keep], weights[keep]
+        mean = np.average(kept_offsets, axis=0, weights=kept_weights)
+        if len(kept_offsets) > 1:
+            std = np.sqrt(np.average((kept_offsets - mean) ** 2, axis=0, weights=kept_weights))
+        else:
+            std = np.sqrt(1.0 / kept_weights[0])
+        return {
+            'latitude': float(ref_lat + mean[1] / north_scale),
+            'longitude': float(ref_lon + mean[0] / east_scale),
+            'std_east_m': float(std[0]),
+            'std_north_m': float(std[1]),
+            'samples': int(keep.sum()),
+            'rejected': int(len(fixes) - keep.sum()),
+        }
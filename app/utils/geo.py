@@ -0,0 +1,331 @@
+"""
+WGS84 geodesy helpers.
+
+All functions accept scalars or NumPy arrays (broadcast together) with
+angles in degrees and lengths in meters, and return NumPy values.
+Bearings are measured clockwise from north in [0, 360), like the NED
+bearings used on the map.
+"""
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+# Mean Earth radius in meters
+EARTH_RADIUS_M = 6371008.8
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1.0 / 298.257223563
+WGS84_B = WGS84_A * (1.0 - WGS84_F)
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)            # first eccentricity squared
+WGS84_EP2 = WGS84_E2 / (1.0 - WGS84_E2)         # second eccentricity squared
+
+# UTM
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+UTM_FALSE_NORTHING_SOUTH = 10000000.0
+
+# Krüger series coefficients for the transverse Mercator projection
+_N = WGS84_F / (2.0 - WGS84_F)
+_UTM_A = WGS84_A / (1.0 + _N) * (1.0 + _N ** 2 / 4.0 + _N ** 4 / 64.0)
+_UTM_ALPHA = (
+    _N / 2.0 - 2.0 * _N ** 2 / 3.0 + 5.0 * _N ** 3 / 16.0,
+    13.0 * _N ** 2 / 48.0 - 3.0 * _N ** 3 / 5.0,
+    61.0 * _N ** 3 / 240.0,
+)
+_UTM_BETA = (
+    _N / 2.0 - 2.0 * _N ** 2 / 3.0 + 37.0 * _N ** 3 / 96.0,
+    _N ** 2 / 48.0 + _N ** 3 / 15.0,
+    17.0 * _N ** 3 / 480.0,
+)
+_UTM_DELTA = (
+    2.0 * _N - 2.0 * _N ** 2 / 3.0 - 2.0 * _N ** 3,
+    7.0 * _N ** 2 / 3.0 - 8.0 * _N ** 3 / 5.0,
+    56.0 * _N ** 3 / 15.0,
+)
+_UTM_SQRT_N = 2.0 * math.sqrt(_N) / (1.0 + _N)
+
+
+def equirectangular_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Returns the approximate distance in meters between two nearby WGS84
+    points, using an equirectangular projection around their mean latitude.
+    Accurate to well below a centimeter over the few meters used for
+    trail simplification, and much cheaper than haversine.
+    """
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) * 0.5))
+    y = math.radians(lat2 - lat1)
+    return EARTH_RADIUS_M * math.hypot(x, y)
+
+
+def local_meters_per_degree(latitude: float) -> Tuple[float, float]:
+    """
+    Returns the (east, north) meters per degree of longitude and latitude
+    of a local tangent plane at the given latitude. Multiplying lon/lat
+    offsets by these factors projects nearby points to local ENU meters.
+    """
+    north = math.radians(1.0) * EARTH_RADIUS_M
+    return north * math.cos(math.radians(latitude)), north
+
+
+# --- Distances and bearings ---
+
+def haversine_distance(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Returns the great-circle distance in meters on the mean Earth sphere.
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(np.subtract(lon2, lon1))
+    h = np.sin(dphi / 2.0) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def initial_bearing(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Returns the initial great-circle bearing from point 1 to point 2 in degrees.
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlam = np.radians(np.subtract(lon2, lon1))
+    y = np.sin(dlam) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def vincenty_inverse(lat1, lon1, lat2, lon2, tolerance: float = 1e-12,
+                     max_iterations: int = 200) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Solves the inverse geodesic problem on the WGS84 ellipsoid with
+    Vincenty's formulae, iterating all pairs together until each converges.
+    Nearly antipodal pairs may not converge and keep their last iterate.
+
+    Returns:
+        tuple: (distance in meters, initial bearing, final bearing), bearings in degrees.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (lat1, lon1, lat2, lon2)))
+    big_l = np.radians(lon2 - lon1)
+    u1 = np.arctan((1.0 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1.0 - WGS84_F) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lam = big_l.copy()
+    active = np.ones(lam.shape, dtype=bool)
+    for _ in range(max_iterations):
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        sin_alpha = np.divide(cos_u1 * cos_u2 * sin_lam, sin_sigma,
+                              out=np.zeros_like(lam), where=sin_sigma != 0.0)
+        cos2_alpha = 1.0 - sin_alpha ** 2
+        # Equatorial lines have cos2_alpha == 0
+        cos_2sigma_m = np.divide(2.0 * sin_u1 * sin_u2, cos2_alpha,
+                                 out=np.zeros_like(lam), where=cos2_alpha != 0.0)
+        cos_2sigma_m = np.where(cos2_alpha != 0.0, cos_sigma - cos_2sigma_m, 0.0)
+        c = WGS84_F / 16.0 * cos2_alpha * (4.0 + WGS84_F * (4.0 - 3.0 * cos2_alpha))
+        lam_next = big_l + (1.0 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (
+                cos_2sigma_m + c * cos_sigma * (-1.0 + 2.0 * cos_2sigma_m ** 2)))
+        converged = np.abs(lam_next - lam) <= tolerance
+        lam = np.where(active, lam_next, lam)
+        active &= ~converged
+        if not active.any():
+            break
+
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1.0 + u_sq / 16384.0 * (4096.0 + u_sq * (-768.0 + u_sq * (320.0 - 175.0 * u_sq)))
+    big_b = u_sq / 1024.0 * (256.0 + u_sq * (-128.0 + u_sq * (74.0 - 47.0 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4.0 * (
+        cos_sigma * (-1.0 + 2.0 * cos_2sigma_m ** 2)
+        - big_b / 6.0 * cos_2sigma_m * (-3.0 + 4.0 * sin_sigma ** 2)
+        * (-3.0 + 4.0 * cos_2sigma_m ** 2)))
+    distance = WGS84_B * big_a * (sigma - delta_sigma)
+    bearing1 = np.arctan2(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+    bearing2 = np.arctan2(cos_u1 * sin_lam, -sin_u1 * cos_u2 + cos_u1 * sin_u2 * cos_lam)
+    return distance, np.degrees(bearing1) % 360.0, np.degrees(bearing2) % 360.0
+
+
+# --- ECEF ---
+
+def geodetic_to_ecef(lat, lon, alt=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts WGS84 latitude, longitude and ellipsoidal height to ECEF meters.
+    """
+    phi, lam = np.radians(lat), np.radians(lon)
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    prime_vertical = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_phi ** 2)
+    x = (prime_vertical + alt) * cos_phi * np.cos(lam)
+    y = (prime_vertical + alt) * cos_phi * np.sin(lam)
+    z = (prime_vertical * (1.0 - WGS84_E2) + alt) * sin_phi
+    return x, y, z
+
+
+def ecef_to_geodetic(x, y, z) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts ECEF meters to WGS84 latitude, longitude and ellipsoidal height
+    with Heikkinen's closed-form solution (no iteration, millimeter accuracy).
+    """
+    x, y, z = (np.asarray(value, dtype=np.float64) for value in (x, y, z))
+    p = np.hypot(x, y)
+    a2, b2 = WGS84_A ** 2, WGS84_B ** 2
+    f = 54.0 * b2 * z ** 2
+    g = p ** 2 + (1.0 - WGS84_E2) * z ** 2 - WGS84_E2 * (a2 - b2)
+    c = WGS84_E2 ** 2 * f * p ** 2 / g ** 3
+    s = np.cbrt(1.0 + c + np.sqrt(c ** 2 + 2.0 * c))
+    k = s + 1.0 + 1.0 / s
+    big_p = f / (3.0 * k ** 2 * g ** 2)
+    q = np.sqrt(1.0 + 2.0 * WGS84_E2 ** 2 * big_p)
+    r0 = (-big_p * WGS84_E2 * p / (1.0 + q)
+          + np.sqrt(np.maximum(
+              a2 / 2.0 * (1.0 + 1.0 / q)
+              - big_p * (1.0 - WGS84_E2) * z ** 2 / (q * (1.0 + q))
+              - big_p * p ** 2 / 2.0, 0.0)))
+    u = np.hypot(p - WGS84_E2 * r0, z)
+    v = np.sqrt((p - WGS84_E2 * r0) ** 2 + (1.0 - WGS84_E2) * z ** 2)
+    z0 = b2 * z / (WGS84_A * v)
+    alt = u * (1.0 - b2 / (WGS84_A * v))
+    lat = np.degrees(np.arctan2(z + WGS84_EP2 * z0, p))
+    lon = np.degrees(np.arctan2(y, x))
+    return lat, lon, alt
+
+
+def enu_rotation(lat0: float, lon0: float) -> np.ndarray:
+    """
+    Returns the 3x3 matrix rotating ECEF offsets into the ENU frame at an origin.
+    """
+    phi, lam = math.radians(lat0), math.radians(lon0)
+    sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+    sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+    return np.array([
+        [-sin_lam, cos_lam, 0.0],
+        [-sin_phi * cos_lam, -sin_phi * sin_lam, cos_phi],
+        [cos_phi * cos_lam, cos_phi * sin_lam, sin_phi],
+    ])
+
+
+class LocalTangentFrame:
+    """
+    East-North-Up frame tangent to the WGS84 ellipsoid at a fixed origin.
+
+    The origin's ECEF position and rotation are computed once, so repeated
+    conversions for a mission only pay for the vectorized transforms. Use
+    local_frame() to share one frame per origin.
+    """
+    def __init__(self, lat0: float, lon0: float, alt0: float = 0.0):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.alt0 = float(alt0)
+        self._origin = np.array(geodetic_to_ecef(self.lat0, self.lon0, self.alt0), dtype=np.float64)
+        self._rotation = enu_rotation(self.lat0, self.lon0)
+
+    def ecef_to_enu(self, x, y, z) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        dx = np.subtract(x, self._origin[0])
+        dy = np.subtract(y, self._origin[1])
+        dz = np.subtract(z, self._origin[2])
+        r = self._rotation
+        return (r[0, 0] * dx + r[0, 1] * dy,
+                r[1, 0] * dx + r[1, 1] * dy + r[1, 2] * dz,
+                r[2, 0] * dx + r[2, 1] * dy + r[2, 2] * dz)
+
+    def enu_to_ecef(self, east, north, up=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r = self._rotation
+        return (self._origin[0] + r[0, 0] * east + r[1, 0] * north + r[2, 0] * up,
+                self._origin[1] + r[0, 1] * east + r[1, 1] * north + r[2, 1] * up,
+                self._origin[2] + r[1, 2] * north + r[2, 2] * up)
+
+    def to_enu(self, lat, lon, alt=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Converts geodetic positions to (east, north, up) meters."""
+        return self.ecef_to_enu(*geodetic_to_ecef(lat, lon, alt))
+
+    def to_geodetic(self, east, north, up=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Converts (east, north, up) meters to latitude, longitude and height."""
+        return ecef_to_geodetic(*self.enu_to_ecef(east, north, up))
+
+
+@lru_cache(maxsize=32)
+def local_frame(lat0: float, lon0: float, alt0: float = 0.0) -> LocalTangentFrame:
+    """
+    Returns the cached LocalTangentFrame for a mission origin.
+    """
+    return LocalTangentFrame(lat0, lon0, alt0)
+
+
+def geodetic_to_enu(lat, lon, alt, lat0: float, lon0: float, alt0: float = 0.0):
+    """Converts geodetic positions to ENU meters around an origin."""
+    return local_frame(lat0, lon0, alt0).to_enu(lat, lon, alt)
+
+
+def enu_to_geodetic(east, north, up, lat0: float, lon0: float, alt0: float = 0.0):
+    """Converts ENU meters around an origin to geodetic positions."""
+    return local_frame(lat0, lon0, alt0).to_geodetic(east, north, up)
+
+
+# --- UTM ---
+
+def utm_zone(lon: float) -> int:
+    """
+    Returns the UTM zone number of a longitude (the Norway and Svalbard
+    exceptions are not applied).
+    """
+    return int((lon + 180.0) // 6.0) % 60 + 1
+
+
+def geodetic_to_utm(lat, lon, zone: int = None) -> Tuple[np.ndarray, np.ndarray, int, bool]:
+    """
+    Projects WGS84 positions to UTM with the 3rd order Krüger series
+    (millimeter accuracy within a zone). All points are projected in one
+    zone: `zone`, or by default the zone of the first point.
+
+    Returns:
+        tuple: (easting, northing, zone, northern hemisphere).
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if zone is None:
+        zone = utm_zone(float(lon.flat[0]))
+    northern = bool(lat.flat[0] >= 0.0)
+    lon0 = math.radians((zone - 1) * 6 - 180 + 3)
+
+    phi = np.radians(lat)
+    dlam = np.radians(lon) - lon0
+    t = np.sinh(np.arctanh(np.sin(phi)) - _UTM_SQRT_N * np.arctanh(_UTM_SQRT_N * np.sin(phi)))
+    xi_p = np.arctan2(t, np.cos(dlam))
+    eta_p = np.arctanh(np.sin(dlam) / np.sqrt(1.0 + t ** 2))
+    xi, eta = xi_p.copy(), eta_p.copy()
+    for j, alpha in enumerate(_UTM_ALPHA, start=1):
+        xi += alpha * np.sin(2 * j * xi_p) * np.cosh(2 * j * eta_p)
+        eta += alpha * np.cos(2 * j * xi_p) * np.sinh(2 * j * eta_p)
+    easting = UTM_FALSE_EASTING + UTM_K0 * _UTM_A * eta
+    northing = UTM_K0 * _UTM_A * xi + (0.0 if northern else UTM_FALSE_NORTHING_SOUTH)
+    return easting, northing, zone, northern
+
+
+def utm_to_geodetic(easting, northing, zone: int, northern: bool = True) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of geodetic_to_utm.
+
+    Returns:
+        tuple: (latitude, longitude) in degrees.
+    """
+    northing = np.asarray(northing, dtype=np.float64)
+    if not northern:
+        northing = northing - UTM_FALSE_NORTHING_SOUTH
+    xi = northing / (UTM_K0 * _UTM_A)
+    eta = (np.asarray(easting, dtype=np.float64) - UTM_FALSE_EASTING) / (UTM_K0 * _UTM_A)
+    xi_p, eta_p = xi.copy(), eta.copy()
+    for j, beta in enumerate(_UTM_BETA, start=1):
+        xi_p -= beta * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        eta_p -= beta * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+    chi = np.arcsin(np.sin(xi_p) / np.cosh(eta_p))
+    phi = chi.copy()
+    for j, delta in enumerate(_UTM_DELTA, start=1):
+        phi += delta * np.sin(2 * j * chi)
+    lon0 = (zone - 1) * 6 - 180 + 3
+    lon = lon0 + np.degrees(np.arctan2(np.sinh(eta_p), np.cos(xi_p)))
+    return np.degrees(phi), lon
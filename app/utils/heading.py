@@ -0,0 +1,33 @@
+import math
+from typing import Dict
+
+
+def quat_to_yaw_enu(x: float, y: float, z: float, w: float) -> float:
+    """
+    Returns the yaw (rotation about the up axis) of a quaternion in radians,
+    measured counter-clockwise from east in the ENU frame, in (-pi, pi].
+    """
+    return math.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+def yaw_enu_to_bearing_ned(yaw_enu: float) -> float:
+    """
+    Converts an ENU yaw in radians to a NED bearing in degrees,
+    measured clockwise from north in [0, 360).
+    """
+    return (90.0 - math.degrees(yaw_enu)) % 360.0
+
+
+def heading_from_quaternion(quat: Dict[str, float]) -> Dict[str, float]:
+    """
+    Computes the heading once from an orientation quaternion dict with keys
+    'x', 'y', 'z' and 'w'.
+
+    Returns:
+        dict: 'yaw_enu' in radians and 'bearing_ned' in degrees.
+    """
+    yaw_enu = quat_to_yaw_enu(quat['x'], quat['y'], quat['z'], quat['w'])
+    return {
+        'yaw_enu': yaw_enu,
+        'bearing_ned': yaw_enu_to_bearing_ned(yaw_enu),
+    }
@@ -0,0 +1,235 @@
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+from app.utils.logger import logger
+
+JOURNAL_MAGIC = b"MWJ\x01"
+
+# Record: header (type, payload length), payload, CRC32 of header + payload
+_HEADER = struct.Struct('<BH')
+_CRC = struct.Struct('<I')
+
+RECORD_LOGGED = 1
+RECORD_REMOVED = 2
+RECORD_CLEARED = 3
+RECORD_SAVED = 4
+
+# LOGGED payload: latitude, longitude, yaw, timestamp, fix_status,
+# std_east_m, std_north_m, samples
+LOGGED_PAYLOAD = struct.Struct('<ddddbddi')
+REMOVED_PAYLOAD = struct.Struct('<I')
+
+
+def _encode(record_type: int, payload: bytes = b"") -> bytes:
+    header = _HEADER.pack(record_type, len(payload))
+    return header + payload + _CRC.pack(zlib.crc32(header + payload))
+
+
+class WaypointJournal:
+    """
+    Append-only binary journal of a waypoint logging session.
+
+    Every logged, removed or cleared action is appended as a small
+    CRC-protected record, so the session survives a crash or power cut:
+    `replay()` rebuilds the logged rows and drops a torn record at the end.
+    Writes are flushed to the OS immediately but fsynced only when `sync()`
+    is called, so callers can batch the fsyncs.
+
+    Compaction rewrites the journal as a snapshot of the rows:
+    `begin_compaction()` takes the snapshot on the thread that appends the
+    records, and `compact()` writes it, e.g. in a worker thread. Records
+    appended in between are carried over to the new file before it replaces
+    the old one. A snapshot taken for a save ends with a SAVED record; a
+    journal that ends there holds no unsaved session and is not replayed.
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._dirty = False
+        self._tail = None  # records appended while a compaction runs
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def replay(self) -> List[Tuple]:
+        """
+        Reads the journal and opens it for appending.
+
+        Returns:
+            list: Logged rows as LOGGED_PAYLOAD tuples, in table order.
+        """
+        try:
+            return self._open()
+        except OSError as e:
+            logger.error(f"Waypoint journal {self._path} unavailable, session not journaled: {e}")
+            return []
+
+    def _open(self) -> List[Tuple]:
+        rows = []
+        good_size = 0
+        if os.path.exists(self._path):
+            with open(self._path, 'rb') as file:
+                data = file.read()
+            if data[:len(JOURNAL_MAGIC)] == JOURNAL_MAGIC:
+                rows, good_size, saved = self._apply(data)
+                if good_size < len(data):
+                    logger.warning(
+                        f"Dropped {len(data) - good_size} bytes of torn journal records "
+                        f"in {self._path}")
+                if saved:
+                    # The session was saved; start a new one
+                    rows, good_size = [], 0
+            elif data:
+                logger.warning(f"Ignoring unrecognized waypoint journal {self._path}")
+
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        with self._lock:
+            if good_size:
+                self._file = open(self._path, 'r+b')
+                self._file.truncate(good_size)
+                self._file.seek(good_size)
+            else:
+                self._file = open(self._path, 'wb')
+                self._file.write(JOURNAL_MAGIC)
+                self._file.flush()
+                self._dirty = True
+        return rows
+
+    @staticmethod
+    def _apply(data: bytes) -> Tuple[List[Tuple], int, bool]:
+        rows = []
+        saved = False
+        offset = len(JOURNAL_MAGIC)
+        while offset + _HEADER.size <= len(data):
+            record_type, length = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + length
+            if end + _CRC.size > len(data):
+                break
+            crc, = _CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[offset:end]):
+                break
+            payload = data[offset + _HEADER.size:end]
+            saved = record_type == RECORD_SAVED
+            if record_type == RECORD_LOGGED:
+                rows.append(LOGGED_PAYLOAD.unpack(payload))
+            elif record_type == RECORD_REMOVED:
+                row, = REMOVED_PAYLOAD.unpack(payload)
+                if row < len(rows):
+                    del rows[row]
+            elif record_type == RECORD_CLEARED:
+                rows.clear()
+            offset = end + _CRC.size
+        return rows, offset, saved
+
+    def _write(self, data: bytes) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self._file.flush()
+            self._dirty = True
+            if self._tail is not None:
+                self._tail.append(data)
+
+    def log(self, row: Sequence) -> None:
+        """Appends a logged row (a LOGGED_PAYLOAD tuple)."""
+        self._write(_encode(RECORD_LOGGED, LOGGED_PAYLOAD.pack(*row)))
+
+    def log_many(self, rows) -> None:
+        """Appends several logged rows in one write."""
+        self._write(b"".join(
+            _encode(RECORD_LOGGED, LOGGED_PAYLOAD.pack(*row)) for row in rows))
+
+    def remove(self, row: int) -> None:
+        self._write(_encode(RECORD_REMOVED, REMOVED_PAYLOAD.pack(row)))
+
+    def clear(self) -> None:
+        self._write(_encode(RECORD_CLEARED))
+
+    def sync(self) -> None:
+        """Forces the appended records to disk."""
+        with self._lock:
+            if self._file is None or not self._dirty:
+                return
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def begin_compaction(self, rows, saved: bool = False) -> Optional[bytes]:
+        """
+        Takes a snapshot of `rows`, the logged rows at the time of the call,
+        and starts carrying over the records appended from now on. Call it
+        from the thread appending the records, then pass the snapshot to
+        `compact()` or drop it with `abort_compaction()`.
+
+        Args:
+            saved: Marks the snapshot as saved, so it is not replayed.
+
+        Returns:
+            bytes: The snapshot, or None if the journal is closed or a
+            compaction is already pending.
+        """
+        with self._lock:
+            if self._file is None or self._tail is not None:
+                return None
+            self._tail = []
+        records = [_encode(RECORD_LOGGED, LOGGED_PAYLOAD.pack(*row)) for row in rows]
+        if saved:
+            records.append(_encode(RECORD_SAVED))
+        return JOURNAL_MAGIC + b"".join(records)
+
+    def abort_compaction(self) -> None:
+        """Drops a snapshot taken by `begin_compaction()`."""
+        with self._lock:
+            self._tail = None
+
+    def compact(self, snapshot: bytes) -> None:
+        """
+        Replaces the journal with a snapshot from `begin_compaction()` and
+        the records appended since. Blocking; meant to run in a worker thread.
+        """
+        temp_path = self._path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as temp:
+                temp.write(snapshot)
+                temp.flush()
+                os.fsync(temp.fileno())
+            with self._lock:
+                if self._file is None:
+                    # Closed meanwhile; keep the journal as it is
+                    os.remove(temp_path)
+                    return
+                with open(temp_path, 'ab') as temp:
+                    temp.write(b"".join(self._tail))
+                    temp.flush()
+                    os.fsync(temp.fileno())
+                os.replace(temp_path, self._path)
+                # Persist the rename itself, or a power cut can bring back the old journal
+                dir_fd = os.open(os.path.dirname(self._path) or ".", os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+                self._file.close()
+                self._file = open(self._path, 'ab')
+                self._dirty = False
+        except OSError as e:
+            logger.error(f"Failed to compact waypoint journal {self._path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        finally:
+            with self._lock:
+                self._tail = None
+
+    def close(self) -> None:
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
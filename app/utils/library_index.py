@@ -0,0 +1,201 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.geo import haversine_distance
+from app.utils.logger import logger
+from app.utils.yaml_io import load_yaml_file
+from app.utils.waypoint_formats import WAYPOINT_EXTENSIONS, load_waypoints
+
+KIND_WAYPOINTS = "waypoints"
+KIND_PARAMS = "params"
+
+LIBRARY_EXTENSIONS = {
+    KIND_WAYPOINTS: WAYPOINT_EXTENSIONS,
+    KIND_PARAMS: (".yaml", ".yml"),
+}
+
+# Vertices kept in a waypoint file's thumbnail polyline
+THUMBNAIL_POINTS = 64
+
+# Params values shown in the library, as paths under
+# controller_server/ros__parameters
+PARAMS_SUMMARY_KEYS = (
+    ("FollowPath", "desired_linear_vel"),
+    ("FollowPath", "lookahead_dist"),
+    ("general_goal_checker", "xy_goal_tolerance"),
+    ("general_goal_checker", "yaw_goal_tolerance"),
+)
+
+
+def summarize_waypoints(waypoints: np.ndarray) -> Dict[str, Any]:
+    """
+    Summarizes loaded waypoints (see waypoint_formats.load_waypoints): point
+    count, bounding box, path length in meters and a decimated thumbnail
+    polyline.
+    """
+    latlons = np.column_stack((waypoints["latitude"], waypoints["longitude"]))
+    summary = {"point_count": len(latlons), "length_m": 0.0, "bbox": None, "thumbnail": b""}
+    if len(latlons) == 0:
+        return summary
+    lats, lons = latlons[:, 0], latlons[:, 1]
+    summary["bbox"] = (float(lats.min()), float(lons.min()), float(lats.max()), float(lons.max()))
+    if len(latlons) > 1:
+        summary["length_m"] = float(haversine_distance(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+    picks = np.unique(np.linspace(0, len(latlons) - 1, THUMBNAIL_POINTS).astype(np.int64))
+    summary["thumbnail"] = latlons[picks].astype(np.float32).tobytes()
+    return summary
+
+
+def summarize_params(data: Any) -> Dict[str, Any]:
+    """
+    Picks the PARAMS_SUMMARY_KEYS values out of a parsed params file.
+    """
+    try:
+        parameters = data["controller_server"]["ros__parameters"]
+    except (KeyError, TypeError):
+        parameters = {}
+    values = {}
+    for section, key in PARAMS_SUMMARY_KEYS:
+        value = (parameters.get(section) or {}).get(key)
+        if value is not None:
+            values[key] = value
+    return {"values": values}
+
+
+class LibraryIndex:
+    """
+    SQLite index of the waypoint and params files in the data directory.
+
+    Each file is stored with its mtime and size and a small summary (see
+    summarize_waypoints / summarize_params), so the library can be listed
+    without opening the files. `refresh()` only parses files that were
+    added or changed since they were last indexed. Access is serialized
+    with a lock; refreshes are meant to run on the file I/O thread while
+    the GUI lists entries.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY, kind TEXT, mtime_ns INTEGER, size INTEGER,"
+                " point_count INTEGER, length_m REAL,"
+                " min_lat REAL, min_lon REAL, max_lat REAL, max_lon REAL,"
+                " thumbnail BLOB, params TEXT, error TEXT)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_kind ON files (kind)")
+
+    def _stored(self, kind: str) -> Dict[str, Tuple[int, int]]:
+        rows = self._conn.execute(
+            "SELECT path, mtime_ns, size FROM files WHERE kind=?", (kind,)).fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    @staticmethod
+    def _scan(kind: str, directory: str) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith(LIBRARY_EXTENSIONS[kind]) or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            logger.warning(f"Cannot scan library directory {directory}: {e}")
+        return files
+
+    def refresh(self, kind: str, directory: str,
+                max_files: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Brings the entries of `kind` in line with the files in `directory`.
+
+        Args:
+            max_files: Parses at most this many added or changed files;
+                call again to index the rest.
+
+        Returns:
+            tuple: Number of files added, updated or removed, and number of
+            added or changed files left to index.
+        """
+        files = self._scan(kind, directory)
+        with self._lock:
+            stored = self._stored(kind)
+        removed = [path for path in stored if path not in files]
+        changed = [path for path, key in files.items() if stored.get(path) != key]
+        left = 0
+        if max_files is not None and len(changed) > max_files:
+            left = len(changed) - max_files
+            changed = changed[:max_files]
+
+        rows = []
+        for path in changed:
+            rows.append(self._summarize(kind, path, *files[path]))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("DELETE FROM files WHERE path=?", [(path,) for path in removed])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, kind, mtime_ns, size, point_count,"
+                    " length_m, min_lat, min_lon, max_lat, max_lon, thumbnail, params, error)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        if changed or removed:
+            logger.debug(f"Library {kind}: indexed {len(changed)}, removed {len(removed)}, "
+                         f"{left} left")
+        return len(changed) + len(removed), left
+
+    @staticmethod
+    def _summarize(kind: str, path: str, mtime_ns: int, size: int) -> tuple:
+        point_count = length_m = thumbnail = params = error = None
+        bbox = (None, None, None, None)
+        try:
+            if kind == KIND_WAYPOINTS:
+                summary = summarize_waypoints(load_waypoints(path))
+                point_count, length_m = summary["point_count"], summary["length_m"]
+                thumbnail = summary["thumbnail"]
+                bbox = summary["bbox"] or bbox
+            else:
+                params = json.dumps(summarize_params(load_yaml_file(path))["values"])
+        except Exception as e:
+            # Keep unreadable files listed, with the reason
+            error = str(e)
+        return (path, kind, mtime_ns, size, point_count, length_m, *bbox, thumbnail, params, error)
+
+    def entries(self, kind: str) -> List[Dict[str, Any]]:
+        """
+        Returns the indexed files of `kind`, most recently modified first.
+        Thumbnails are (n, 2) float32 arrays of latitude, longitude.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, mtime_ns, size, point_count, length_m,"
+                " min_lat, min_lon, max_lat, max_lon, thumbnail, params, error"
+                " FROM files WHERE kind=? ORDER BY mtime_ns DESC", (kind,)).fetchall()
+        entries = []
+        for (path, mtime_ns, size, point_count, length_m,
+             min_lat, min_lon, max_lat, max_lon, thumbnail, params, error) in rows:
+            entries.append({
+                "path": path,
+                "name": os.path.basename(path),
+                "modified": mtime_ns / 1e9,
+                "size": size,
+                "point_count": point_count,
+                "length_m": length_m,
+                "bbox": None if min_lat is None else (min_lat, min_lon, max_lat, max_lon),
+                "thumbnail": np.frombuffer(thumbnail or b"", dtype=np.float32).reshape(-1, 2),
+                "params": json.loads(params) if params else {},
+                "error": error,
+            })
+        return entries
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,96 @@
+import math
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+# Web Mercator latitude limit, in degrees
+MAX_MERCATOR_LAT = 85.05112878
+
+
+class MarkLevelOfDetail:
+    """
+    Level-of-detail index over a large set of map marks.
+
+    Below `full_zoom` the marks are merged into screen-space grid clusters
+    of about `cell_px` pixels; each zoom level is computed once and cached
+    until the marks change. At `full_zoom` and above, the individual marks
+    inside the requested viewport are returned instead.
+    """
+    def __init__(self, cell_px: float = 24.0, full_zoom: int = 18):
+        self._cell_px = float(cell_px)
+        self._full_zoom = int(full_zoom)
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lon = np.empty(0, dtype=np.float64)
+        # Web Mercator coordinates at zoom 0, in pixels [0, 256)
+        self._x = np.empty(0, dtype=np.float64)
+        self._y = np.empty(0, dtype=np.float64)
+        self._clusters: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @property
+    def full_zoom(self) -> int:
+        return self._full_zoom
+
+    def __len__(self) -> int:
+        return len(self._lat)
+
+    def set_positions(self, positions: Iterable[Tuple[float, float]]) -> None:
+        """
+        Replaces the indexed marks with (latitude, longitude) pairs and drops
+        the cached clusters.
+        """
+        latlons = np.array(list(positions), dtype=np.float64).reshape(-1, 2)
+        self._lat = latlons[:, 0].copy()
+        self._lon = latlons[:, 1].copy()
+        lat_rad = np.radians(np.clip(self._lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+        self._x = (self._lon + 180.0) / 360.0 * 256.0
+        self._y = (1.0 - np.arcsinh(np.tan(lat_rad)) / math.pi) / 2.0 * 256.0
+        self._clusters.clear()
+
+    def clusters(self, zoom: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the grid clusters at a zoom level as (latitudes, longitudes,
+        counts), each cluster placed at the mean position of its marks.
+        """
+        zoom = int(zoom)
+        cached = self._clusters.get(zoom)
+        if cached is not None:
+            return cached
+        if len(self) == 0:
+            empty = np.empty(0, dtype=np.float64)
+            cached = (empty, empty, np.empty(0, dtype=np.int64))
+        else:
+            cell = self._cell_px / (1 << zoom)
+            cells_x = np.floor(self._x / cell).astype(np.int64)
+            cells_y = np.floor(self._y / cell).astype(np.int64)
+            # Combine both cell indices into one key; at most 2**32 cells per axis
+            keys = (cells_x << 32) | cells_y
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            latitudes = np.bincount(inverse, weights=self._lat) / counts
+            longitudes = np.bincount(inverse, weights=self._lon) / counts
+            cached = (latitudes, longitudes, counts)
+        self._clusters[zoom] = cached
+        return cached
+
+    def query(self, zoom: int, south: float, west: float,
+              north: float, east: float) -> Tuple[str, np.ndarray]:
+        """
+        Returns what to draw for a viewport.
+
+        Returns:
+            tuple: ("clusters", flat [lat, lon, count, ...]) below full_zoom,
+            or ("points", flat [lat, lon, ...]) at full resolution; only
+            entries inside the viewport bounds are included.
+        """
+        if zoom >= self._full_zoom:
+            inside = self._inside(self._lat, self._lon, south, west, north, east)
+            return "points", np.column_stack((self._lat[inside], self._lon[inside])).ravel()
+        latitudes, longitudes, counts = self.clusters(zoom)
+        inside = self._inside(latitudes, longitudes, south, west, north, east)
+        return "clusters", np.column_stack(
+            (latitudes[inside], longitudes[inside], counts[inside])).ravel()
+
+    @staticmethod
+    def _inside(latitudes: np.ndarray, longitudes: np.ndarray, south: float, west: float,
+                north: float, east: float) -> np.ndarray:
+        return ((latitudes >= south) & (latitudes <= north)
+                & (longitudes >= west) & (longitudes <= east))
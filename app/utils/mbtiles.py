@@ -0,0 +1,139 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+from app.utils.logger import logger
+
+
+class MBTilesCache:
+    """
+    Tile cache stored in an MBTiles (SQLite) file.
+
+    Tiles are addressed with slippy-map (XYZ) coordinates and stored with the
+    TMS row flip required by the MBTiles spec. An extra `last_used` column
+    drives LRU eviction once the stored tile bytes exceed `max_bytes`.
+    Access is serialized with a lock so the cache can be shared between the
+    GUI thread and background fetchers.
+    """
+
+    # Evict down to this fraction of the budget so eviction runs rarely.
+    EVICT_TARGET_RATIO = 0.9
+    # Number of cache hits buffered before their access times are written.
+    TOUCH_FLUSH_COUNT = 64
+
+    def __init__(self, path: str, max_bytes: int, name: str = ""):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._path = path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tiles ("
+                " zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,"
+                " tile_data BLOB, last_used REAL,"
+                " PRIMARY KEY (zoom_level, tile_column, tile_row))")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS tiles_last_used ON tiles (last_used)")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO metadata (name, value) VALUES ('name', ?)", (name,))
+            self._conn.execute(
+                "INSERT OR IGNORE INTO metadata (name, value) VALUES ('format', 'png')")
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(tile_data)), 0) FROM tiles").fetchone()[0]
+
+    @staticmethod
+    def _key(z: int, x: int, y: int):
+        # MBTiles stores rows in TMS order (origin bottom-left).
+        return z, x, (1 << z) - 1 - y
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Returns the tile data, or None on a cache miss."""
+        key = self._key(z, x, y)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tile_data FROM tiles"
+                " WHERE zoom_level=? AND tile_column=? AND tile_row=?", key).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_FLUSH_COUNT:
+                self._flush_touched()
+            return row[0]
+
+    def contains(self, z: int, x: int, y: int) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                self._key(z, x, y)).fetchone() is not None
+
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        """Stores a tile, evicting least recently used tiles over budget."""
+        key = self._key(z, x, y)
+        with self._lock:
+            with self._conn:
+                old = self._conn.execute(
+                    "SELECT LENGTH(tile_data) FROM tiles"
+                    " WHERE zoom_level=? AND tile_column=? AND tile_row=?", key).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tiles"
+                    " (zoom_level, tile_column, tile_row, tile_data, last_used)"
+                    " VALUES (?, ?, ?, ?, ?)", (*key, sqlite3.Binary(data), time.time()))
+            self._total_bytes += len(data) - (old[0] if old else 0)
+            if self._total_bytes > self._max_bytes:
+                self._evict()
+
+    def get_metadata(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM metadata WHERE name=?", (name,)).fetchone()
+            return row[0] if row else None
+
+    def set_metadata(self, name: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)", (name, value))
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.close()
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE tiles SET last_used=?"
+                " WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                [(used, *key) for key, used in self._touched.items()])
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        self._flush_touched()
+        target = int(self._max_bytes * self.EVICT_TARGET_RATIO)
+        evicted = 0
+        with self._conn:
+            while self._total_bytes > target:
+                rows = self._conn.execute(
+                    "SELECT zoom_level, tile_column, tile_row, LENGTH(tile_data)"
+                    " FROM tiles ORDER BY last_used LIMIT 256").fetchall()
+                if not rows:
+                    break
+                self._conn.executemany(
+                    "DELETE FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                    [row[:3] for row in rows])
+                self._total_bytes -= sum(row[3] for row in rows)
+                evicted += len(rows)
+        logger.info(f"Evicted {evicted} tiles from {self._path}")
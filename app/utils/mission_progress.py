@@ -0,0 +1,213 @@
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.utils.geo import local_frame
+
+# Upper bound on the number of cells of the segment grid
+MAX_GRID_CELLS = 1 << 22
+
+# Rings of cells searched around a fix before falling back to a full scan
+MAX_SEARCH_RINGS = 32
+
+# Segments within this distance of the nearest one are candidates for the
+# match, so adjacent lanes of a coverage path do not make progress jump.
+MATCH_TOLERANCE_M = 1.0
+
+# Cost in meters per meter of path between a candidate and the previous
+# match, added to the candidate's distance when choosing the match
+ALONG_TRACK_WEIGHT = 0.01
+
+
+class SegmentGrid:
+    """
+    Uniform grid over the segments of a polyline in a local metric frame.
+
+    Each segment is registered in every cell its bounding box overlaps, in
+    a CSR layout (cell_start / cell_segments). The cell size defaults to
+    the mean segment length, so a cell holds a few segments and a nearest
+    segment query scans a few rings of cells around the query point,
+    independently of the polyline's length.
+    """
+
+    def __init__(self, points: np.ndarray, cell_size: Optional[float] = None):
+        self._a = points[:-1]
+        self._b = points[1:]
+        self._d = self._b - self._a
+        self._length_sq = (self._d ** 2).sum(axis=1)
+
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        extent = np.maximum(hi - lo, 1e-9)
+        if cell_size is None:
+            cell_size = float(np.sqrt(self._length_sq).mean()) if len(self._d) else 1.0
+        cell_size = max(cell_size, 1e-3)
+        # Grow the cells until the grid fits the budget
+        while np.prod(np.floor(extent / cell_size) + 1) > MAX_GRID_CELLS:
+            cell_size *= 2.0
+        self._origin = lo
+        self._cell_size = cell_size
+        self._shape = (np.floor(extent / cell_size) + 1).astype(np.int64)
+
+        # Cell ranges covered by each segment's bounding box
+        seg_lo = self._cell_of(np.minimum(self._a, self._b))
+        seg_hi = self._cell_of(np.maximum(self._a, self._b))
+        spans = seg_hi - seg_lo + 1
+        counts = spans[:, 0] * spans[:, 1]
+        segment_ids = np.repeat(np.arange(len(counts)), counts)
+        # Position of each registration inside its segment's box
+        offsets = np.arange(len(segment_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_y = spans[segment_ids, 1]
+        cells_x = seg_lo[segment_ids, 0] + offsets // span_y
+        cells_y = seg_lo[segment_ids, 1] + offsets % span_y
+        cell_ids = cells_x * self._shape[1] + cells_y
+
+        order = np.argsort(cell_ids, kind='stable')
+        self._cell_segments = segment_ids[order]
+        self._cell_start = np.searchsorted(
+            cell_ids[order], np.arange(self._shape[0] * self._shape[1] + 1))
+
+    def _cell_of(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self._origin) / self._cell_size).astype(np.int64)
+        return np.clip(cells, 0, self._shape - 1)
+
+    def _ring(self, cx: int, cy: int, r: int) -> np.ndarray:
+        """Segments registered in the cells at Chebyshev distance r from (cx, cy)."""
+        nx, ny = self._shape
+        x0, x1 = max(cx - r, 0), min(cx + r, nx - 1)
+        y0, y1 = max(cy - r, 0), min(cy + r, ny - 1)
+        cells = []
+        for x in range(x0, x1 + 1):
+            if abs(x - cx) == r:
+                cells.extend(x * ny + y for y in range(y0, y1 + 1))
+            else:
+                cells.extend(x * ny + y for y in (cy - r, cy + r) if y0 <= y <= y1)
+        if not cells:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            self._cell_segments[self._cell_start[cell]:self._cell_start[cell + 1]]
+            for cell in cells
+        ])
+
+    def project(self, segments: np.ndarray, point: np.ndarray):
+        """Returns the distances of `point` to `segments` and the projection parameters."""
+        t = ((point - self._a[segments]) * self._d[segments]).sum(axis=1)
+        t = np.clip(np.divide(t, self._length_sq[segments],
+                              out=np.zeros_like(t), where=self._length_sq[segments] > 0), 0.0, 1.0)
+        closest = self._a[segments] + t[:, None] * self._d[segments]
+        return np.hypot(*(point - closest).T), t
+
+    def within(self, point: np.ndarray, tolerance: float = 0.0):
+        """
+        Finds the nearest segment to `point` and every segment within
+        `tolerance` of that distance.
+
+        Returns:
+            tuple: (segment ids, distances, projection parameters), or None
+            for a polyline without segments.
+        """
+        if len(self._d) == 0:
+            return None
+        cx, cy = self._cell_of(point[None, :])[0]
+        seen = np.zeros(0, dtype=np.int64)
+        best = math.inf
+        r = 0
+        # Cells in ring r are at least r - 1 cells away from the point
+        while (r - 1) * self._cell_size <= best + tolerance:
+            if r > MAX_SEARCH_RINGS:
+                # Far from the path: scanning every segment is cheaper
+                seen = np.arange(len(self._d))
+                break
+            found = self._ring(cx, cy, r)
+            if len(found):
+                seen = np.union1d(seen, found)
+                distances, _ = self.project(found, point)
+                best = min(best, float(distances.min()))
+            r += 1
+        distances, t = self.project(seen, point)
+        keep = distances <= best + tolerance
+        return seen[keep], distances[keep], t[keep]
+
+
+class MissionProgress:
+    """
+    Tracks the progress of the robot along a loaded mission.
+
+    Waypoints are projected to a local ENU frame and indexed in a
+    SegmentGrid. Each fix is matched to a nearby path segment: among the
+    segments within MATCH_TOLERANCE_M of the nearest one, the distance is
+    weighed against the distance along the path from the previous match,
+    so progress stays continuous where the path passes close to itself.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        self._count = len(latitudes)
+        self._frame = None
+        self._grid = None
+        self._travelled = None
+        if self._count == 0:
+            return
+        self._frame = local_frame(float(latitudes[0]), float(longitudes[0]))
+        east, north, _ = self._frame.to_enu(latitudes, longitudes, np.zeros(self._count))
+        self._points = np.column_stack((east, north))
+        lengths = np.hypot(*np.diff(self._points, axis=0).T)
+        self._lengths = lengths
+        self._cumulative = np.concatenate(([0.0], np.cumsum(lengths)))
+        self._grid = SegmentGrid(self._points)
+
+    @property
+    def total_length_m(self) -> float:
+        return float(self._cumulative[-1]) if self._count else 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def reset(self) -> None:
+        """Forgets the previous match, e.g. when a new run starts."""
+        self._travelled = None
+
+    def update(self, latitude: float, longitude: float,
+               linear_velocity: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """
+        Matches a fix to the mission.
+
+        Returns:
+            dict: 'waypoint_index' (the next waypoint to reach),
+            'cross_track_m' (signed, positive left of the path),
+            'percent_complete', 'distance_remaining_m' and 'eta_s' (None
+            without a positive `linear_velocity`), or None for a mission
+            with fewer than two waypoints.
+        """
+        if self._grid is None or self._count < 2:
+            return None
+        east, north, _ = self._frame.to_enu(latitude, longitude, 0.0)
+        point = np.array([float(east), float(north)])
+        segments, distances, t = self._grid.within(point, MATCH_TOLERANCE_M)
+
+        along = self._cumulative[segments] + t * self._lengths[segments]
+        # Without a previous match, favor the start of the mission
+        previous = 0.0 if self._travelled is None else self._travelled
+        score = distances + ALONG_TRACK_WEIGHT * np.abs(along - previous)
+        pick = int(np.argmin(score))
+        segment = int(segments[pick])
+
+        a = self._points[segment]
+        d = self._points[segment + 1] - a
+        cross = d[0] * (point[1] - a[1]) - d[1] * (point[0] - a[0])
+        cross_track = math.copysign(float(distances[pick]), cross)
+
+        travelled = float(along[pick])
+        self._travelled = travelled
+        total = self.total_length_m
+        remaining = max(total - travelled, 0.0)
+        eta = remaining / linear_velocity if linear_velocity and linear_velocity > 0 else None
+        return {
+            'waypoint_index': segment + 1,
+            'waypoint_count': self._count,
+            'cross_track_m': cross_track,
+            'percent_complete': 100.0 * travelled / total if total > 0 else 100.0,
+            'distance_remaining_m': remaining,
+            'eta_s': eta,
+        }
@@ -0,0 +1,78 @@
+import copy
+from typing import Any, Dict, List, Optional
+
+import importlib.resources as pkg_resources
+
+from app import configs as mowbot_configs
+from app.utils.yaml_io import load_yaml, load_yaml_file
+
+SETTINGS_SCHEMA_FILE = "settings_schema.yaml"
+
+# Keys of a parameter entry in the schema
+PARAM_KEYS = ("path", "label", "min", "max", "step")
+
+
+def load_param_schema(file_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Loads the settings panel schema, from `file_path` or the packaged
+    settings_schema.yaml.
+
+    Returns:
+        list: Tabs as {'title': str, 'params': [{'path', 'label', 'min',
+        'max', 'step'}, ...]}.
+    """
+    if file_path:
+        schema = load_yaml_file(file_path)
+    else:
+        with pkg_resources.open_binary(mowbot_configs, SETTINGS_SCHEMA_FILE) as file:
+            schema = load_yaml(file)
+
+    tabs = []
+    for tab in (schema or {}).get('tabs') or []:
+        params = []
+        for param in tab.get('params') or []:
+            missing = [key for key in PARAM_KEYS if key not in param]
+            if missing:
+                raise ValueError(f"Settings schema entry {param} lacks {', '.join(missing)}")
+            if param['step'] <= 0 or param['min'] > param['max']:
+                raise ValueError(f"Settings schema entry {param['path']} has an invalid range")
+            params.append({key: param[key] for key in PARAM_KEYS})
+        tabs.append({'title': tab.get('title', ''), 'params': params})
+    return tabs
+
+
+def get_path(document: Any, path: str) -> Any:
+    """
+    Returns the value at a dot-separated key path.
+
+    Raises:
+        KeyError: If a key along the path is missing.
+    """
+    value = document
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            raise KeyError(path)
+        value = value[key]
+    return value
+
+
+def set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    """Sets the value at a dot-separated key path, creating missing mappings."""
+    keys = path.split('.')
+    node = document
+    for key in keys[:-1]:
+        if not isinstance(node.get(key), dict):
+            node[key] = {}
+        node = node[key]
+    node[keys[-1]] = value
+
+
+def apply_param_changes(document: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of `document` with only the `changes` ({path: value})
+    applied; everything else is left as loaded.
+    """
+    updated = copy.deepcopy(document)
+    for path, value in changes.items():
+        set_path(updated, path, value)
+    return updated
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.utils.logger import logger
+from app.utils.yaml_io import load_yaml, write_file_atomic
+
+
+class StagingCache:
+    """
+    Stages YAML files into a fixed target path (e.g. `__waypoints__.yaml`)
+    without parsing anything that is already known. Other formats can be
+    staged through a `convert` function producing the target YAML.
+
+    Each target is recorded with the content hash of the source it was
+    copied from and its own mtime and size after the copy. Staging the same
+    content again then costs a read, a hash and a stat; new content is a
+    plain byte copy. Parsed documents are memoized by content hash and
+    shared between callers, so they must be treated as read-only.
+
+    The index is persisted to `index_path` so it survives restarts. Not
+    thread-safe: use it from a single thread (the file I/O thread).
+    """
+
+    MAX_PARSED = 8
+
+    def __init__(self, index_path: str):
+        self._index_path = index_path
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        self._parsed = OrderedDict()  # digest -> parsed document
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        try:
+            write_file_atomic(self._index_path, json.dumps(self._index).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not persist staging index {self._index_path}: {e}")
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def stage(self, source_path: str, target_path: str,
+              convert: Optional[Callable[[bytes], Tuple[Any, bytes]]] = None) -> Any:
+        """
+        Makes target_path a copy of source_path and returns the parsed YAML.
+
+        Args:
+            convert: For sources that are not YAML, returns the parsed
+                document and the target content from the source bytes.
+                It runs at most once per call, and not at all for known
+                content whose target is unchanged.
+
+        Returns:
+            The parsed document. It is the memoized instance shared with
+            every later call for the same content: callers must not mutate
+            it (copy it first, e.g. with param_schema.apply_param_changes).
+        """
+        with open(source_path, 'rb') as file:
+            data = file.read()
+        digest = self._digest(data)
+        document = self._cached(digest)
+
+        entry = self._index.get(target_path)
+        try:
+            stat = os.stat(target_path)
+            unchanged = (entry is not None and entry['digest'] == digest
+                         and entry['mtime_ns'] == stat.st_mtime_ns
+                         and entry['size'] == stat.st_size)
+        except OSError:
+            unchanged = False
+
+        target_data = data
+        if convert is not None and not (unchanged and document is not None):
+            # One conversion yields both the document and the target bytes
+            converted, target_data = convert(data)
+            if document is None:
+                document = converted
+        elif document is None:
+            document = load_yaml(data)
+
+        if not unchanged:
+            write_file_atomic(target_path, target_data)
+            stat = os.stat(target_path)
+            self._index[target_path] = {
+                'digest': digest,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+            }
+            self._save_index()
+            logger.debug(f"Staged {source_path} to {target_path}")
+
+        if digest not in self._parsed:
+            self._parsed[digest] = document
+            if len(self._parsed) > self.MAX_PARSED:
+                self._parsed.popitem(last=False)
+        return document
+
+    def _cached(self, digest: str) -> Any:
+        """Returns the memoized document for content with the given digest."""
+        document = self._parsed.get(digest)
+        if document is not None:
+            self._parsed.move_to_end(digest)
+        return document
@@ -0,0 +1,52 @@
+import math
+from typing import Iterator, Tuple
+
+
+def tile_to_quadkey(x: int, y: int, z: int) -> str:
+    """
+    Returns the Bing Maps quadkey of a slippy-map tile.
+    """
+    digits = []
+    for i in range(z, 0, -1):
+        digit = 0
+        mask = 1 << (i - 1)
+        if x & mask:
+            digit += 1
+        if y & mask:
+            digit += 2
+        digits.append(str(digit))
+    return "".join(digits)
+
+
+def latlon_to_tile(latitude: float, longitude: float, z: int) -> Tuple[int, int]:
+    """
+    Returns the (x, y) Web Mercator tile containing a WGS84 position at zoom z.
+    """
+    n = 1 << z
+    latitude = max(min(latitude, 85.05112878), -85.05112878)
+    lat_rad = math.radians(latitude)
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_count_in_bbox(lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+                       z: int) -> int:
+    """
+    Returns the number of tiles tiles_in_bbox() yields, without listing them.
+    """
+    x_min, y_min = latlon_to_tile(lat_max, lon_min, z)
+    x_max, y_max = latlon_to_tile(lat_min, lon_max, z)
+    return (x_max - x_min + 1) * (y_max - y_min + 1)
+
+
+def tiles_in_bbox(lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+                  z: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yields every (x, y) tile at zoom z that intersects a lat/lon bounding box.
+    """
+    x_min, y_min = latlon_to_tile(lat_max, lon_min, z)
+    x_max, y_max = latlon_to_tile(lat_min, lon_max, z)
+    for x in range(x_min, x_max + 1):
+        for y in range(y_min, y_max + 1):
+            yield x, y
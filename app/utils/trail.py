@@ -0,0 +1,81 @@
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+
+from app.utils.geo import equirectangular_distance
+
+
+class BreadcrumbTrail:
+    """
+    Fixed-capacity ring buffer of GPS fixes with online radial-distance
+    simplification: a fix is kept only once it lies at least
+    `min_distance_m` away from the last kept vertex.
+
+    Newly kept vertices are also queued so callers can forward only the
+    increment to the map.
+    """
+    def __init__(self, capacity: int = 50000, min_distance_m: float = 0.5):
+        self._capacity = capacity
+        self._min_distance_m = min_distance_m
+        self._buffer = np.empty((capacity, 2), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self._last = None
+        self._pending = deque(maxlen=capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, latitude: float, longitude: float) -> bool:
+        """
+        Offers a fix to the trail.
+
+        Returns:
+            bool: True if the fix was kept as a new vertex.
+        """
+        if self._last is not None and equirectangular_distance(
+                self._last[0], self._last[1], latitude, longitude) < self._min_distance_m:
+            return False
+
+        index = (self._start + self._size) % self._capacity
+        self._buffer[index, 0] = latitude
+        self._buffer[index, 1] = longitude
+        if self._size < self._capacity:
+            self._size += 1
+        else:
+            # Overwrite the oldest vertex
+            self._start = (self._start + 1) % self._capacity
+        self._last = (latitude, longitude)
+        self._pending.append(self._last)
+        return True
+
+    def points(self) -> np.ndarray:
+        """
+        Returns all vertices, oldest first, as an (n, 2) array of lat/lon.
+        """
+        end = self._start + self._size
+        if end <= self._capacity:
+            return self._buffer[self._start:end].copy()
+        return np.concatenate((
+            self._buffer[self._start:],
+            self._buffer[:end - self._capacity],
+        ))
+
+    def take_pending(self) -> List[Tuple[float, float]]:
+        """
+        Returns the vertices kept since the last call and forgets them.
+        """
+        pending = list(self._pending)
+        self._pending.clear()
+        return pending
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self._last = None
+        self._pending.clear()
@@ -0,0 +1,354 @@
+import io
+import os
+import csv
+import json
+import math
+import struct
+import itertools
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+import numpy as np
+
+from app.utils.geo import local_meters_per_degree
+from app.utils.yaml_io import load_yaml, open_file_atomic
+
+# In-memory waypoints: heading is the ENU yaw in radians, as logged.
+# YAML files, as read by the navigation stack, store it as 'yaw'.
+WAYPOINT_DTYPE = np.dtype([
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('heading', '<f8'),
+])
+
+FORMAT_YAML = "yaml"
+FORMAT_BINARY = "mwb"
+FORMAT_NPZ = "npz"
+FORMAT_CSV = "csv"
+FORMAT_GEOJSON = "geojson"
+
+FORMAT_EXTENSIONS = {
+    ".yaml": FORMAT_YAML,
+    ".yml": FORMAT_YAML,
+    ".mwb": FORMAT_BINARY,
+    ".npz": FORMAT_NPZ,
+    ".csv": FORMAT_CSV,
+    ".geojson": FORMAT_GEOJSON,
+}
+WAYPOINT_EXTENSIONS = tuple(FORMAT_EXTENSIONS)
+
+WAYPOINT_FILE_FILTER = (
+    "Waypoint Files (*.yaml *.yml *.mwb *.npz *.csv *.geojson);;"
+    "YAML Files (*.yaml);;Binary Waypoints (*.mwb);;NumPy Archives (*.npz);;"
+    "CSV Files (*.csv);;GeoJSON Files (*.geojson);;All Files (*)"
+)
+
+# Binary format: header (magic, version, record size, record count)
+# followed by little-endian WAYPOINT_DTYPE records
+BINARY_MAGIC = b"MWPB"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sHHQ')
+
+# Rows parsed or formatted at a time by the streaming CSV/GeoJSON code
+STREAM_CHUNK_ROWS = 65536
+
+CSV_COLUMNS = {
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lon', 'lng'),
+    'heading': ('heading', 'yaw'),
+}
+
+
+def waypoint_format(file_path: str) -> str:
+    """Returns the format of a waypoint file from its extension; YAML by default."""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(file_path)[1].lower(), FORMAT_YAML)
+
+
+def headings_along(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    ENU yaw of each point towards the next one; the last point keeps the
+    heading of the segment before it.
+    """
+    headings = np.zeros(len(latitudes))
+    if len(latitudes) < 2:
+        return headings
+    east_scale, north_scale = local_meters_per_degree(float(np.mean(latitudes)))
+    headings[:-1] = np.arctan2(np.diff(latitudes) * north_scale, np.diff(longitudes) * east_scale)
+    headings[-1] = headings[-2]
+    return headings
+
+
+def _from_columns(latitudes, longitudes, headings=None) -> np.ndarray:
+    waypoints = np.empty(len(latitudes), dtype=WAYPOINT_DTYPE)
+    waypoints['latitude'] = latitudes
+    waypoints['longitude'] = longitudes
+    if headings is None:
+        headings = headings_along(waypoints['latitude'], waypoints['longitude'])
+    waypoints['heading'] = headings
+    return waypoints
+
+
+def as_waypoint_array(waypoints: Any) -> np.ndarray:
+    """
+    Converts waypoints to a WAYPOINT_DTYPE array. Accepts such an array or a
+    list of dictionaries with 'latitude', 'longitude' and 'heading' (or 'yaw').
+    """
+    if isinstance(waypoints, np.ndarray):
+        return waypoints.astype(WAYPOINT_DTYPE, copy=False)
+    waypoints = list(waypoints or [])
+    if waypoints and all('heading' not in waypoint and 'yaw' not in waypoint
+                         for waypoint in waypoints):
+        headings = None
+    else:
+        headings = [waypoint.get('heading', waypoint.get('yaw', 0.0)) for waypoint in waypoints]
+    return _from_columns(
+        [waypoint['latitude'] for waypoint in waypoints],
+        [waypoint['longitude'] for waypoint in waypoints],
+        headings,
+    )
+
+
+def to_waypoint_dicts(waypoints: np.ndarray) -> List[Dict[str, float]]:
+    """Returns waypoints as dictionaries, the form stored in YAML files."""
+    return [
+        {'latitude': latitude, 'longitude': longitude, 'yaw': heading}
+        for latitude, longitude, heading in zip(
+            waypoints['latitude'].tolist(),
+            waypoints['longitude'].tolist(),
+            waypoints['heading'].tolist(),
+        )
+    ]
+
+
+# --- YAML ---
+
+def _yaml_float(value: float) -> str:
+    # Same spelling as PyYAML's float representer
+    if value != value:
+        return '.nan'
+    if value in (math.inf, -math.inf):
+        return '.inf' if value > 0 else '-.inf'
+    text = repr(value).lower()
+    if '.' not in text and 'e' in text:
+        text = text.replace('e', '.0e', 1)
+    return text
+
+
+def _write_yaml(waypoints: np.ndarray, file: BinaryIO) -> None:
+    """
+    Emits the waypoints YAML directly. The output is what yaml.dump writes
+    for {'waypoints': to_waypoint_dicts(waypoints)}, much faster.
+    """
+    if len(waypoints) == 0:
+        file.write(b"waypoints: []\n")
+        return
+    file.write(b"waypoints:\n")
+    for start in range(0, len(waypoints), STREAM_CHUNK_ROWS):
+        chunk = waypoints[start:start + STREAM_CHUNK_ROWS]
+        file.write("".join(
+            f"- latitude: {_yaml_float(latitude)}\n"
+            f"  longitude: {_yaml_float(longitude)}\n"
+            f"  yaw: {_yaml_float(heading)}\n"
+            for latitude, longitude, heading in zip(
+                chunk['latitude'].tolist(), chunk['longitude'].tolist(), chunk['heading'].tolist())
+        ).encode('ascii'))
+
+
+def _read_yaml(file: BinaryIO) -> np.ndarray:
+    document = load_yaml(file)
+    waypoints = document.get('waypoints') if isinstance(document, dict) else None
+    if not isinstance(waypoints, list):
+        raise ValueError("Not a waypoints file: no 'waypoints' list")
+    return as_waypoint_array(waypoints)
+
+
+# --- Binary ---
+
+def _write_binary(waypoints: np.ndarray, file: BinaryIO) -> None:
+    file.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, WAYPOINT_DTYPE.itemsize, len(waypoints)))
+    file.write(np.ascontiguousarray(waypoints).tobytes())
+
+
+def _read_binary(file: BinaryIO) -> np.ndarray:
+    magic, version, record_size, count = _BINARY_HEADER.unpack(file.read(_BINARY_HEADER.size))
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or record_size != WAYPOINT_DTYPE.itemsize:
+        raise ValueError("Not a supported binary waypoint file")
+    data = file.read(count * record_size)
+    if len(data) != count * record_size:
+        raise ValueError(f"Truncated binary waypoint file: expected {count} waypoints")
+    return np.frombuffer(data, dtype=WAYPOINT_DTYPE)
+
+
+# --- NPZ ---
+
+def _write_npz(waypoints: np.ndarray, file: BinaryIO) -> None:
+    np.savez(file, **{name: waypoints[name] for name in WAYPOINT_DTYPE.names})
+
+
+def _read_npz(file: BinaryIO) -> np.ndarray:
+    with np.load(file) as archive:
+        headings = archive['heading'] if 'heading' in archive.files else None
+        return _from_columns(archive['latitude'], archive['longitude'], headings)
+
+
+# --- CSV ---
+
+def _write_csv(waypoints: np.ndarray, file: BinaryIO) -> None:
+    file.write(b"latitude,longitude,heading\n")
+    for start in range(0, len(waypoints), STREAM_CHUNK_ROWS):
+        chunk = waypoints[start:start + STREAM_CHUNK_ROWS]
+        file.write("".join(
+            f"{latitude!r},{longitude!r},{heading!r}\n"
+            for latitude, longitude, heading in zip(
+                chunk['latitude'].tolist(), chunk['longitude'].tolist(), chunk['heading'].tolist())
+        ).encode('ascii'))
+
+
+def _read_csv(file: BinaryIO) -> np.ndarray:
+    """
+    Reads a CSV file in chunks. The header names the columns (see
+    CSV_COLUMNS); without a header the columns are latitude, longitude and
+    optionally heading. Missing headings follow the path.
+    """
+    reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    first = next(reader, None)
+    if first is None:
+        return np.empty(0, dtype=WAYPOINT_DTYPE)
+    names = [name.strip().lower() for name in first]
+    try:
+        [float(value) for value in first]
+        # No header
+        indices = [0, 1, 2 if len(first) > 2 else None]
+        reader = itertools.chain([first], reader)
+    except ValueError:
+        indices = []
+        for aliases in CSV_COLUMNS.values():
+            index = next((names.index(alias) for alias in aliases if alias in names), None)
+            indices.append(index)
+        if indices[0] is None or indices[1] is None:
+            raise ValueError("CSV waypoints need latitude and longitude columns")
+    columns = [index for index in indices if index is not None]
+
+    chunks = []
+    while True:
+        rows = [[row[index] for index in columns]
+                for row in itertools.islice(reader, STREAM_CHUNK_ROWS) if row]
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.float64))
+    values = np.concatenate(chunks) if chunks else np.empty((0, len(columns)))
+    headings = values[:, 2] if indices[2] is not None else None
+    return _from_columns(values[:, 0], values[:, 1], headings)
+
+
+# --- GeoJSON ---
+
+def _json_float(value: float) -> str:
+    return repr(value) if math.isfinite(value) else 'null'
+
+
+def _write_geojson(waypoints: np.ndarray, file: BinaryIO) -> None:
+    """Writes a FeatureCollection of Point features with a 'heading' property."""
+    file.write(b'{"type": "FeatureCollection", "features": [\n')
+    for start in range(0, len(waypoints), STREAM_CHUNK_ROWS):
+        chunk = waypoints[start:start + STREAM_CHUNK_ROWS]
+        file.write(("" if start == 0 else ",\n").encode('ascii'))
+        file.write(",\n".join(
+            '{"type": "Feature", "geometry": {"type": "Point", "coordinates": '
+            f'[{_json_float(longitude)}, {_json_float(latitude)}]}}, '
+            f'"properties": {{"heading": {_json_float(heading)}}}}}'
+            for latitude, longitude, heading in zip(
+                chunk['latitude'].tolist(), chunk['longitude'].tolist(), chunk['heading'].tolist())
+        ).encode('ascii'))
+    file.write(b'\n]}\n')
+
+
+def _read_geojson(file: BinaryIO) -> np.ndarray:
+    """
+    Reads Point features (heading from a 'heading' or 'yaw' property) and
+    the vertices of LineString / MultiPoint geometries, in document order.
+    """
+    document = json.load(file)
+    if document.get('type') == 'FeatureCollection':
+        features = document.get('features') or []
+    elif document.get('type') == 'Feature':
+        features = [document]
+    else:
+        features = [{'geometry': document, 'properties': {}}]
+
+    latitudes, longitudes, headings = [], [], []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        properties = feature.get('properties') or {}
+        if geometry.get('type') == 'Point':
+            coordinates = [geometry['coordinates']]
+            heading = properties.get('heading', properties.get('yaw'))
+            point_headings = [math.nan if heading is None else heading]
+        elif geometry.get('type') in ('LineString', 'MultiPoint'):
+            coordinates = geometry['coordinates']
+            point_headings = [math.nan] * len(coordinates)
+        else:
+            continue
+        longitudes.extend(coordinate[0] for coordinate in coordinates)
+        latitudes.extend(coordinate[1] for coordinate in coordinates)
+        headings.extend(point_headings)
+
+    waypoints = _from_columns(latitudes, longitudes, headings)
+    # Points without a heading follow the path
+    missing = np.isnan(waypoints['heading'])
+    if missing.any():
+        waypoints['heading'][missing] = headings_along(
+            waypoints['latitude'], waypoints['longitude'])[missing]
+    return waypoints
+
+
+_READERS = {
+    FORMAT_YAML: _read_yaml,
+    FORMAT_BINARY: _read_binary,
+    FORMAT_NPZ: _read_npz,
+    FORMAT_CSV: _read_csv,
+    FORMAT_GEOJSON: _read_geojson,
+}
+
+_WRITERS = {
+    FORMAT_YAML: _write_yaml,
+    FORMAT_BINARY: _write_binary,
+    FORMAT_NPZ: _write_npz,
+    FORMAT_CSV: _write_csv,
+    FORMAT_GEOJSON: _write_geojson,
+}
+
+
+def read_waypoints(file: BinaryIO, fmt: str) -> np.ndarray:
+    """Reads waypoints in format `fmt` from a binary file object."""
+    return _READERS[fmt](file)
+
+
+def write_waypoints(waypoints: Any, file: BinaryIO, fmt: str) -> None:
+    """Writes waypoints in format `fmt` to a binary file object."""
+    _WRITERS[fmt](as_waypoint_array(waypoints), file)
+
+
+def load_waypoints(file_path: str) -> np.ndarray:
+    """Loads a waypoint file in the format given by its extension."""
+    with open(file_path, 'rb') as file:
+        return read_waypoints(file, waypoint_format(file_path))
+
+
+def save_waypoints(waypoints: Any, file_path: str) -> None:
+    """Saves waypoints atomically in the format given by the file extension."""
+    with open_file_atomic(file_path) as file:
+        write_waypoints(waypoints, file, waypoint_format(file_path))
+
+
+def convert_to_nav_yaml(data: bytes, fmt: str) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Converts the content of a waypoint file to the YAML read by the
+    navigation stack.
+
+    Returns:
+        tuple: The waypoints document ({'waypoints': [...]}) and its YAML.
+    """
+    waypoints = read_waypoints(io.BytesIO(data), fmt)
+    output = io.BytesIO()
+    _write_yaml(waypoints, output)
+    return {'waypoints': to_waypoint_dicts(waypoints)}, output.getvalue()
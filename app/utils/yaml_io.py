@@ -0,0 +1,61 @@
+import os
+import contextlib
+import tempfile
+from typing import Any, BinaryIO, Iterator
+
+import yaml
+
+# Use the libyaml-backed loader/dumper when PyYAML was built with it.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def load_yaml(stream) -> Any:
+    """Parses YAML from a string, bytes or file object."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump_yaml(data: Any, stream=None) -> Any:
+    """
+    Serializes data to YAML, to `stream` or returned as a string.
+    Output matches yaml.dump's defaults (block style, sorted keys).
+    """
+    return yaml.dump(data, stream, Dumper=SafeDumper, default_flow_style=False)
+
+
+def load_yaml_file(file_path: str) -> Any:
+    with open(file_path, 'rb') as file:
+        return load_yaml(file)
+
+
+@contextlib.contextmanager
+def open_file_atomic(file_path: str) -> Iterator[BinaryIO]:
+    """
+    Opens a temporary file in the same directory for binary writing, and
+    renames it to `file_path` when the block exits without an error, so
+    readers never see a partially written file.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(
+        prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_file_atomic(file_path: str, data: bytes) -> None:
+    """Writes a file atomically (see open_file_atomic)."""
+    with open_file_atomic(file_path) as file:
+        file.write(data)
+
+
+def save_yaml_file(data: Any, file_path: str) -> None:
+    """Dumps data to a YAML file atomically."""
+    write_file_atomic(file_path, dump_yaml(data).encode('utf-8'))
@@ -22,6 +22,8 @@ from .menu_box_view import MenuBoxView
 from .multi_panel_view import MultiPanelView
 
 from app.utils.logger import logger
+from app.utils.heading import heading_from_quaternion
+from app.utils.library_index import KIND_PARAMS
 class MainView(QWidget):
     
     signal_settings_btn_clicked = pyqtSignal()
@@ -68,7 +70,7 @@ class MainView(QWidget):
             background-color: #27ae60; 
         """)
         
-        self.status_bar = StatusBarView()
+        self.status_bar = StatusBarView(config=self._config)
         self.menu_box = MenuBoxView()
         self.multi_panel = MultiPanelView(config=self._config)
         
@@ -217,10 +219,14 @@ class MainView(QWidget):
             self.on_navigate_btn_clicked)
         self.multi_panel.waypoints_logger_panel.option_bar.log_btn.clicked.connect(
             self.on_waypoint_log_btn_clicked)
+        self.multi_panel.waypoints_logger_panel.option_bar.auto_btn.toggled.connect(
+            self.on_waypoint_auto_log_btn_toggled)
         self.multi_panel.waypoints_logger_panel.option_bar.rm_btn.clicked.connect(
             self.on_selected_logged_waypoint_remove_btn_clicked)
         self.multi_panel.waypoints_logger_panel.option_bar.clear_btn.clicked.connect(
             self.on_logged_waypoints_clear_btn_clicked)
+        self.multi_panel.waypoints_logger_panel.option_bar.gen_btn.clicked.connect(
+            self.on_logged_waypoints_gen_btn_clicked)
         self.multi_panel.waypoints_logger_panel.option_bar.save_btn.clicked.connect(
             self.on_logged_waypoints_save_btn_clicked)
         
@@ -350,13 +356,13 @@ class MainView(QWidget):
             
     def on_waypoint_log_btn_clicked(self):
         """Forward the log button event."""
-        self.multi_panel.waypoints_logger_panel.update_table_map_with_logged_waypoint(
-            latitude=self.multi_panel.waypoints_logger_panel.get_last_gps_lat(),
-            longitude=self.multi_panel.waypoints_logger_panel.get_last_gps_lon(),
-            heading=self.multi_panel.waypoints_logger_panel.get_last_heading()
-        )
+        self.multi_panel.waypoints_logger_panel.capture_waypoint()
         self.signal_log_btn_clicked.emit()
         
+    def on_waypoint_auto_log_btn_toggled(self, checked: bool):
+        """Switch automatic waypoint logging on or off."""
+        self.multi_panel.waypoints_logger_panel.set_auto_log_enabled(checked)
+        
     def on_selected_logged_waypoint_remove_btn_clicked(self):
         """Forward the remove button event."""
         self.multi_panel.waypoints_logger_panel.remove_selected_log_waypoints()
@@ -365,8 +371,14 @@ class MainView(QWidget):
     def on_logged_waypoints_clear_btn_clicked(self):
         """Forward the clear button event."""
         self.multi_panel.waypoints_logger_panel.clear_log_waypoints()
+        # A new logging session starts with a fresh breadcrumb trail
+        self.multi_panel.waypoints_logger_panel.map_view.clear_trail()
         self.signal_log_clear_btn_clicked.emit()
         
+    def on_logged_waypoints_gen_btn_clicked(self):
+        """Generate a coverage path inside the logged boundary."""
+        self.multi_panel.waypoints_logger_panel.generate_coverage_path()
+        
     def on_logged_waypoints_save_btn_clicked(self):
         """Forward the save button event."""
         save_path = self.multi_panel.waypoints_logger_panel.prompt_for_save_file()
@@ -375,6 +387,8 @@ class MainView(QWidget):
             return
         if not current_waypoints:
             return
+        # Retired from the journal once the save succeeds
+        self.multi_panel.waypoints_logger_panel.begin_journal_save(save_path)
         self.signal_log_save_btn_clicked.emit(
             save_path,
             {"waypoints": current_waypoints}
@@ -406,9 +420,9 @@ class MainView(QWidget):
     def on_settings_save_btn_clicked(self):
         """Forward the settings save button event."""
         save_file_path = self.multi_panel.settings_panel.prompt_file_dialog_for_save()
-        yaml_data = self.multi_panel.settings_panel.get_params()
         if not save_file_path:
             return
+        yaml_data = self.multi_panel.settings_panel.get_params()
         if not yaml_data:
             logger.warning("No data to save.")
             return
@@ -540,6 +554,8 @@ class MainView(QWidget):
         self.multi_panel.waypoints_logger_panel.update_gps_info(
             latitude=data['latitude'],
             longitude=data['longitude'],
+            status=data.get('status', -1),
+            position_covariance=data.get('position_covariance'),
         )
         self.multi_panel.waypoints_navigator_panel.update_gps_info(
             latitude=data['latitude'],
@@ -550,11 +566,15 @@ class MainView(QWidget):
     @pyqtSlot(dict)
     def on_signal_heading_quat_received(self, data: dict):
         # logger.info(f" Heading signal received: {data}")
+        # Compute the heading once and share it with both panels
+        heading = heading_from_quaternion(data)
         self.multi_panel.waypoints_logger_panel.update_heading_info(
-            data=data,
+            yaw_enu=heading['yaw_enu'],
+            bearing_ned=heading['bearing_ned'],
         )
         self.multi_panel.waypoints_navigator_panel.update_heading_info(
-            data=data,
+            yaw_enu=heading['yaw_enu'],
+            bearing_ned=heading['bearing_ned'],
         )
         
     @pyqtSlot(str, dict)
@@ -567,11 +587,12 @@ class MainView(QWidget):
             file_path=file_path)
         # update waypoint to map
         self.multi_panel.waypoints_navigator_panel.map_view.reset()
-        for waypoint in waypoints["waypoints"]:
-            self.multi_panel.waypoints_navigator_panel.map_view.add_gps_position_mark(
-                latitude=waypoint["latitude"],
-                longitude=waypoint["longitude"],
-            )
+        # The trail driven for the previous mission no longer applies
+        self.multi_panel.waypoints_navigator_panel.map_view.clear_trail()
+        self.multi_panel.waypoints_navigator_panel.map_view.add_gps_position_marks([
+            (waypoint["latitude"], waypoint["longitude"])
+            for waypoint in waypoints["waypoints"]
+        ])
 
     
     @pyqtSlot(str, dict)
@@ -584,6 +605,54 @@ class MainView(QWidget):
             file_path=file_path)
         
         
+    @pyqtSlot(str)
+    def on_signal_waypoints_saved(self, file_path: str):
+        """
+        Slot method to handle the waypoints saved signal.
+        """
+        self.multi_panel.waypoints_logger_panel.show_save_success(file_path)
+        self.multi_panel.waypoints_logger_panel.retire_journal(file_path)
+        
+    @pyqtSlot(str, dict)
+    def on_signal_settings_saved(self, file_path: str, params: dict):
+        """
+        Slot method to handle the settings parameters saved signal.
+        """
+        logger.info(f"Settings saved to {file_path}")
+        self.multi_panel.settings_panel.mark_params_saved(params)
+        
+    @pyqtSlot(str, str)
+    def on_signal_file_io_error(self, file_path: str, message: str):
+        """
+        Slot method to handle a failed file load or save.
+        """
+        logger.error(f"File operation on {file_path} failed: {message}")
+        self.multi_panel.waypoints_logger_panel.keep_journal(file_path)
+        
+    @pyqtSlot(int, int, int)
+    def on_signal_tile_prefetch_progress(self, done: int, total: int, hits: int):
+        """
+        Slot method to handle map tile prefetch progress.
+        """
+        self.multi_panel.waypoints_navigator_panel.update_tile_prefetch_info(
+            done=done, total=total, hits=hits)
+        
+    @pyqtSlot(dict)
+    def on_signal_mission_progress(self, progress: dict):
+        """
+        Slot method to handle mission progress updates.
+        """
+        self.multi_panel.waypoints_navigator_panel.update_mission_progress_info(progress)
+        
+    @pyqtSlot(str, list)
+    def on_signal_library_updated(self, kind: str, entries: list):
+        """
+        Slot method to handle library index updates.
+        """
+        self.multi_panel.waypoints_navigator_panel.update_library(kind, entries)
+        if kind == KIND_PARAMS:
+            self.multi_panel.settings_panel.update_library(entries)
+        
     @pyqtSlot(str, dict)
     def on_signal_settings_param_loaded(self, file_path: str, params: dict):
         """
@@ -594,3 +663,10 @@ class MainView(QWidget):
             yaml_data=params,
         )
         
+        
+    def on_app_exit(self):
+        """
+        Flushes view-side state that must survive the application, such as
+        the waypoint logging session journal.
+        """
+        self.multi_panel.waypoints_logger_panel.close_journal()
@@ -0,0 +1,255 @@
+# library_dialog_view.py
+import time
+from typing import Any, List
+
+import numpy as np
+from PyQt5.QtWidgets import (
+    QDialog,
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QFileDialog,
+)
+from PyQt5.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QModelIndex,
+    QPointF,
+    QSortFilterProxyModel,
+)
+from PyQt5.QtGui import QPainter, QPen, QPolygonF, QColor
+
+from app.utils.library_index import KIND_WAYPOINTS, KIND_PARAMS
+
+YAML_FILE_FILTER = "YAML Files (*.yaml);;All Files (*)"
+
+
+class LibraryTableModel(QAbstractTableModel):
+    """
+    Table model of library entries (see LibraryIndex.entries()).
+    Numeric columns sort by value through Qt.UserRole.
+    """
+
+    # kind -> (header, value of an entry, display format)
+    COLUMNS = {
+        KIND_WAYPOINTS: [
+            ("Name", lambda entry: entry['name'], '{}'),
+            ("Points", lambda entry: entry['point_count'], '{}'),
+            ("Length (m)", lambda entry: entry['length_m'], '{:.1f}'),
+            ("Modified", lambda entry: entry['modified'], None),
+        ],
+        KIND_PARAMS: [
+            ("Name", lambda entry: entry['name'], '{}'),
+            ("Vel (m/s)", lambda entry: entry['params'].get('desired_linear_vel'), '{:.2f}'),
+            ("Lookahead (m)", lambda entry: entry['params'].get('lookahead_dist'), '{:.2f}'),
+            ("XY tol (m)", lambda entry: entry['params'].get('xy_goal_tolerance'), '{:.2f}'),
+            ("Modified", lambda entry: entry['modified'], None),
+        ],
+    }
+
+    def __init__(self, kind: str, entries: List[dict], parent=None):
+        super().__init__(parent)
+        self._columns = self.COLUMNS[kind]
+        self._entries = entries
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def entry(self, row: int) -> dict:
+        return self._entries[row]
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        _, value_of, fmt = self._columns[index.column()]
+        value = value_of(entry)
+        if role == Qt.UserRole:
+            return value if value is not None else -1
+        if role == Qt.DisplayRole:
+            if value is None:
+                return "-"
+            if fmt is None:
+                return time.strftime('%Y-%m-%d %H:%M', time.localtime(value))
+            return fmt.format(value)
+        if role == Qt.ToolTipRole:
+            if entry['error']:
+                return f"{entry['path']}\n{entry['error']}"
+            return entry['path']
+        if role == Qt.ForegroundRole and entry['error']:
+            return QColor("red")
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._columns[section][0]
+        return None
+
+
+class ThumbnailView(QWidget):
+    """
+    Draws a library entry's thumbnail polyline, north up.
+    """
+
+    MARGIN = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._latlons = np.empty((0, 2), dtype=np.float32)
+        self.setMinimumSize(200, 200)
+
+    def set_thumbnail(self, latlons: np.ndarray) -> None:
+        self._latlons = latlons
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        if len(self._latlons) < 2:
+            return
+        lats = self._latlons[:, 0].astype(np.float64)
+        lons = self._latlons[:, 1].astype(np.float64)
+        # Equirectangular projection, fitted to the widget
+        xs = (lons - lons.min()) * np.cos(np.radians(lats.mean()))
+        ys = lats.max() - lats
+        span = max(xs.max(), ys.max(), 1e-12)
+        scale = (min(self.width(), self.height()) - 2 * self.MARGIN) / span
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor("blue"), 2))
+        painter.drawPolyline(QPolygonF([
+            QPointF(self.MARGIN + x * scale, self.MARGIN + y * scale)
+            for x, y in zip(xs.tolist(), ys.tolist())
+        ]))
+
+
+class LibraryDialogView(QDialog):
+    """
+    File picker listing the indexed waypoint or params library, filterable
+    by name, with a thumbnail of the selected waypoints. "Browse..." falls
+    back to a plain file dialog for files outside the library.
+    """
+
+    def __init__(self, kind: str, entries: List[dict], directory: str,
+                 title: str, file_filter: str = YAML_FILE_FILTER, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(900, 500)
+        self._directory = directory
+        self._file_filter = file_filter
+        self._selected_path = ""
+
+        self._table_model = LibraryTableModel(kind, entries, self)
+        self._proxy = QSortFilterProxyModel(self)
+        self._proxy.setSourceModel(self._table_model)
+        self._proxy.setSortRole(Qt.UserRole)
+        self._proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self._proxy.setFilterKeyColumn(0)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name")
+        self.filter_edit.textChanged.connect(self._proxy.setFilterFixedString)
+
+        self.table = QTableView()
+        self.table.setModel(self._proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(len(LibraryTableModel.COLUMNS[kind]) - 1, Qt.DescendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.accept)
+        self.table.selectionModel().currentRowChanged.connect(self._on_current_row_changed)
+
+        self.thumbnail = ThumbnailView() if kind == KIND_WAYPOINTS else None
+
+        self.browse_btn = QPushButton("Browse...")
+        self.browse_btn.clicked.connect(self._browse)
+        self.open_btn = QPushButton("Open")
+        self.open_btn.setDefault(True)
+        self.open_btn.clicked.connect(self.accept)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+
+        self._init_ui()
+        if self._proxy.rowCount():
+            self.table.selectRow(0)
+
+    def _init_ui(self):
+        layout = QVBoxLayout()
+        layout.addWidget(self.filter_edit)
+
+        content_layout = QHBoxLayout()
+        content_layout.addWidget(self.table, 1)
+        if self.thumbnail is not None:
+            content_layout.addWidget(self.thumbnail)
+        layout.addLayout(content_layout)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(self.browse_btn)
+        btn_layout.addStretch(1)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.open_btn)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def _current_entry(self):
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return None
+        return self._table_model.entry(self._proxy.mapToSource(index).row())
+
+    def _on_current_row_changed(self, current: QModelIndex, previous: QModelIndex):
+        entry = self._current_entry()
+        if self.thumbnail is not None and entry is not None:
+            self.thumbnail.set_thumbnail(entry['thumbnail'])
+
+    def _browse(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            self.windowTitle(),
+            self._directory,
+            self._file_filter,
+        )
+        if file_path:
+            self._selected_path = file_path
+            super().accept()
+
+    def accept(self):
+        entry = self._current_entry()
+        if entry is None:
+            return
+        self._selected_path = entry['path']
+        super().accept()
+
+    def selected_path(self) -> str:
+        return self._selected_path
+
+    @staticmethod
+    def get_open_file(parent, kind: str, entries: List[dict], directory: str,
+                      title: str, file_filter: str = YAML_FILE_FILTER) -> str:
+        """
+        Lets the user pick a library file; returns its path or "".
+        Without indexed entries, shows the plain file dialog directly.
+        """
+        if not entries:
+            file_path, _ = QFileDialog.getOpenFileName(
+                parent,
+                title,
+                directory,
+                file_filter,
+            )
+            return file_path
+        dialog = LibraryDialogView(kind, entries, directory, title, file_filter, parent)
+        if dialog.exec() != QDialog.Accepted:
+            return ""
+        return dialog.selected_path()
@@ -1,109 +1,444 @@
 # map_view.py
 import os
 import json
+import math
+import time
+import base64
+import itertools
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+from array import array
 import pathlib
+from functools import lru_cache
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWebChannel import QWebChannel
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal, pyqtSlot
 from app.utils.logger import logger
+from app.utils.trail import BreadcrumbTrail
+from app.utils.lod import MarkLevelOfDetail
+
+RESOURCES_PATH = os.path.join(pathlib.Path(__file__).parent.parent.parent.resolve(), "resources")
+TEMPLATE_PATH = os.path.join(RESOURCES_PATH, "templates", "map_template.html")
+
+# Bundled web assets (Leaflet, plugins, icons) are referenced relative to this URL.
+ASSETS_BASE_URL = QUrl.fromLocalFile(RESOURCES_PATH + os.sep)
+
+
+@lru_cache(maxsize=None)
+def render_map_template() -> str:
+    """
+    Returns the map HTML, read once per process so every MapView shares the
+    same page.
+    """
+    try:
+        with open(TEMPLATE_PATH, "r", encoding="utf-8") as file:
+            return file.read()
+    except Exception as e:
+        logger.error("Failed to load map template: " + str(e))
+        return ""
+
 
 class JsPyBridge(QObject):
     """
     Bridge for Python–JavaScript communication.
-    Provides signals for GPS update, heading update, marker addition, and marker removal.
+    Provides signals for pose (GPS + heading) updates, marker addition, and marker removal.
     """
-    signal_tracker_gps_updated = pyqtSignal(str)
-    signal_tracker_heading_updated = pyqtSignal(str)
+    signal_tracker_pose_updated = pyqtSignal(str)
     signal_marks_gps_added = pyqtSignal(str)
+    signal_marks_gps_batch_added = pyqtSignal(str)
     signal_marks_gps_removed = pyqtSignal(str)
-    
+    signal_marks_lod_updated = pyqtSignal(bool)
+    signal_trail_cleared = pyqtSignal()
+
+    # RPC batches: Python -> JS requests and responses to JS requests
+    signal_rpc_requests = pyqtSignal(str)
+    signal_rpc_responses = pyqtSignal(str)
+
+    # Python-side notifications
+    signal_js_ready = pyqtSignal()
+    signal_rpc_requests_received = pyqtSignal(str)
+    signal_rpc_responses_received = pyqtSignal(str)
+
     @pyqtSlot(str)
     def receive_from_js(self, message):
         logger.debug(f"Received from JS: {message}")
 
+    @pyqtSlot()
+    def notify_ready(self):
+        self.signal_js_ready.emit()
+
+    @pyqtSlot(str)
+    def rpc_requests(self, batch):
+        self.signal_rpc_requests_received.emit(batch)
+
+    @pyqtSlot(str)
+    def rpc_responses(self, batch):
+        self.signal_rpc_responses_received.emit(batch)
+
+
+class JsRpc(QObject):
+    """
+    Request/response RPC over the JsPyBridge channel, in both directions.
+
+    Messages travel as JSON batches: requests are `[{id, method, params}]`
+    and responses are `[{id, result}]` or `[{id, error}]`. Python calls are
+    queued and flushed once per event loop pass; each returns a
+    concurrent.futures.Future resolved with the JS result. JS requests are
+    dispatched to handlers registered with `register()`.
+    """
+    def __init__(self, bridge: JsPyBridge, parent=None):
+        super().__init__(parent)
+        self._bridge = bridge
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._outbox = []
+        self._handlers: Dict[str, Callable[[Any], Any]] = {}
+        self._is_open = False
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._bridge.signal_rpc_requests_received.connect(self._on_requests)
+        self._bridge.signal_rpc_responses_received.connect(self._on_responses)
+
+    def open(self):
+        """Marks the JS side as connected and sends any queued calls."""
+        self._is_open = True
+        self._flush()
+
+    def register(self, method: str, handler: Callable[[Any], Any]):
+        """Registers a Python handler callable from JS by name."""
+        self._handlers[method] = handler
+
+    def call(self, method: str, params: Any = None) -> Future:
+        """
+        Calls a JS method and returns a Future for its result.
+        Calls made before the page is ready are sent once it is.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        request_id = next(self._ids)
+        self._pending[request_id] = future
+        self._outbox.append({"id": request_id, "method": method, "params": params})
+        if self._is_open and not self._flush_timer.isActive():
+            self._flush_timer.start()
+        return future
+
+    def _flush(self):
+        if not self._outbox or not self._is_open:
+            return
+        batch, self._outbox = self._outbox, []
+        self._bridge.signal_rpc_requests.emit(json.dumps(batch))
+
+    @pyqtSlot(str)
+    def _on_responses(self, batch: str):
+        for response in json.loads(batch):
+            future = self._pending.pop(response.get("id"), None)
+            if future is None:
+                continue
+            if "error" in response:
+                future.set_exception(RuntimeError(response["error"]))
+            else:
+                future.set_result(response.get("result"))
+
+    @pyqtSlot(str)
+    def _on_requests(self, batch: str):
+        responses = []
+        for request in json.loads(batch):
+            handler = self._handlers.get(request.get("method"))
+            try:
+                if handler is None:
+                    raise KeyError(f"Unknown RPC method: {request.get('method')}")
+                responses.append({"id": request["id"], "result": handler(request.get("params"))})
+            except Exception as e:
+                logger.error(f"Error handling JS RPC request {request}: {e}")
+                responses.append({"id": request.get("id"), "error": str(e)})
+        self._bridge.signal_rpc_responses.emit(json.dumps(responses))
+
 class MapView(QWidget):
     """
     MapView loads an external HTML template to display a Leaflet map.
-    The template includes a placeholder '{bingApiKey}' which is replaced at runtime.
+    Map tiles are served through the tiles:// scheme (see TileCacheModel).
     It exposes API methods to update the GPS position, heading, and manage markers.
+
+    Large mark sets (more than `map_lod_min_marks`) are not sent to the page
+    one by one: the page fetches grid clusters, or the marks in view at high
+    zoom, for its current viewport from a MarkLevelOfDetail index.
+
+    The QWebEngineView is created lazily the first time the widget is shown,
+    so constructing a MapView is cheap. Updates sent before the page is ready
+    are kept on the Python side and replayed once the JS channel connects.
     """
+
+    signal_map_tapped = pyqtSignal(float, float)  # latitude, longitude
+
+    # About one display frame at 60 Hz
+    POSE_FLUSH_INTERVAL_MS = 16
+
     def __init__(self, config):
         """
-        :param config: A dictionary containing configuration, including "bing_api_key".
+        :param config: A dictionary containing the application configuration.
         """
         super().__init__()
         self._config = config
-        self._init_ui()
-        
-        # Setup Python-JavaScript bridge and channel.
+
+        self.web_view = None
+        self.channel = None
+        self._is_ready = False
+        self._load_started_at = None
+
+        # Map state mirrored on the Python side for replay.
+        self._last_position = None
+        self._last_heading = None
+        self._marks = {}  # mark_id -> (latitude, longitude)
+        self._mark_ids = itertools.count(1)
+
+        # Level of detail for large mark sets, rebuilt lazily after changes.
+        self._lod = MarkLevelOfDetail(
+            cell_px=self._config.get("map_lod_cell_px", 24),
+            full_zoom=self._config.get("map_lod_full_zoom", 18),
+        )
+        self._lod_min_marks = self._config.get("map_lod_min_marks", 2000)
+        self._lod_dirty = False
+        self._lod_shown = False
+        self._lod_sync_timer = QTimer(self)
+        self._lod_sync_timer.setSingleShot(True)
+        self._lod_sync_timer.setInterval(0)
+        self._lod_sync_timer.timeout.connect(self._sync_lod)
+
+        # Breadcrumb trail of simplified fixes; new vertices ride along with
+        # the next pose update.
+        self._trail = BreadcrumbTrail(
+            capacity=self._config.get("trail_max_points", 50000),
+            min_distance_m=self._config.get("trail_min_distance_m", 0.5),
+        )
+
+        # Position and heading updates are coalesced into one packed pose
+        # message per display frame.
+        self._pose_flush_timer = QTimer(self)
+        self._pose_flush_timer.setSingleShot(True)
+        self._pose_flush_timer.setInterval(self.POSE_FLUSH_INTERVAL_MS)
+        self._pose_flush_timer.timeout.connect(self._flush_pose)
+
+        # Setup Python-JavaScript bridge.
         self.jspy_bridge = JsPyBridge()
+        self.jspy_bridge.signal_js_ready.connect(self._on_js_ready)
+        self.rpc = JsRpc(self.jspy_bridge, parent=self)
+        self.rpc.register("map_tapped", self._on_map_tapped)
+        self.rpc.register("get_mark_lod", self._on_mark_lod_requested)
+
+        self._init_ui()
+
+    def _init_ui(self):
+        self._layout = QVBoxLayout()
+        self.setLayout(self._layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.web_view is None and self._load_started_at is None:
+            # Defer creation until the current paint has gone through.
+            self._load_started_at = time.perf_counter()
+            QTimer.singleShot(0, self._create_web_view)
+
+    def _create_web_view(self):
+        """
+        Creates the web view and channel, then loads the map page.
+        """
+        self.web_view = QWebEngineView()
         self.channel = QWebChannel()
         self.channel.registerObject("jspy_bridge", self.jspy_bridge)
         self.web_view.page().setWebChannel(self.channel)
-        
+        self._layout.addWidget(self.web_view)
         self._load_map()
-        
-    def _init_ui(self):
-        layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
-        layout.addWidget(self.web_view)
-        self.setLayout(layout)
-        
+
     def _load_map(self):
         """
-        Loads the external HTML template, replaces the Bing API key placeholder, and sets the HTML.
-        """
-        # Compute the path to the HTML template file.
-        template_path = os.path.join(pathlib.Path(__file__).parent.parent.parent.resolve(), 
-                    "resources", "templates", "map_template.html")
-        try:
-            with open(template_path, "r", encoding="utf-8") as file:
-                html = file.read()
-        except Exception as e:
-            logger.error("Failed to load map template: " + str(e))
-            html = ""
-        
-        # Replace the placeholder with the actual Bing API key.
-        bing_api_key = self._config["bing_api_key"]
-        html = html.replace("{bingApiKey}", bing_api_key)
-        
-        self.web_view.setHtml(html)
-        
-    # --- View API Methods ---
-    
-    def update_gps_position(self, latitude, longitude):
-        """Update the GPS position on the map."""
+        Sets the cached map HTML, resolving the bundled assets locally so the
+        map comes up without any network round trip.
+        """
+        self.web_view.setHtml(render_map_template(), ASSETS_BASE_URL)
+
+    @pyqtSlot()
+    def _on_js_ready(self):
+        """
+        Replays the mirrored map state once the JS side is connected.
+        """
+        self._is_ready = True
+        self.rpc.open()
+        if self._load_started_at is not None:
+            logger.info(
+                f"Map ready in {(time.perf_counter() - self._load_started_at) * 1000:.0f} ms")
+        self._lod_shown = False
+        if self._lod_wanted():
+            self._sync_lod()
+        elif self._marks:
+            self._emit_marks_added(self._marks.items())
+        self._trail.take_pending()
+        if len(self._trail) or self._last_position is not None \
+                or self._last_heading is not None:
+            self._emit_pose(self._trail.points().ravel())
+
+    def is_ready(self) -> bool:
+        """Returns whether the map page is loaded and connected."""
+        return self._is_ready
+
+    # --- JS emitters ---
+
+    def _emit_pose(self, trail_latlons):
+        # Packed float64 [lat, lon, heading, capacity, lat0, lon0, lat1, lon1, ...]:
+        # the tracker pose (NaN until known) followed by the new trail vertices.
+        # The capacity lets the JS side drop its oldest vertices like the ring buffer.
+        latitude, longitude = self._last_position or (math.nan, math.nan)
+        heading = math.nan if self._last_heading is None else self._last_heading
+        packed = array('d', [latitude, longitude, heading, self._trail.capacity])
+        if hasattr(trail_latlons, 'tobytes'):
+            packed.frombytes(trail_latlons.tobytes())
+        else:
+            packed.extend(trail_latlons)
+        payload = base64.b64encode(packed.tobytes()).decode('ascii')
+        self.jspy_bridge.signal_tracker_pose_updated.emit(payload)
+
+    def _flush_pose(self):
+        if self._is_ready:
+            pending = self._trail.take_pending()
+            self._emit_pose([value for point in pending for value in point])
+
+    def _schedule_pose(self):
+        if self._is_ready and not self._pose_flush_timer.isActive():
+            self._pose_flush_timer.start()
+
+    def _emit_mark_added(self, mark_id, latitude, longitude):
         payload = json.dumps({
+            'id': mark_id,
             'latitude': latitude,
             'longitude': longitude,
         })
-        self.jspy_bridge.signal_tracker_gps_updated.emit(payload)
-        
+        self.jspy_bridge.signal_marks_gps_added.emit(payload)
+
+    def _emit_marks_added(self, marks):
+        # Flat little-endian [id0, lat0, lon0, id1, lat1, lon1, ...] float64 array;
+        # integer ids are exact in float64.
+        packed = array('d')
+        for mark_id, (latitude, longitude) in marks:
+            packed.append(mark_id)
+            packed.append(latitude)
+            packed.append(longitude)
+        payload = base64.b64encode(packed.tobytes()).decode('ascii')
+        self.jspy_bridge.signal_marks_gps_batch_added.emit(payload)
+
+    # --- Level of detail ---
+
+    def _lod_wanted(self) -> bool:
+        return len(self._marks) > self._lod_min_marks
+
+    def _lod_handles_marks(self) -> bool:
+        """
+        Flags the LOD index as stale after a mark change. Returns True if the
+        page draws the marks through the LOD layer, in which case the change
+        is not sent individually; the page is told to refetch instead.
+        """
+        self._lod_dirty = True
+        if not (self._lod_shown or self._lod_wanted()):
+            return False
+        if self._is_ready and not self._lod_sync_timer.isActive():
+            self._lod_sync_timer.start()
+        return True
+
+    def _sync_lod(self):
+        if self._lod_wanted():
+            # The page drops its individual marks and refetches its viewport.
+            self._lod_shown = True
+            self.jspy_bridge.signal_marks_lod_updated.emit(True)
+        elif self._lod_shown:
+            self._lod_shown = False
+            self.jspy_bridge.signal_marks_lod_updated.emit(False)
+            if self._marks:
+                self._emit_marks_added(self._marks.items())
+
+    def _on_mark_lod_requested(self, params):
+        if self._lod_dirty:
+            self._lod.set_positions(self._marks.values())
+            self._lod_dirty = False
+        kind, values = self._lod.query(
+            params["zoom"], params["south"], params["west"], params["north"], params["east"])
+        return {
+            "kind": kind,
+            "values": base64.b64encode(values.astype('<f8').tobytes()).decode('ascii'),
+        }
+
+    def _on_map_tapped(self, params):
+        # Taps arrive batched from JS; emit one signal per tap.
+        self.signal_map_tapped.emit(params["latitude"], params["longitude"])
+
+    # --- View API Methods ---
+
+    def update_gps_position(self, latitude, longitude):
+        """Update the GPS position on the map and extend the breadcrumb trail."""
+        self._last_position = (latitude, longitude)
+        self._trail.append(latitude, longitude)
+        self._schedule_pose()
+
+    def clear_trail(self):
+        """Clear the breadcrumb trail."""
+        self._trail.clear()
+        if self._is_ready:
+            self.jspy_bridge.signal_trail_cleared.emit()
+
     def update_heading(self, heading):
         """Update the heading on the map."""
-        payload = json.dumps({'heading': heading})
-        self.jspy_bridge.signal_tracker_heading_updated.emit(payload)
-        
-    def add_gps_position_mark(self, latitude, longitude):
-        """Add a marker on the map at the given GPS position."""
-        payload = json.dumps({
-            'latitude': latitude,
-            'longitude': longitude,
-        })
-        self.jspy_bridge.signal_marks_gps_added.emit(payload)
+        self._last_heading = heading
+        self._schedule_pose()
+
+    def add_gps_position_mark(self, latitude, longitude) -> int:
+        """
+        Add a marker on the map at the given GPS position.
+
+        Returns:
+            int: The marker id, used to remove it later.
+        """
+        mark_id = next(self._mark_ids)
+        self._marks[mark_id] = (latitude, longitude)
+        if not self._lod_handles_marks() and self._is_ready:
+            self._emit_mark_added(mark_id, latitude, longitude)
         logger.debug("Sent request to add GPS position mark")
-        
-    def remove_gps_position_mark(self, latitude, longitude):
-        """Remove the marker on the map that matches the given GPS position."""
-        payload = json.dumps({
-            'latitude': latitude,
-            'longitude': longitude,
-        })
-        self.jspy_bridge.signal_marks_gps_removed.emit(payload)
-        logger.debug("Sent request to remove GPS position mark")
-        
+        return mark_id
+
+    def add_gps_position_marks(self, positions) -> list:
+        """
+        Add markers for a whole list of (latitude, longitude) positions
+        in a single message to the map.
+
+        Returns:
+            list: The marker ids, in the order of the given positions.
+        """
+        marks = [
+            (next(self._mark_ids), (float(lat), float(lon))) for lat, lon in positions
+        ]
+        self._marks.update(marks)
+        if marks and not self._lod_handles_marks() and self._is_ready:
+            self._emit_marks_added(marks)
+        logger.debug(f"Sent request to add {len(marks)} GPS position marks")
+        return [mark_id for mark_id, _ in marks]
+
+    def remove_gps_position_mark(self, mark_id: int):
+        """Remove the marker with the given id from the map."""
+        self.remove_gps_position_marks([mark_id])
+
+    def remove_gps_position_marks(self, mark_ids):
+        """Remove all markers with the given ids from the map in one message."""
+        mark_ids = [mark_id for mark_id in mark_ids if self._marks.pop(mark_id, None)]
+        if not mark_ids or self._lod_handles_marks() or not self._is_ready:
+            return
+        self.jspy_bridge.signal_marks_gps_removed.emit(json.dumps(mark_ids))
+        logger.debug(f"Sent request to remove {len(mark_ids)} GPS position marks")
+
     def reset(self):
         """Reset the map by clearing all markers."""
-        self.web_view.page().runJavaScript("clearMarkers();")
+        self._marks.clear()
+        self._lod_handles_marks()
+        if self._is_ready:
+            self.web_view.page().runJavaScript("clearMarkers();")
         logger.debug("Map view reset")
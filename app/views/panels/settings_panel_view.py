@@ -9,6 +9,9 @@ from PyQt5 import QtGui
 from typing import List, Tuple, Dict, Any
 
 from app.utils.logger import logger
+from app.utils.library_index import KIND_PARAMS
+from app.utils.param_schema import load_param_schema, get_path, apply_param_changes
+from .library_dialog_view import LibraryDialogView
 
 class SettingSliderItem(QWidget):
     def __init__(
@@ -26,17 +29,15 @@ class SettingSliderItem(QWidget):
         self.max = max
         self.step = step
         
-        # Calculate scale factor once during initialization
-        self.scale_factor = int(1 / self.step)
-        
         self.label = QLabel(f"{self.label_text}: {min:.2f}")
         self.label.setFixedWidth(fixed_width)
         
+        # Slider positions count steps from min, so any positive step works
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setFixedWidth(250)
-        self.slider.setMinimum(int(self.min * self.scale_factor))
-        self.slider.setMaximum(int(self.max * self.scale_factor))
-        self.slider.setSingleStep(1)  # Use integer steps internally
+        self.slider.setMinimum(0)
+        self.slider.setMaximum(self._position(self.max))
+        self.slider.setSingleStep(1)
         self.slider.valueChanged.connect(self.update_label)
         
         # Apply styles
@@ -70,19 +71,31 @@ class SettingSliderItem(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)  # Reduce wasted space
         self.setLayout(layout)
     
+    def _position(self, value: float) -> int:
+        """Slider position of the step nearest to `value`, within range."""
+        clamped_value = min(max(value, self.min), self.max)
+        return min(round((clamped_value - self.min) / self.step),
+                   int((self.max - self.min) / self.step + 1e-9))
+    
+    def _value(self, position: int) -> float:
+        # Rounded so that e.g. 0.1 * 3 reads as 0.3
+        return round(float(self.min + position * self.step), 9)
+    
     def update_label(self, value):
         """Update the label with the current slider value."""
-        scaled_value = value / self.scale_factor
-        self.label.setText(f"{self.label_text}: {scaled_value:.2f}")
+        self.label.setText(f"{self.label_text}: {self._value(value):.2f}")
         
     def get_value(self) -> float:
         """Get the current value of the slider."""
-        return self.slider.value() / self.scale_factor
+        return self._value(self.slider.value())
     
     def set_value(self, value: float) -> None:
         """Set the slider to a specific value."""
-        clamped_value = min(max(value, self.min), self.max)
-        self.slider.setValue(int(clamped_value * self.scale_factor))
+        self.slider.setValue(self._position(value))
+        
+    def snap(self, value: float) -> float:
+        """Returns the value the slider shows when set to `value`."""
+        return self._value(self._position(value))
 
 
 # Common UI constants - centralized to avoid duplication
@@ -136,6 +149,7 @@ class SettingsPanelView(QWidget):
         
         self._config = config
         self.full_params = None
+        self._params_library = []
         
         self.settings_tab = QTabWidget()
         # increase tab height and font size
@@ -150,42 +164,23 @@ class SettingsPanelView(QWidget):
             """
         )
         
-        # Create regulated pure pursuit tab
-        self.regulated_pure_pursuit_tab = SettingsTabWidget(
-            param_configs=[
-                ("lookahead_dist", "Lookahead Distance (m)", 0, 2.0, 0.1),
-                ("lookahead_time", "Lookahead Time (s)", 0, 3.0, 0.1),
-                ("desired_linear_vel", "Desired Linear Velocity (m/s)", 0, 1.0, 0.1),
-                ("regulated_linear_scaling_min_radius", "Regulated Linear Scaling Min Radius (m)", 0, 2.0, 0.01),
-                ("regulated_linear_scaling_min_speed", "Regulated Linear Scaling Min Speed (m/s)", 0, 1.0, 0.01),
-                ("max_angular_accel", "Max Angular Acceleration (rad/s^2)", 0, 3.2, 0.01),
-                ("min_approach_linear_velocity", "Min Approach Linear Velocity (m/s)", 0, 2.0, 0.05),
-                ("rotate_to_heading_angular_vel", "Rotate to Heading Angular Velocity (rad/s)", 0, 2.0, 0.01),
-                ("rotate_to_heading_min_angle", "Rotate to Heading Min Angle (rad)", 0, 3.14, 0.01),
-            ]
-        )
-        
-        self.others_tab = SettingsTabWidget(
-            param_configs=[
-                ("xy_goal_tolerance", "XY Goal Tolerance (m)", 0, 1.0, 0.01),
-                ("yaw_goal_tolerance", "Yaw Goal Tolerance (rad)", 0, 3.14, 0.01),
-                ("movement_time_allowance", "Movement Time Allowance (s)", 0, 20.0, 0.1),
-                ("required_movement_angle", "Required Movement Angle (rad)", 0, 3.14, 0.1),
-                ("required_movement_radius", "Required Movement Radius (m)", 0, 2.0, 0.1),
-                # ("failure_tolerance", "Failure Tolerance (s)", 0, 1.0, 0.1),
-                # ("min_theta_velocity_threshold", "Min Theta Velocity Threshold (rad/s)", 0, 2.0, 0.1),
-                # ("min_x_velocity_threshold", "Min X Velocity Threshold (m/s)", 0, 2.0, 0.1),
-            ]
-        )
-        
-        self.settings_tab.addTab(
-            self.regulated_pure_pursuit_tab,
-            "Regulated Pure Pursuit"
-        )
-        self.settings_tab.addTab(
-            self.others_tab,
-            "Others"
-        )
+        # Build one tab of sliders per schema tab, bound to their key paths
+        self._bindings: Dict[str, SettingSliderItem] = {}
+        self._tab_paths: List[Tuple[str, List[str]]] = []
+        self._baseline: Dict[str, float] = {}
+        self._loading = False
+        for tab in load_param_schema(self._config.get('settings_schema_file')):
+            tab_widget = SettingsTabWidget(
+                param_configs=[
+                    (param['path'], param['label'], param['min'], param['max'], param['step'])
+                    for param in tab['params']
+                ]
+            )
+            for path, widget in tab_widget.params_widgets.items():
+                widget.slider.valueChanged.connect(self._on_param_changed)
+                self._bindings[path] = widget
+            self._tab_paths.append((tab['title'], list(tab_widget.params_widgets)))
+            self.settings_tab.addTab(tab_widget, tab['title'])
         
         self.settings_tab.setFixedWidth(600)
         self._init_buttons()
@@ -232,13 +227,17 @@ class SettingsPanelView(QWidget):
     
     def prompt_file_dialog_for_load(self):
         """Load parameters from the file."""
-        load_file_path, _ = QFileDialog.getOpenFileName(
+        return LibraryDialogView.get_open_file(
             self,
-            "Select Parameters File",
+            KIND_PARAMS,
+            self._params_library,
             f"{self._config['mowbot_legacy_data_path']}/params",
-            "YAML Files (*.yaml);;All Files (*)",
+            "Select Parameters File",
         )
-        return load_file_path
+    
+    def update_library(self, entries: list) -> None:
+        """Stores the indexed params files offered by the load dialog."""
+        self._params_library = entries
         
     def prompt_file_dialog_for_save(self):
         """Save parameters to the file."""
@@ -254,76 +253,70 @@ class SettingsPanelView(QWidget):
         return save_file_path
     
     def update_load_params(self, yaml_data: dict) -> None:
-        """Update the load parameters with the given YAML data."""
-        # logger.info(f"Updating load parameters with data: {yaml_data}")
-        
+        """
+        Shows a loaded params document in the bound sliders. Sliders whose
+        path is missing from the document are disabled.
+        """
+        # Shared with the staging cache: read only, get_params() copies it
         self.full_params = yaml_data
-        
-        params_widgets = self.regulated_pure_pursuit_tab.params_widgets
-        rpp_data = self.full_params['controller_server']['ros__parameters']['FollowPath']
-        logger.info(f"Updating load parameters with data: {rpp_data}")
-        params_widgets["lookahead_dist"].set_value(rpp_data['lookahead_dist'])
-        params_widgets["lookahead_time"].set_value(rpp_data['lookahead_time'])
-        params_widgets["desired_linear_vel"].set_value(rpp_data['desired_linear_vel'])
-        params_widgets["regulated_linear_scaling_min_radius"].set_value(rpp_data['regulated_linear_scaling_min_radius'])
-        params_widgets["regulated_linear_scaling_min_speed"].set_value(rpp_data['regulated_linear_scaling_min_speed'])
-        params_widgets["max_angular_accel"].set_value(rpp_data['max_angular_accel'])
-        params_widgets["min_approach_linear_velocity"].set_value(rpp_data['min_approach_linear_velocity'])
-        params_widgets["rotate_to_heading_angular_vel"].set_value(rpp_data['rotate_to_heading_angular_vel'])
-        params_widgets["rotate_to_heading_min_angle"].set_value(rpp_data['rotate_to_heading_min_angle'])
-        
-        params_widgets = self.others_tab.params_widgets
-        others_data = self.full_params['controller_server']['ros__parameters']['general_goal_checker']
-        params_widgets["xy_goal_tolerance"].set_value(others_data['xy_goal_tolerance'])
-        params_widgets["yaw_goal_tolerance"].set_value(others_data['yaw_goal_tolerance'])
-        
-        others_data = self.full_params['controller_server']['ros__parameters']['progress_checker']
-        params_widgets["movement_time_allowance"].set_value(others_data['movement_time_allowance'])
-        params_widgets["required_movement_angle"].set_value(others_data['required_movement_angle'])
-        params_widgets["required_movement_radius"].set_value(others_data['required_movement_radius'])
-        
-        # others_data = self.full_params['controller_server']['ros__parameters']
-        # params_widgets["failure_tolerance"].set_value(others_data['failure_tolerance'])
-        # params_widgets["min_theta_velocity_threshold"].set_value(others_data['min_theta_velocity_threshold'])
-        # params_widgets["min_x_velocity_threshold"].set_value(others_data['min_x_velocity_threshold'])
+        self._baseline = {}
+        missing = []
+        self._loading = True
+        try:
+            for path, widget in self._bindings.items():
+                try:
+                    value = get_path(yaml_data, path)
+                    widget.set_value(float(value))
+                except (KeyError, TypeError, ValueError):
+                    widget.setEnabled(False)
+                    missing.append(path)
+                    continue
+                widget.setEnabled(True)
+                # Compare slider positions, so values between steps do not read as edits
+                self._baseline[path] = widget.get_value()
+        finally:
+            self._loading = False
+        if missing:
+            logger.warning(f"Params file lacks {len(missing)} settings: {', '.join(missing)}")
+        self._update_dirty_state()
+    
+    def _on_param_changed(self, _value: int) -> None:
+        if not self._loading:
+            self._update_dirty_state()
+    
+    def mark_params_saved(self, yaml_data: dict) -> None:
+        """
+        Takes a saved params document as the new baseline, so only edits
+        made after the save read as unsaved.
+        """
+        self.full_params = yaml_data
+        for path in self._baseline:
+            try:
+                self._baseline[path] = self._bindings[path].snap(float(get_path(yaml_data, path)))
+            except (KeyError, TypeError, ValueError):
+                continue
+        self._update_dirty_state()
+    
+    def dirty_params(self) -> Dict[str, float]:
+        """Returns the edited values by path, since the last load or save."""
+        return {
+            path: self._bindings[path].get_value()
+            for path, value in self._baseline.items()
+            if self._bindings[path].get_value() != value
+        }
+    
+    def _update_dirty_state(self) -> None:
+        dirty = self.dirty_params()
+        for index, (title, paths) in enumerate(self._tab_paths):
+            edited = any(path in dirty for path in paths)
+            self.settings_tab.setTabText(index, f"{title} *" if edited else title)
     
     def get_params(self):
+        """
+        Returns the loaded params document with the edited values applied,
+        leaving all other values as loaded.
+        """
         if self.full_params is None:
             logger.error("No parameters loaded. Cannot get params.")
             return None
-        
-        params_widgets = self.regulated_pure_pursuit_tab.params_widgets 
-        rpp_data = self.full_params['controller_server']['ros__parameters']['FollowPath']
-        rpp_data['lookahead_dist'] = params_widgets["lookahead_dist"].get_value()
-        rpp_data['lookahead_time'] = params_widgets["lookahead_time"].get_value()
-        rpp_data['desired_linear_vel'] = params_widgets["desired_linear_vel"].get_value()
-        rpp_data['regulated_linear_scaling_min_radius'] = params_widgets["regulated_linear_scaling_min_radius"].get_value()
-        rpp_data['regulated_linear_scaling_min_speed'] = params_widgets["regulated_linear_scaling_min_speed"].get_value()
-        rpp_data['max_angular_accel'] = params_widgets["max_angular_accel"].get_value()
-        rpp_data['min_approach_linear_velocity'] = params_widgets["min_approach_linear_velocity"].get_value()
-        rpp_data['rotate_to_heading_angular_vel'] = params_widgets["rotate_to_heading_angular_vel"].get_value()
-        rpp_data['rotate_to_heading_min_angle'] = params_widgets["rotate_to_heading_min_angle"].get_value()
-        self.full_params['controller_server']['ros__parameters']['FollowPath'] = rpp_data # reupdate
-        params_widgets = self.others_tab.params_widgets
-        others_data = self.full_params['controller_server']['ros__parameters']['general_goal_checker']
-        others_data['xy_goal_tolerance'] = params_widgets["xy_goal_tolerance"].get_value()
-        others_data['yaw_goal_tolerance'] = params_widgets["yaw_goal_tolerance"].get_value() 
-        self.full_params['controller_server']['ros__parameters']['general_goal_checker'] = others_data # reupdate
-        others_data = self.full_params['controller_server']['ros__parameters']['progress_checker']
-        others_data['movement_time_allowance'] = params_widgets["movement_time_allowance"].get_value()
-        others_data['required_movement_angle'] = params_widgets["required_movement_angle"].get_value()
-        others_data['required_movement_radius'] = params_widgets["required_movement_radius"].get_value()
-        self.full_params['controller_server']['ros__parameters']['progress_checker'] = others_data # reupdate
-        # others_data = self.full_params['controller_server']['ros__parameters']
-        # others_data['failure_tolerance'] = params_widgets["failure_tolerance"].get_value()
-        # others_data['min_theta_velocity_threshold'] = params_widgets["min_theta_velocity_threshold"].get_value()
-        # others_data['min_x_velocity_threshold'] = params_widgets["min_x_velocity_threshold"].get_value()
-        # self.full_params['controller_server']['ros__parameters'] = others_data
-        return self.full_params
-        
-        
-        
-        
-            
-            
-    
\ No newline at end of file
+        return apply_param_changes(self.full_params, self.dirty_params())
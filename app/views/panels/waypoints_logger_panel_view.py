@@ -1,5 +1,7 @@
 # waypoints_logger_panel_view.py
 import os
+import math
+import time
 import yaml
 import numpy as np
 from datetime import datetime
@@ -10,16 +12,22 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QGroupBox,
     QFileDialog,
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import pyqtSlot
-from scipy.spatial.transform import Rotation as R
+from PyQt5.QtCore import QTimer, pyqtSlot
 
 from .map_view import MapView
+from app.utils.auto_log import AutoLogTrigger
+from app.utils.fix_average import FixAverager
+from app.utils.coverage import boustrophedon_path
+from app.utils.geo import local_frame, local_meters_per_degree
+from app.utils.journal import WaypointJournal
+from app.utils.waypoint_formats import WAYPOINT_FILE_FILTER
+from app.models.file_io_model import FileIoModel
+from app.models.waypoint_log_table_model import WaypointLogTableModel
 from app.utils.logger import logger
 
 
@@ -32,8 +40,9 @@ class WaypointsLoggerOptionBarView(QWidget):
         self._config = config
 
         # Create the table for displaying waypoint data.
-        self.table_view = QTableWidget(0, 3)
-        self.table_view.setHorizontalHeaderLabels(['Lat', 'Lon', 'Hdg'])
+        self.table_model = WaypointLogTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
         self.table_view.setFixedWidth(200)
         # self.table_view.setFixedHeight(80)
         font = self.table_view.font()
@@ -56,6 +65,13 @@ class WaypointsLoggerOptionBarView(QWidget):
         self.log_btn.setFixedWidth(80)
         self.log_btn.setFixedHeight(80)
         
+        # Toggles automatic logging by distance / heading change
+        self.auto_btn = QPushButton('Auto')
+        self.auto_btn.setFont(btn_font)
+        self.auto_btn.setFixedWidth(80)
+        self.auto_btn.setFixedHeight(80)
+        self.auto_btn.setCheckable(True)
+        
         self.rm_btn = QPushButton('Remove')
         self.rm_btn.setFont(btn_font)
         self.rm_btn.setFixedWidth(80)
@@ -84,6 +100,8 @@ class WaypointsLoggerOptionBarView(QWidget):
         btn_layout = QVBoxLayout()
         btn_layout.addWidget(self.log_btn)
         btn_layout.setSpacing(10)
+        btn_layout.addWidget(self.auto_btn)
+        btn_layout.setSpacing(10)
         btn_layout.addWidget(self.rm_btn)    
         btn_layout.setSpacing(10)
         btn_layout.addWidget(self.clear_btn)
@@ -103,32 +121,69 @@ class WaypointsLoggerOptionBarView(QWidget):
     def add_row_to_table(self, data: dict):
         """
         Adds a row to the table using a data dictionary with keys:
-        'latitude', 'longitude', and 'heading'.
+        'latitude', 'longitude', 'heading' and optionally 'timestamp',
+        'fix_status', 'mark_id', 'std_east_m', 'std_north_m' and 'samples'.
+        Returns the index of the new row.
+        """
+        row = self.table_model.append(
+            latitude=data['latitude'],
+            longitude=data['longitude'],
+            yaw=data['heading'],
+            timestamp=data.get('timestamp'),
+            fix_status=data.get('fix_status', -1),
+            mark_id=data.get('mark_id'),
+            std_east_m=data.get('std_east_m', float('nan')),
+            std_north_m=data.get('std_north_m', float('nan')),
+            samples=data.get('samples', 1),
+        )
+        self.table_view.scrollToBottom()
+        return row
+        
+    def get_mark_id(self, row: int):
+        """
+        Returns the map marker id stored for the given row, or None.
         """
-        row_position = self.table_view.rowCount()
-        self.table_view.insertRow(row_position)
-        self.table_view.setItem(row_position, 0, QTableWidgetItem(data['latitude']))
-        self.table_view.setItem(row_position, 1, QTableWidgetItem(data['longitude']))
-        self.table_view.setItem(row_position, 2, QTableWidgetItem(data['heading']))
+        return self.table_model.mark_id(row)
+    
+    def select_row(self, row: int):
+        """
+        Makes a row the current one and scrolls it into view.
+        """
+        self.table_view.selectRow(row)
+        self.table_view.scrollTo(self.table_model.index(row, 0))
+        
+    def get_selected_row(self) -> int:
+        """
+        Returns the current row, or -1 if none.
+        """
+        return self.table_view.currentIndex().row()
         
     def remove_row_from_table(self, row: int):
         """
         Removes a row from the table at the specified index.
         """
-        if row >= 0 and row < self.table_view.rowCount():
-            self.table_view.removeRow(row)
+        self.table_model.remove(row)
         
     def clear_table(self):
-        self.table_view.setRowCount(0)
-        self.table_view.clearContents()
-        self.table_view.setHorizontalHeaderLabels(['Lat', 'Lon', 'Hdg'])
+        self.table_model.clear()
 
 
 class WaypointsLoggerPanelView(QWidget):
     """
     A view that composes the waypoint logging option bar and a map view.
     It also displays current GPS and heading information.
+    
+    Waypoints are captured according to `waypoint_capture_mode`: "single"
+    takes the last fix, "last_n" averages the last `waypoint_capture_fixes`
+    fixes and "next_seconds" averages the fixes received during the next
+    `waypoint_capture_seconds`.
     """
+    
+    # Recent fixes kept for averaged captures
+    FIX_BUFFER_CAPACITY = 512
+    
+    # Session journal, replayed at startup to restore unsaved waypoints
+    JOURNAL_FILE_NAME = '__waypoints_session__.journal'
     def __init__(
         self, 
         config
@@ -138,10 +193,22 @@ class WaypointsLoggerPanelView(QWidget):
         self._last_gps_lat: float = 0.0
         self._last_gps_lon: float = 0.0
         self._last_heading: float = 0.0
+        self._last_fix_status: int = -1
         
         # Flag for whether logging is active (if needed by a controller)
         self._wp_log_started = False
         
+        # Recent fixes for averaged waypoint capture
+        self._fix_averager = FixAverager(capacity=self.FIX_BUFFER_CAPACITY)
+        self._capture_started_at = None
+        
+        # Automatic logging from the live fix stream
+        self._auto_log_enabled = False
+        self._auto_log_trigger = AutoLogTrigger(
+            min_distance_m=self._config.get('auto_log_min_distance_m', 1.0),
+            min_heading_change_rad=self._config.get('auto_log_min_heading_change_rad', 0.35),
+        )
+        
         # Create subcomponents.
         self.option_bar = WaypointsLoggerOptionBarView(
             config=self._config
@@ -149,10 +216,22 @@ class WaypointsLoggerPanelView(QWidget):
         self.map_view = MapView(
             config=self._config
         )
+        self.map_view.signal_map_tapped.connect(self._on_map_tapped)
         self.gps_info_display = QLabel()
         self.hdg_info_display = QLabel()
         
+        # Crash-safe journal of the logging session; fsyncs are batched.
+        self._journal = WaypointJournal(
+            os.path.join(self._config['mowbot_legacy_data_path'], self.JOURNAL_FILE_NAME))
+        self._journal_sync_timer = QTimer(self)
+        self._journal_sync_timer.setSingleShot(True)
+        self._journal_sync_timer.setInterval(self._config.get('waypoint_journal_sync_ms', 500))
+        self._journal_sync_timer.timeout.connect(self._journal.sync)
+        # (file path, journal snapshot) of the save in progress
+        self._journal_save = None
+        
         self._init_ui()
+        self._restore_journal()
 
     def _init_ui(self):
         layout = QHBoxLayout()
@@ -174,6 +253,75 @@ class WaypointsLoggerPanelView(QWidget):
         layout.addLayout(map_layout)
         self.setLayout(layout) 
         
+    def _restore_journal(self):
+        """
+        Restores the waypoints of an unsaved session from the journal.
+        """
+        rows = self._journal.replay()
+        if not rows:
+            return
+        mark_ids = self.map_view.add_gps_position_marks([(row[0], row[1]) for row in rows])
+        self.option_bar.table_model.extend_rows(rows, mark_ids=mark_ids)
+        last = rows[-1]
+        self._auto_log_trigger.mark_logged(last[0], last[1], last[2])
+        logger.info(f"Restored {len(rows)} logged waypoints from {self._journal.path}")
+        
+    @pyqtSlot(float, float)
+    def _on_map_tapped(self, latitude: float, longitude: float):
+        """
+        Selects the logged waypoint nearest to a map tap, if it lies within
+        `waypoint_tap_select_radius_m`, e.g. to remove it.
+        """
+        records = self.option_bar.table_model.records()
+        if len(records) == 0:
+            return
+        east_scale, north_scale = local_meters_per_degree(latitude)
+        distances = np.hypot((records['longitude'] - longitude) * east_scale,
+                             (records['latitude'] - latitude) * north_scale)
+        row = int(np.argmin(distances))
+        if distances[row] <= self._config.get('waypoint_tap_select_radius_m', 2.0):
+            self.option_bar.select_row(row)
+            
+    def _journal_changed(self):
+        if not self._journal_sync_timer.isActive():
+            self._journal_sync_timer.start()
+            
+    def begin_journal_save(self, file_path: str):
+        """
+        Snapshots the session journal for a save of the table to
+        `file_path`; the journal is only rewritten once the save succeeds
+        (see retire_journal).
+        """
+        if self._journal_save is not None:
+            # A save is still pending; its snapshot keeps the newer records
+            return
+        snapshot = self._journal.begin_compaction(self.option_bar.table_model.rows(), saved=True)
+        if snapshot is not None:
+            self._journal_save = (file_path, snapshot)
+            
+    def retire_journal(self, file_path: str):
+        """
+        Marks the journaled session as saved once `file_path` is written,
+        compacting the journal in the background.
+        """
+        if self._journal_save is None or self._journal_save[0] != file_path:
+            return
+        _, snapshot = self._journal_save
+        self._journal_save = None
+        FileIoModel.get_instance(self._config).submit(self._journal.compact, snapshot)
+        
+    def keep_journal(self, file_path: str):
+        """Leaves the journal as it is after a failed save of `file_path`."""
+        if self._journal_save is None or self._journal_save[0] != file_path:
+            return
+        self._journal_save = None
+        self._journal.abort_compaction()
+        
+    def close_journal(self):
+        """Flushes and closes the session journal."""
+        self._journal_sync_timer.stop()
+        self._journal.close()
+
     # -- UI Update API Methods --
     def get_last_gps_lat(self) -> float:
         """
@@ -193,40 +341,116 @@ class WaypointsLoggerPanelView(QWidget):
         """
         return self._last_heading
 
+    def set_auto_log_enabled(self, enabled: bool):
+        """
+        Enables or disables automatic logging. While enabled, a waypoint is
+        logged whenever a fix is far enough from, or heads differently enough
+        from, the last logged waypoint.
+        """
+        self._auto_log_enabled = enabled
+        logger.info(f"Automatic waypoint logging {'enabled' if enabled else 'disabled'}")
+        
+    def is_auto_log_enabled(self) -> bool:
+        return self._auto_log_enabled
+
+    def capture_waypoint(self):
+        """
+        Logs a waypoint at the current position using the configured capture mode.
+        """
+        mode = self._config.get('waypoint_capture_mode', 'single')
+        if mode == 'last_n':
+            self._log_averaged_waypoint(
+                self._fix_averager.average(count=self._config.get('waypoint_capture_fixes', 10)))
+        elif mode == 'next_seconds':
+            if self._capture_started_at is not None:
+                return
+            self._capture_started_at = time.monotonic()
+            self.option_bar.log_btn.setEnabled(False)
+            self.option_bar.log_btn.setText("...")
+            QTimer.singleShot(
+                int(self._config.get('waypoint_capture_seconds', 3.0) * 1000),
+                self._finish_timed_capture)
+        else:
+            self.update_table_map_with_logged_waypoint(
+                latitude=self._last_gps_lat,
+                longitude=self._last_gps_lon,
+                heading=self._last_heading,
+            )
+            
+    def _finish_timed_capture(self):
+        started_at, self._capture_started_at = self._capture_started_at, None
+        self.option_bar.log_btn.setEnabled(True)
+        self.option_bar.log_btn.setText("Log")
+        self._log_averaged_waypoint(self._fix_averager.average(since=started_at))
+        
+    def _log_averaged_waypoint(self, average):
+        if average is None:
+            logger.warning("No GPS fixes to average, waypoint not logged")
+            return
+        logger.info(
+            f"Averaged waypoint over {average['samples']} fixes "
+            f"({average['rejected']} rejected), spread "
+            f"{average['std_east_m']:.3f} / {average['std_north_m']:.3f} m")
+        self.update_table_map_with_logged_waypoint(
+            latitude=average['latitude'],
+            longitude=average['longitude'],
+            heading=self._last_heading,
+            average=average,
+        )
+
     def update_table_map_with_logged_waypoint(self, 
-                latitude: float, longitude: float, heading: float):
+                latitude: float, longitude: float, heading: float, average: dict = None):
         """
         Updates the map view with a new marker and adds the corresponding data to the table.
+        `average` is the FixAverager result the position was taken from, if any.
         """
-        self.map_view.add_gps_position_mark(latitude=latitude, longitude=longitude)
-        self.option_bar.add_row_to_table({
-            'latitude': str(latitude),
-            'longitude': str(longitude),
-            'heading': str(heading),
-        })       
+        self._auto_log_trigger.mark_logged(latitude, longitude, heading)
+        mark_id = self.map_view.add_gps_position_mark(latitude=latitude, longitude=longitude)
+        row = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'heading': heading,
+            'fix_status': self._last_fix_status,
+            'mark_id': mark_id,
+        }
+        if average is not None:
+            row.update(
+                std_east_m=average['std_east_m'],
+                std_north_m=average['std_north_m'],
+                samples=average['samples'],
+            )
+        row_index = self.option_bar.add_row_to_table(row)
+        self._journal.log(self.option_bar.table_model.row_values(row_index))
+        self._journal_changed()
         
-    def update_gps_info(self, latitude: float, longitude: float):
+    def update_gps_info(self, latitude: float, longitude: float, status: int = -1,
+                        position_covariance: list = None):
         """
         Updates the map view's GPS marker and refreshes the GPS information display.
         """
         self._last_gps_lat = latitude
         self._last_gps_lon = longitude
+        self._last_fix_status = status
+        self._fix_averager.append(latitude, longitude, position_covariance)
+        if self._auto_log_enabled and self._auto_log_trigger.should_log(
+                latitude, longitude, self._last_heading):
+            self.update_table_map_with_logged_waypoint(
+                latitude=latitude, longitude=longitude, heading=self._last_heading)
         self.map_view.update_gps_position(latitude=latitude, longitude=longitude)
         self.gps_info_display.setText(
             f"lat: {latitude:.6f}, lon: {longitude:.6f}"
         )
         
-    def update_heading_info(self, data: dict):
+    def update_heading_info(self, yaw_enu: float, bearing_ned: float):
         """
-        Converts quaternion heading data to a readable value, updates the map view's heading,
-        and refreshes the heading information display.
+        Updates the map view's heading and refreshes the heading information display.
+        
+        Args:
+            yaw_enu (float): Heading as ENU yaw in radians.
+            bearing_ned (float): Heading as NED bearing in degrees, used by the map.
         """
-        quat = [data['x'], data['y'], data['z'], data['w']]
-        euler = R.from_quat(quat).as_euler('xyz', degrees=True)
-        yaw_enu = euler[2]
-        yaw_ned = (90 - yaw_enu) % 360
-        self.map_view.update_heading(heading=yaw_ned)
-        self._last_heading = np.deg2rad(yaw_enu)
+        self.map_view.update_heading(heading=bearing_ned)
+        self._last_heading = yaw_enu
         self.hdg_info_display.setText(
             f"heading: {self._last_heading:.4f} rad"
         )
@@ -246,7 +470,7 @@ class WaypointsLoggerPanelView(QWidget):
             self,
             "Save Waypoints",
             os.path.join(default_path, default_filename),
-            "YAML Files (*.yaml);;All Files (*)",
+            WAYPOINT_FILE_FILTER,
         )
         return file_path
 
@@ -262,48 +486,75 @@ class WaypointsLoggerPanelView(QWidget):
         Returns a list of logged waypoints as dictionaries with keys:
         'latitude', 'longitude', and 'heading'.
         """
-        waypoints = []
-        for row in range(self.option_bar.table_view.rowCount()):
-            lat = self.option_bar.table_view.item(row, 0).text()
-            lon = self.option_bar.table_view.item(row, 1).text()
-            hdg = self.option_bar.table_view.item(row, 2).text()
-            waypoints.append({
-                'latitude': float(lat),
-                'longitude': float(lon),
-                'heading': float(hdg),
-            })
-        return waypoints
+        return self.option_bar.table_model.to_waypoints()
     
     def remove_selected_log_waypoints(self):
         """
         Removes the selected waypoint from the table and map.
         """
-        selected_row = self.option_bar.table_view.currentRow()
+        selected_row = self.option_bar.get_selected_row()
         if selected_row >= 0:
-            lat = self.option_bar.table_view.item(selected_row, 0).text()
-            lon = self.option_bar.table_view.item(selected_row, 1).text()
             # remove marker from map
-            self.map_view.remove_gps_position_mark(
-                latitude=float(lat), longitude=float(lon)
-            )
+            mark_id = self.option_bar.get_mark_id(selected_row)
+            if mark_id is not None:
+                self.map_view.remove_gps_position_mark(mark_id)
             self.option_bar.remove_row_from_table(selected_row)
+            self._journal.remove(selected_row)
+            self._journal_changed()
+    
+    def generate_coverage_path(self) -> bool:
+        """
+        Replaces the logged boundary waypoints with a boustrophedon coverage
+        path planned inside them, using `coverage_swath_width_m`,
+        `coverage_headland_m` and `coverage_lane_angle_deg` from the config.
+        
+        Returns:
+            bool: True if a path was generated.
+        """
+        boundary = self.option_bar.table_model.records()
+        if len(boundary) < 3:
+            logger.warning("At least 3 logged boundary waypoints are needed to generate a path")
+            return False
+        
+        started_at = time.perf_counter()
+        # Plan in a local ENU plane centered on the boundary
+        frame = local_frame(
+            float(boundary['latitude'].mean()), float(boundary['longitude'].mean()))
+        east, north, _ = frame.to_enu(boundary['latitude'], boundary['longitude'])
+        polygon = np.column_stack((east, north))
+        lane_angle_deg = self._config.get('coverage_lane_angle_deg')
+        points, yaws = boustrophedon_path(
+            polygon,
+            swath_width_m=self._config.get('coverage_swath_width_m', 0.5),
+            headland_m=self._config.get('coverage_headland_m', 1.0),
+            angle=None if lane_angle_deg is None else math.radians(lane_angle_deg),
+        )
+        if len(points) == 0:
+            logger.warning("The boundary is too small for the configured swath and headland")
+            return False
+        latitudes, longitudes, _ = frame.to_geodetic(points[:, 0], points[:, 1])
+        
+        # Swap the boundary for the path on the map and in the table in one batch
+        self.clear_log_waypoints()
+        mark_ids = self.map_view.add_gps_position_marks(zip(latitudes, longitudes))
+        self.option_bar.table_model.extend(latitudes, longitudes, yaws, mark_ids=mark_ids)
+        self._journal.log_many(self.option_bar.table_model.rows())
+        self._journal_changed()
+        logger.info(
+            f"Generated coverage path with {len(points)} waypoints from "
+            f"{len(boundary)} boundary points in "
+            f"{(time.perf_counter() - started_at) * 1000:.0f} ms")
+        return True
     
     def clear_log_waypoints(self):
         """
         Clears all logged waypoints from the table and map.
         """
-        # Get all waypoints first before modifying the table
-        waypoints_to_remove = []
-        for row in range(self.option_bar.table_view.rowCount()):
-            item_lat = self.option_bar.table_view.item(row, 0)
-            item_lon = self.option_bar.table_view.item(row, 1)
-            if item_lat and item_lon:  # Check if items exist
-                waypoints_to_remove.append((float(item_lat.text()), float(item_lon.text())))
-        
-        # Remove markers from map
-        for lat, lon in waypoints_to_remove:
-            self.map_view.remove_gps_position_mark(latitude=lat, longitude=lon)
+        # Remove all markers from the map in one batch
+        self.map_view.remove_gps_position_marks(self.option_bar.table_model.mark_ids())
         
         # Clear the entire table at once
         self.option_bar.clear_table()
-    
\ No newline at end of file
+        self._auto_log_trigger.reset()
+        self._journal.clear()
+        self._journal_changed()
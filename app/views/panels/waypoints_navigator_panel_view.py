@@ -1,7 +1,5 @@
 # waypoints_navigator_panel_view.py
 import os
-import numpy as np
-from scipy.spatial.transform import Rotation as R
 from PyQt5.QtWidgets import (
     QWidget,
     QLabel,
@@ -9,11 +7,13 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QGroupBox,
-    QFileDialog,
 )
 from PyQt5.QtCore import pyqtSlot
 
 from .map_view import MapView
+from .library_dialog_view import LibraryDialogView
+from app.utils.library_index import KIND_WAYPOINTS, KIND_PARAMS
+from app.utils.waypoint_formats import WAYPOINT_FILE_FILTER
 from app.utils.logger import logger
 
 
@@ -52,6 +52,9 @@ class WaypointsNavigatorOptionBarView(QWidget):
         self.param_info_display = QLabel()
         self.param_info_display.setText("Params: Empty")
         # self.param_info_display.setFixedHeight(40)
+        
+        self.tile_info_display = QLabel()
+        self.tile_info_display.setText("Map tiles: -")
 
         # Initialize UI
         self._init_ui()
@@ -72,6 +75,8 @@ class WaypointsNavigatorOptionBarView(QWidget):
         info_layout.setSpacing(10)
         info_layout.addWidget(self.param_info_display)
         info_layout.setSpacing(10)
+        info_layout.addWidget(self.tile_info_display)
+        info_layout.setSpacing(10)
         info_layout.addStretch(1)
         info_grpbox.setLayout(info_layout)
         bar_layout.addWidget(info_grpbox)
@@ -98,6 +103,7 @@ class WaypointsNavigatorPanelView(QWidget):
         self._last_gps_lat = None
         self._last_gps_lon = None
         self._last_gps_heading = None
+        self._library_entries = {KIND_WAYPOINTS: [], KIND_PARAMS: []}
         
         # Create subcomponents.
         self.option_bar = WaypointsNavigatorOptionBarView(
@@ -109,6 +115,7 @@ class WaypointsNavigatorPanelView(QWidget):
 
         self.gps_info_display = QLabel()
         self.hdg_info_display = QLabel()
+        self.progress_info_display = QLabel()
         
         # Initialize UI
         self._init_ui()
@@ -126,6 +133,8 @@ class WaypointsNavigatorPanelView(QWidget):
         info_layout.setSpacing(10)
         info_layout.addWidget(self.hdg_info_display)
         info_layout.setSpacing(10)
+        info_layout.addWidget(self.progress_info_display)
+        info_layout.setSpacing(10)
         info_layout.addStretch(1)
         layout.addLayout(info_layout)
         
@@ -138,28 +147,33 @@ class WaypointsNavigatorPanelView(QWidget):
         Prompts the user to select a waypoint file for loading.
         """
         
-        load_file_path, _ = QFileDialog.getOpenFileName(
+        return LibraryDialogView.get_open_file(
             self,
-            "Select Waypoints File",
+            KIND_WAYPOINTS,
+            self._library_entries[KIND_WAYPOINTS],
             self._config['mowbot_legacy_data_path'] + '/waypoints',
-            "YAML Files (*.yaml);;All Files (*)",
+            "Select Waypoints File",
+            WAYPOINT_FILE_FILTER,
         )
-        
-        return load_file_path
     
     def prompt_for_params_file_load(self):
         """
         Prompts the user to select a parameters file for loading.
         """
         
-        load_file_path, _ = QFileDialog.getOpenFileName(
+        return LibraryDialogView.get_open_file(
             self,
-            "Select Parameters File",
+            KIND_PARAMS,
+            self._library_entries[KIND_PARAMS],
             self._config['mowbot_legacy_data_path'] + '/params',
-            "YAML Files (*.yaml);;All Files (*)",
+            "Select Parameters File",
         )
-        
-        return load_file_path
+    
+    def update_library(self, kind: str, entries: list):
+        """
+        Stores the indexed library entries offered by the load dialogs.
+        """
+        self._library_entries[kind] = entries
     
     def update_gps_info(self, latitude: float, longitude: float):
         """
@@ -172,17 +186,16 @@ class WaypointsNavigatorPanelView(QWidget):
             f"lat: {latitude:.6f}, lon: {longitude:.6f}"
         )
         
-    def update_heading_info(self, data: dict):
+    def update_heading_info(self, yaw_enu: float, bearing_ned: float):
         """
-        Converts quaternion heading data to a readable value, updates the map view's heading,
-        and refreshes the heading information display.
+        Updates the map view's heading and refreshes the heading information display.
+        
+        Args:
+            yaw_enu (float): Heading as ENU yaw in radians.
+            bearing_ned (float): Heading as NED bearing in degrees, used by the map.
         """
-        quat = [data['x'], data['y'], data['z'], data['w']]
-        euler = R.from_quat(quat).as_euler('xyz', degrees=True)
-        yaw_enu = euler[2]
-        yaw_ned = (90 - yaw_enu) % 360
-        self.map_view.update_heading(heading=yaw_ned)
-        self._last_heading = np.deg2rad(yaw_enu)
+        self.map_view.update_heading(heading=bearing_ned)
+        self._last_heading = yaw_enu
         self.hdg_info_display.setText(
             f"heading: {self._last_heading:.4f} rad"
         )
@@ -200,3 +213,32 @@ class WaypointsNavigatorPanelView(QWidget):
         self.option_bar.param_info_display.setText(f"Params: {file_path}")
         
     
+        
+    def update_mission_progress_info(self, progress: dict):
+        """
+        Refreshes the mission progress display (see MissionProgress.update()).
+        """
+        if not progress:
+            self.progress_info_display.setText("")
+            return
+        text = (
+            f"progress: wp {progress['waypoint_index']}/{progress['waypoint_count']}"
+            f" {progress['percent_complete']:.1f}%,"
+            f" xte {progress['cross_track_m']:+.2f} m,"
+            f" {progress['distance_remaining_m']:.0f} m left"
+        )
+        if progress['eta_s'] is not None:
+            minutes, seconds = divmod(int(progress['eta_s']), 60)
+            text += f", eta {minutes}:{seconds:02d}"
+        self.progress_info_display.setText(text)
+        
+    def update_tile_prefetch_info(self, done: int, total: int, hits: int):
+        """
+        Updates the map tile prefetch progress and cache hit ratio display.
+        """
+        if total == 0:
+            self.option_bar.tile_info_display.setText("Map tiles: -")
+            return
+        hit_ratio = 100.0 * hits / done if done else 0.0
+        self.option_bar.tile_info_display.setText(
+            f"Map tiles: {done}/{total} (cached {hit_ratio:.0f}%)")
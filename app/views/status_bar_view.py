@@ -1,16 +1,30 @@
 from typing import Literal
 
 from PyQt5.QtWidgets import (
-    QWidget, 
-    QHBoxLayout, 
-    QLabel, 
+    QWidget,
+    QHBoxLayout,
+    QLabel,
     QGroupBox
 )
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QPalette, QColor
 
 from app.utils.logger import logger
 
 class StatusItem(QWidget):
-    def __init__(self, name: str):
+
+    # Status text -> label color. Unknown statuses fall back to red.
+    STATUS_COLORS = {
+        "Active": "green",
+        "Inactive": "red",
+        "Stale": "orange",
+    }
+    DEFAULT_COLOR = "red"
+
+    # Palettes are built once and shared by every item.
+    _palettes = {}
+
+    def __init__(self, name: str, stale_timeout_ms: int = 0):
         super().__init__()
 
         layout = QHBoxLayout()
@@ -18,17 +32,63 @@ class StatusItem(QWidget):
         self.name_label = QLabel(f"{name}:")
         self.name_label.setStyleSheet("font-weight: bold;")
 
-        self.status_label = QLabel("Inactive")
-        self.status_label.setStyleSheet("color: red;")
+        self.status_label = QLabel()
+        self._status = None
+        self.set_status("Inactive")
+
+        # Flips the item to "Stale" when no update arrives in time.
+        self._stale_timer = QTimer(self)
+        self._stale_timer.setSingleShot(True)
+        self._stale_timer.timeout.connect(self._on_stale_timeout)
+        self._stale_timeout_ms = stale_timeout_ms
 
         layout.addWidget(self.name_label)
         layout.addWidget(self.status_label)
 
         self.setLayout(layout)
 
+    @classmethod
+    def _palette_for(cls, status: str) -> QPalette:
+        color = cls.STATUS_COLORS.get(status, cls.DEFAULT_COLOR)
+        palette = cls._palettes.get(color)
+        if palette is None:
+            palette = QPalette()
+            palette.setColor(QPalette.WindowText, QColor(color))
+            cls._palettes[color] = palette
+        return palette
+
+    def status(self) -> str:
+        """Returns the status currently shown."""
+        return self._status
+
+    def set_status(self, status: str) -> bool:
+        """
+        Shows the given status, touching the label only on transitions.
+
+        Returns:
+            bool: True if the status changed.
+        """
+        if status == self._status:
+            return False
+        self._status = status
+        self.status_label.setText(status)
+        self.status_label.setPalette(self._palette_for(status))
+        return True
+
+    def feed(self, status: str) -> bool:
+        """
+        Records a fresh status update and restarts the staleness timer.
+        """
+        if self._stale_timeout_ms > 0:
+            self._stale_timer.start(self._stale_timeout_ms)
+        return self.set_status(status)
+
+    def _on_stale_timeout(self):
+        self.set_status("Stale")
+
 
 class StatusBarView(QWidget):
-    
+
     STATUS_NAME_LIST = [
         "IMU",
         "GPS",
@@ -37,8 +97,10 @@ class StatusBarView(QWidget):
         "Lidar",
     ]
 
-    def __init__(self):
+    def __init__(self, config=None):
         super().__init__()
+        self._config = config or {}
+        stale_timeout_ms = self._config.get("sensor_status_stale_timeout_ms", 0)
 
         layout = QHBoxLayout()
         group_box = QGroupBox("Status")
@@ -49,7 +111,7 @@ class StatusBarView(QWidget):
         self.status_item_dict = {}
 
         for name in self.STATUS_NAME_LIST:
-            item = StatusItem(name)
+            item = StatusItem(name, stale_timeout_ms=stale_timeout_ms)
             status_layout.addWidget(item)
             status_layout.addSpacing(20)
             self.status_item_dict[name] = item
@@ -60,20 +122,19 @@ class StatusBarView(QWidget):
 
         self.setLayout(layout)
         self.setFixedHeight(100)
-        
-    
+
+
     def update_status(self, name: str, status: Literal["Inactive", "Active"]):
         """
-        Update the status of a specific item.
+        Update the status of a specific item. Widgets are only touched
+        when the status actually changes.
 
         Args:
             name (str): The name of the status item to update.
             status (str): The new status to set.
         """
-        if name in self.status_item_dict:
-            item = self.status_item_dict[name]
-            item.status_label.setText(status)
-            item.status_label.setStyleSheet(
-                "color: green;" if status == "Active" else "color: red;")
+        item = self.status_item_dict.get(name)
+        if item is not None:
+            item.feed(status)
         else:
             logger.warning(f"Status item '{name}' not found in status bar.")
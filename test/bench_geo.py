@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.utils import geo
+
+
+def make_points(count, lat0=37.7749, lon0=-122.4194, spread_deg=0.05, seed=0):
+    """Generates random positions in a square around a center point."""
+    rng = np.random.default_rng(seed)
+    lat = lat0 + rng.uniform(-spread_deg, spread_deg, count)
+    lon = lon0 + rng.uniform(-spread_deg, spread_deg, count)
+    alt = rng.uniform(0.0, 50.0, count)
+    return lat, lon, alt
+
+
+def timed(func, *args, repeat=3):
+    """Returns the best wall time in seconds over `repeat` runs and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started_at)
+    return best, result
+
+
+def main():
+    """
+    Benchmarks the vectorized geodesy helpers of app.utils.geo on arrays of
+    random positions and reports their throughput and round-trip error.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark app.utils.geo.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="numbers of points")
+    args = parser.parse_args()
+
+    for count in args.counts:
+        lat, lon, alt = make_points(count)
+        lat2, lon2, _ = make_points(count, seed=1)
+        frame = geo.local_frame(37.7749, -122.4194)
+        x, y, z = geo.geodetic_to_ecef(lat, lon, alt)
+        east, north, up = frame.to_enu(lat, lon, alt)
+        easting, northing, zone, northern = geo.geodetic_to_utm(lat, lon)
+
+        cases = [
+            ("geodetic_to_ecef", geo.geodetic_to_ecef, (lat, lon, alt), None),
+            ("ecef_to_geodetic", geo.ecef_to_geodetic, (x, y, z), lat),
+            ("frame.to_enu", frame.to_enu, (lat, lon, alt), None),
+            ("frame.to_geodetic", frame.to_geodetic, (east, north, up), lat),
+            ("geodetic_to_utm", geo.geodetic_to_utm, (lat, lon), None),
+            ("utm_to_geodetic", geo.utm_to_geodetic, (easting, northing, zone, northern), lat),
+            ("haversine_distance", geo.haversine_distance, (lat, lon, lat2, lon2), None),
+            ("initial_bearing", geo.initial_bearing, (lat, lon, lat2, lon2), None),
+            ("vincenty_inverse", geo.vincenty_inverse, (lat, lon, lat2, lon2), None),
+        ]
+        print(f"--- {count} points ---")
+        for name, func, func_args, expected_lat in cases:
+            seconds, result = timed(func, *func_args)
+            line = f"{name:>20}: {seconds * 1000:8.1f} ms  {count / seconds / 1e6:6.2f} Mpts/s"
+            if expected_lat is not None:
+                error_m = np.abs(result[0] - expected_lat).max() * 111_320.0
+                line += f"  max round-trip error {error_m * 1000:.3f} mm"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
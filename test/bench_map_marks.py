@@ -0,0 +1,81 @@
+import os
+os.environ['QTWEBENGINE_CHROMIUM_FLAGS'] = '--no-sandbox --disable-gpu'
+
+import sys
+import time
+import argparse
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.config import get_config
+from app.views.panels.map_view import MapView
+
+
+def make_positions(count, lat0=37.7749, lon0=-122.4194):
+    """Generates a lawnmower-like pattern of positions around a center point."""
+    positions = []
+    for i in range(count):
+        row, col = divmod(i, 50)
+        positions.append((lat0 + row * 1e-5, lon0 + col * 1e-5))
+    return positions
+
+
+def main():
+    """
+    Benchmarks adding a whole waypoint set to the map one mark at a time
+    versus a single packed batch. Time is measured until the layers
+    are present on the JS side.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark map mark loading.")
+    parser.add_argument("--count", type=int, default=2000, help="number of marks")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    map_view = MapView(config=get_config())
+    map_view.resize(800, 600)
+    map_view.show()
+
+    positions = make_positions(args.count)
+    results = {}
+    pending = ["per_point", "batch"]
+
+    def wait_for_layers(name, started_at):
+        def check(drawn):
+            if drawn:
+                results[name] = (time.perf_counter() - started_at) * 1000
+                print(f"{name:>10}: {results[name]:8.1f} ms for {len(positions)} marks")
+                map_view.reset()
+                QTimer.singleShot(500, run_next)
+            else:
+                QTimer.singleShot(5, lambda: poll())
+
+        def poll():
+            # Past map_lod_min_marks the marks are drawn by the LOD layer
+            # instead of one layer each in markersGroup
+            map_view.web_view.page().runJavaScript(
+                f"lod.active ? lodGroup.getLayers().length > 0 : marks.size >= {len(positions)}",
+                check)
+
+        poll()
+
+    def run_next():
+        if not pending:
+            app.quit()
+            return
+        name = pending.pop(0)
+        started_at = time.perf_counter()
+        if name == "per_point":
+            for latitude, longitude in positions:
+                map_view.add_gps_position_mark(latitude, longitude)
+        else:
+            map_view.add_gps_position_marks(positions)
+        wait_for_layers(name, started_at)
+
+    map_view.jspy_bridge.signal_js_ready.connect(lambda: QTimer.singleShot(500, run_next))
+    app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.utils import waypoint_formats
+from app.utils.yaml_io import load_yaml_file, save_yaml_file
+
+
+def make_mission(count, lat0=37.7749, lon0=-122.4194, spread_deg=0.01, seed=0):
+    """Generates a random mission of `count` waypoints around a center point."""
+    rng = np.random.default_rng(seed)
+    waypoints = np.empty(count, dtype=waypoint_formats.WAYPOINT_DTYPE)
+    waypoints['latitude'] = lat0 + rng.uniform(-spread_deg, spread_deg, count)
+    waypoints['longitude'] = lon0 + rng.uniform(-spread_deg, spread_deg, count)
+    waypoints['heading'] = rng.uniform(-np.pi, np.pi, count)
+    return waypoints
+
+
+def timed(func, *args, repeat=3):
+    """Returns the best wall time in seconds over `repeat` runs and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started_at)
+    return best, result
+
+
+def main():
+    """
+    Benchmarks saving and loading a mission in every waypoint format of
+    app.utils.waypoint_formats, against the previous yaml.dump/yaml.load
+    path, and reports the file sizes.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the waypoint file formats.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100_000],
+                        help="numbers of waypoints")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.counts:
+            waypoints = make_mission(count)
+            documents = {'waypoints': waypoint_formats.to_waypoint_dicts(waypoints)}
+            print(f"--- {count} waypoints ---")
+            print(f"{'format':>14}  {'save ms':>9}  {'load ms':>9}  {'bytes/pt':>8}")
+
+            path = os.path.join(directory, "mission_pyyaml.yaml")
+            save_s, _ = timed(save_yaml_file, documents, path, repeat=args.repeat)
+            load_s, _ = timed(load_yaml_file, path, repeat=args.repeat)
+            print(f"{'yaml (pyyaml)':>14}  {save_s * 1000:9.1f}  {load_s * 1000:9.1f}"
+                  f"  {os.path.getsize(path) / count:8.1f}")
+
+            for extension in waypoint_formats.FORMAT_EXTENSIONS:
+                if extension == ".yml":
+                    continue
+                path = os.path.join(directory, "mission" + extension)
+                save_s, _ = timed(waypoint_formats.save_waypoints, waypoints, path,
+                                  repeat=args.repeat)
+                load_s, loaded = timed(waypoint_formats.load_waypoints, path, repeat=args.repeat)
+                line = (f"{extension[1:]:>14}  {save_s * 1000:9.1f}  {load_s * 1000:9.1f}"
+                        f"  {os.path.getsize(path) / count:8.1f}")
+                if not np.array_equal(loaded, waypoints):
+                    line += "  (values differ)"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.utils.coverage import boustrophedon_path, contains_points, segments_inside
+
+# U-shaped field: a 10 x 10 m square with a 5 m wide notch cut from the top
+U_FIELD = np.array([
+    [0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [7.5, 10.0],
+    [7.5, 5.0], [2.5, 5.0], [2.5, 10.0], [0.0, 10.0],
+])
+
+
+def boundary_distances(polygon, points):
+    a = polygon[None, :, :]
+    d = np.roll(polygon, -1, axis=0)[None, :, :] - a
+    t = np.clip(((points[:, None, :] - a) * d).sum(axis=2) / (d ** 2).sum(axis=2), 0.0, 1.0)
+    return np.hypot(*(points[:, None, :] - a - t[..., None] * d).transpose(2, 0, 1)).min(axis=1)
+
+
+def assert_path_inside(polygon, points):
+    assert len(points) >= 2
+    # Points and leg midpoints inside or on the boundary
+    probes = np.vstack((points, (points[:-1] + points[1:]) / 2.0))
+    assert (contains_points(polygon, probes) | (boundary_distances(polygon, probes) < 1e-9)).all()
+    assert segments_inside(polygon, points[:-1], points[1:]).all()
+
+
+def test_square_field_keeps_lanes():
+    square = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0]])
+    points, yaws = boustrophedon_path(square, swath_width_m=1.0, headland_m=0.5)
+    assert len(points) == 20
+    assert len(yaws) == len(points)
+    np.testing.assert_allclose(points[:4], [[0.5, 0.5], [9.5, 0.5], [9.5, 1.5], [0.5, 1.5]])
+    assert_path_inside(square, points)
+
+
+def test_u_shaped_field_stays_inside():
+    points, yaws = boustrophedon_path(U_FIELD, swath_width_m=0.5, headland_m=0.0)
+    assert len(yaws) == len(points)
+    assert_path_inside(U_FIELD, points)
+    # No leg crosses the notch between the prongs
+    notch = (points[:, 1] > 5.0 + 1e-9) & (points[:, 0] > 2.5 + 1e-9) & (points[:, 0] < 7.5 - 1e-9)
+    assert not notch.any()
+    # Both prongs are covered
+    assert (points[:, 1] > 9.0).sum() >= 4
+
+
+def test_u_shaped_field_with_headland():
+    points, _ = boustrophedon_path(U_FIELD, swath_width_m=1.0, headland_m=0.25)
+    assert_path_inside(U_FIELD, points)
+    # Transit legs keep the headland from the boundary too
+    assert boundary_distances(U_FIELD, points).min() >= 0.25 - 1e-9
+
+
+def comb_field(notches=20, size=1000.0, depth=500.0):
+    """Square field with `notches` slots cut from the top edge."""
+    pitch = size / (notches + 1)
+    points = [[0.0, 0.0], [size, 0.0], [size, size]]
+    for k in range(notches, 0, -1):
+        x = k * pitch
+        points += [[x + pitch / 4, size], [x + pitch / 4, size - depth],
+                   [x - pitch / 4, size - depth], [x - pitch / 4, size]]
+    points.append([0.0, size])
+    return np.array(points)
+
+
+def test_comb_field_stays_inside():
+    comb = comb_field(size=200.0, depth=100.0)
+    for angle in (0.0, 0.3):
+        points, _ = boustrophedon_path(comb, swath_width_m=0.5, headland_m=1.0, angle=angle)
+        assert_path_inside(comb, points)
+
+
+if __name__ == "__main__":
+    test_square_field_keeps_lanes()
+    test_u_shaped_field_stays_inside()
+    test_u_shaped_field_with_headland()
+    test_comb_field_stays_inside()
+    print("ok")
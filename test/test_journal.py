@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.utils.journal import JOURNAL_MAGIC, WaypointJournal
+
+
+def make_row(i):
+    # latitude, longitude, yaw, timestamp, fix_status, std_east_m, std_north_m, samples
+    return (50.0 + i * 1e-5, 8.0 + i * 1e-5, 0.5 * i, 1000.0 + i, 4, 0.01, 0.02, 10)
+
+
+def reopen(path):
+    journal = WaypointJournal(path)
+    rows = journal.replay()
+    return journal, rows
+
+
+def test_records_replay():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal, rows = reopen(path)
+        assert rows == []
+        journal.log_many([make_row(i) for i in range(3)])
+        journal.remove(1)
+        journal.log(make_row(3))
+        journal.close()
+
+        journal, rows = reopen(path)
+        assert rows == [make_row(0), make_row(2), make_row(3)]
+        journal.clear()
+        journal.log(make_row(4))
+        journal.close()
+
+        journal, rows = reopen(path)
+        assert rows == [make_row(4)]
+        journal.close()
+
+
+def test_torn_tail_replays_earlier_records():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal, _ = reopen(path)
+        journal.log_many([make_row(i) for i in range(3)])
+        journal.close()
+        size = os.path.getsize(path)
+        with open(path, 'r+b') as file:
+            file.truncate(size - 5)
+
+        journal, rows = reopen(path)
+        assert rows == [make_row(0), make_row(1)]
+        # The torn record is cut off, so new records follow the good ones
+        journal.log(make_row(5))
+        journal.close()
+        journal, rows = reopen(path)
+        assert rows == [make_row(0), make_row(1), make_row(5)]
+        journal.close()
+
+
+def test_corrupt_record_is_dropped():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal, _ = reopen(path)
+        journal.log_many([make_row(i) for i in range(3)])
+        journal.close()
+        with open(path, 'r+b') as file:
+            file.seek(-8, os.SEEK_END)
+            byte = file.read(1)
+            file.seek(-8, os.SEEK_END)
+            file.write(bytes([byte[0] ^ 0xFF]))
+
+        journal, rows = reopen(path)
+        assert rows == [make_row(0), make_row(1)]
+        journal.close()
+
+
+def test_compact_carries_over_new_records():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal, _ = reopen(path)
+        rows = [make_row(i) for i in range(4)]
+        journal.log_many(rows)
+        journal.remove(0)
+        del rows[0]
+
+        snapshot = journal.begin_compaction(rows)
+        assert snapshot.startswith(JOURNAL_MAGIC)
+        assert journal.begin_compaction(rows) is None
+        journal.log(make_row(4))
+        journal.compact(snapshot)
+        assert not os.path.exists(path + ".tmp")
+        journal.log(make_row(5))
+        journal.close()
+
+        journal, replayed = reopen(path)
+        assert replayed == rows + [make_row(4), make_row(5)]
+        journal.close()
+
+
+def test_saved_compaction_is_not_replayed():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal, _ = reopen(path)
+        rows = [make_row(i) for i in range(2)]
+        journal.log_many(rows)
+        journal.compact(journal.begin_compaction(rows, saved=True))
+        journal.close()
+
+        journal, replayed = reopen(path)
+        assert replayed == []
+        journal.log(make_row(2))
+        journal.close()
+
+        journal, replayed = reopen(path)
+        assert replayed == [make_row(2)]
+        journal.close()
+
+
+if __name__ == "__main__":
+    test_records_replay()
+    test_torn_tail_replays_earlier_records()
+    test_corrupt_record_is_dropped()
+    test_compact_carries_over_new_records()
+    test_saved_compaction_is_not_replayed()
+    print("ok")